@@ -18,8 +18,32 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
 from libopensesame.exceptions import FStringError, FStringSyntaxError
+import functools
 import warnings
 
+# The maximum number of compiled f-strings that are kept in memory
+FSTRING_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=FSTRING_CACHE_SIZE)
+def compile_fstring(fs):
+    r"""Compiles an f-string into bytecode. Compiled f-strings are cached, so
+    that an f-string is compiled only once, even when it is evaluated on every
+    trial.
+
+    Parameters
+    ----------
+    fs : str
+        An f-string.
+
+    Returns
+    -------
+    code
+        The compiled f-string, which can be evaluated with `eval()`.
+    """
+    fs_escaped = fs.replace(r"'''", r"\'\'\'")
+    return compile(f"f'''{fs_escaped}'''", '<string>', 'eval')
+
 
 class BasePythonWorkspace:
 
@@ -127,12 +151,13 @@ class BasePythonWorkspace:
         -------
         A string corresponding to the evaluated f-string.
         """
-        fs_escaped = fs.replace(r"'''", r"\'\'\'")
         try:
-            return eval(f"f'''{fs_escaped}'''", self._globals)  # __ignore_traceback__
+            bytecode = compile_fstring(fs)
         except SyntaxError:
             raise FStringSyntaxError(
                 f'The following text contains invalid f-string expression:\n\n~~~ .text\n{fs}\n~~~\n\n')
+        try:
+            return eval(bytecode, self._globals)  # __ignore_traceback__
         except Exception:
             raise FStringError(
                 f'Failed to evaluate f-string expression in the following text:\n\n~~~ .text\n{fs}\n~~~\n\n')
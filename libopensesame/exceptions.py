@@ -256,6 +256,15 @@ class DeviceError(OSException):
     pass
 
 
+class LogWriteError(OSException):
+    """A `LogWriteError` is raised when data could not be written to the log
+    file, for example because the disk is full or has been disconnected. Rows
+    that could not be written are saved to a separate recovery file when the
+    log is closed.
+    """
+    pass
+
+
 class PythonError(OSException):
     """A `PythonError` is raised when an error occurs during execution of 
     Python code, typically in an `inline_script` item.
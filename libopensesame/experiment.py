@@ -33,7 +33,6 @@ from libopensesame.oslogging import oslogger
 from libopensesame.py3compat import *
 import os
 import sys
-import pickle
 import time
 import warnings
 import gc
@@ -108,6 +107,7 @@ class Experiment(Item):
         self.resources = resources
         self.paused = False
         self.output_channel = None
+        self._workspace_transmitter = None
         self.reset()
 
         # Logfile parameters
@@ -229,21 +229,20 @@ class Experiment(Item):
         and the definition string.
         """
         # Read the string until the end of the definition
-        def_str = u''
+        def_lines = []
         line = next(s, None)
         if line is None:
             return None, u''
-        get_next = False
         while True:
             if len(line) > 0:
                 if line[0] != u'\t':
                     break
                 else:
-                    def_str += line + u'\n'
+                    def_lines.append(line + u'\n')
             line = next(s, None)
             if line is None:
                 break
-        return line, def_str
+        return line, u''.join(def_lines)
 
     def from_string(self, string):
         r"""Reads the entire experiment from a string.
@@ -294,6 +293,12 @@ class Experiment(Item):
         r"""Sends the current workspace through the output channel. If there is
         no output channel, this function does nothing.
 
+        Only values that changed since the previous transmission are sent, and
+        they are serialized by a background thread (see
+        `libopensesame.workspace_transmitter`). Heartbeats return right away.
+        Other transmissions wait until the workspace has been sent, so that it
+        arrives before anything that is sent afterwards.
+
         Parameters
         ----------
         **extra : dict
@@ -301,14 +306,17 @@ class Experiment(Item):
         """
         if self.output_channel is None:
             return
-        d = self.python_workspace._globals.copy()
-        d.update(extra)
-        for key, value in d.copy().items():
-            try:
-                pickle.dumps(value)
-            except:
-                del d[key]
-        self.output_channel.put(d)
+        if self._workspace_transmitter is None or \
+                self._workspace_transmitter.channel is not self.output_channel:
+            from libopensesame.workspace_transmitter import \
+                WorkspaceTransmitter
+            if self._workspace_transmitter is not None:
+                self._workspace_transmitter.close()
+            self._workspace_transmitter = WorkspaceTransmitter(
+                self.output_channel)
+        self._workspace_transmitter.transmit(
+            self.python_workspace._globals, extra,
+            wait=not extra.get(u'__heartbeat__', False))
 
     def set_output_channel(self, output_channel):
         r"""Sets the output channel, which is used to communicate the workspace
@@ -334,6 +342,7 @@ class Experiment(Item):
         self.var.opensesame_codename = metadata.codename
         self.running = True
         self.init_random()
+        self.init_stimulus_cache()
         self.init_display()
         self.init_clock()
         self.init_sound()
@@ -413,11 +422,14 @@ class Experiment(Item):
             oslogger.error('missing or invalid log object')
         sampler.close_sound(self)
         canvas.close_display(self)
+        oslogger.info(u'stimulus cache: %s' % self.stimulus_cache.stats())
         self.cleanup()
         if not gc.isenabled():
             oslogger.info('enabling garbage collection')
             gc.enable()
         self.transmit_workspace(__finished__=True)
+        if self._workspace_transmitter is not None:
+            self._workspace_transmitter.close()
 
     def to_string(self):
         """
@@ -434,7 +446,8 @@ class Experiment(Item):
             s += self.items[_item].to_string() + u'\n'
         return s
 
-    def save(self, path, overwrite=False, update_path=True):
+    def save(self, path, overwrite=False, update_path=True, compresslevel=6,
+             reuse_pool_files=True):
         r"""Saves the experiment to file.
 
         Parameters
@@ -445,6 +458,13 @@ class Experiment(Item):
             Indicates if existing files should be overwritten.
         update_path : bool, optional
             Indicates if the experiment_path attribute should be updated.
+        compresslevel : int, optional
+            The gzip compression level (0 - 9) for experiments with files in
+            the file pool. New in 4.0.0
+        reuse_pool_files : bool, optional
+            Indicates whether unchanged pool files are copied from the
+            previously saved archive instead of being compressed again. New in
+            4.0.0
 
         Returns
         -------
@@ -455,7 +475,8 @@ class Experiment(Item):
         if os.path.exists(path) and not overwrite:
             return False
         from libopensesame.osexpfile import osexpwriter
-        w = osexpwriter(self, path)
+        w = osexpwriter(self, path, compresslevel=compresslevel,
+                        reuse_pool_files=reuse_pool_files)
         if update_path:
             self.experiment_path = w.experiment_path
         return path
@@ -535,6 +556,23 @@ class Experiment(Item):
         except:
             pass
 
+    def init_stimulus_cache(self):
+        r"""Configures the stimulus cache based on the stimulus_cache_max_mb
+        experiment variable and resets its counters.
+        """
+        from openexp._canvas import stimulus_cache
+        stimulus_cache.configure(self)
+
+    @property
+    def stimulus_cache(self):
+        r"""The stimulus cache, which keeps prepared Gabor patches, noise
+        patches, and images. The `hits`, `misses`, `evictions`, and `nbytes`
+        properties, and the `stats()` function, give information about how
+        well the cache performs.
+        """
+        from openexp._canvas.stimulus_cache import stimulus_cache
+        return stimulus_cache
+
     def init_sound(self):
         """Intializes the sound backend."""
         from openexp import sampler
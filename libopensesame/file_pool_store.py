@@ -24,6 +24,14 @@ import tempfile
 import os
 import sys
 import shutil
+import threading
+import time
+
+# A folder whose modification time lies less than this many nanoseconds
+# before the moment that it was indexed may have changed again within the
+# resolution of the file-system clock. Such folders are indexed again on
+# the next access.
+RACY_INTERVAL = 2000000000
 
 
 class FilePoolStore:
@@ -110,9 +118,22 @@ class FilePoolStore:
             oslogger.debug(u'reusing existing pool folder')
             self.__folder__ = folder
         oslogger.debug(u'pool folder is \'%s\'' % self.__folder__)
+        # Files from experiment archives are extracted in the background. The
+        # condition is notified whenever a file has been extracted.
+        self._extractor = None
+        self._extracting = False
+        self._cancel_extraction = False
+        self._extracted = set()
+        self._extraction_cond = threading.Condition()
+        # Maps folders onto (mtime_ns, indexed_ns, n_entries, {file: size})
+        # tuples. See _folder_index().
+        self._index = {}
 
     def clean_up(self):
         r"""Removes the pool folder."""
+        self._cancel_extraction = True
+        self.wait_for_extraction()
+        self._cancel_extraction = False
         try:
             shutil.rmtree(self.__folder__)
         except Exception:
@@ -139,6 +160,7 @@ class FilePoolStore:
             The name of the file.
         """
         os.remove(self[path])
+        self._invalidate_index()
 
     def __getitem__(self, path):
         """
@@ -159,7 +181,8 @@ class FilePoolStore:
         path = safe_decode(path)
         if path.strip() == u'':
             raise InvalidValue(f'Cannot get empty filename from file pool')
-        for folder in self.folders(include_experiment_path=True):
+        self._wait_for_file(path)
+        for folder in self._folders(include_experiment_path=True):
             _path = os.path.normpath(os.path.join(folder, path))
             if os.path.exists(_path):
                 return _path
@@ -193,7 +216,7 @@ class FilePoolStore:
                   the folder that is included with the experiment.
             type: int
         """
-        return len(os.listdir(self.folder()))
+        return self._folder_index(self.folder())[2]
 
     def add(self, path, new_name=None):
         r"""Copies a file to the file pool.
@@ -213,6 +236,7 @@ class FilePoolStore:
         if new_name is None:
             new_name = os.path.basename(path)
         shutil.copyfile(path, os.path.join(self.folder(), new_name))
+        self._invalidate_index()
 
     def files(self):
         r"""Returns all files in the file pool.
@@ -230,11 +254,10 @@ class FilePoolStore:
         >>> for path in pool:
         >>>         print(path)
         """
+        self.wait_for_extraction()
         _files = []
-        for _folder in self.folders():
-            for _file in os.listdir(_folder):
-                if os.path.isfile(os.path.join(_folder, _file)):
-                    _files.append(_file)
+        for _folder in self._folders():
+            _files += self._folder_index(_folder)[3]
         return sorted(_files)
 
     def fallback_folder(self):
@@ -254,7 +277,7 @@ class FilePoolStore:
             if pool.fallback_folder() is not None:
                 print('There is a fallback pool folder!')
         """
-        _folders = self.folders()
+        _folders = self._folders()
         if len(_folders) < 2:
             return None
         return _folders[-1]
@@ -272,6 +295,13 @@ class FilePoolStore:
         --------
         >>> print(f'The pool folder is here: {pool.folder()}')
         """
+        self.wait_for_extraction()
+        return self._folder()
+
+    def _folder(self):
+        r"""Gives the full path to the (main) pool folder without waiting for
+        files to be extracted.
+        """
         if not os.path.exists(self.__folder__):
             oslogger.warning(u'recreating missing file-pool folder')
             os.mkdir(self.__folder__)
@@ -329,7 +359,15 @@ class FilePoolStore:
         >>> for folder in pool.folders():
         >>>     print(folder)
         """
-        _folders = [self.folder()]
+        self.wait_for_extraction()
+        return self._folders(include_fallback_folder, include_experiment_path)
+
+    def _folders(self, include_fallback_folder=True,
+                 include_experiment_path=False):
+        r"""Gives a list of all folders that are searched without waiting for
+        files to be extracted. See `folders()`.
+        """
+        _folders = [self._folder()]
         if self.experiment.experiment_path is None or \
                 not os.path.exists(self.experiment.experiment_path):
             return _folders
@@ -355,9 +393,11 @@ class FilePoolStore:
         --------
         >>> pool.rename(u'my_old_img.png', u'my_new_img.png')
         """
+        self.wait_for_extraction()
         path = self[old_path]
         dirname, basename = os.path.split(path)
         os.rename(path, os.path.join(dirname, new_path))
+        self._invalidate_index()
 
     def size(self):
         """
@@ -368,7 +408,165 @@ class FilePoolStore:
         example:
                 print(u'The size of the file pool is %d bytes' % pool.size())
         """
-        return sum([os.path.getsize(self[path]) for path in self])
+        # A file is counted with the size of the first folder that contains
+        # it, which is also the file that pool[path] resolves to.
+        self.wait_for_extraction()
+        sizes = {}
+        for _folder in reversed(self._folders()):
+            sizes.update(self._folder_index(_folder)[3])
+        return sum(sizes[path] for path in self.files())
+
+    def extract_tarfile(self, tar, rename=None):
+        r"""Extracts the files in the `pool` folder of an experiment archive
+        to the pool folder. This happens in a background thread, so that
+        opening an experiment with a large file pool doesn't block until all
+        files have been extracted. Getting the path to a file waits until
+        that file has been extracted, and functions that need the full
+        contents of the pool folder, such as `files()` and `folder()`, wait
+        until all files have been extracted.
+
+        New in 4.0.0
+
+        Parameters
+        ----------
+        tar : TarFile
+            An open archive. The archive is closed when all files have been
+            extracted, and shouldn't be used by the caller anymore.
+        rename : callable, optional
+            A function that maps filenames in the archive to filenames in the
+            pool, or None to use the filenames as they are.
+        """
+        self.wait_for_extraction()
+        self._invalidate_index()
+        with self._extraction_cond:
+            self._extracted = set()
+            self._extracting = True
+        self._extractor = threading.Thread(target=self._extract,
+                                           args=(tar, rename), daemon=True)
+        self._extractor.start()
+
+    def wait_for_extraction(self):
+        r"""Waits until all files that are being extracted from an experiment
+        archive have been extracted.
+
+        New in 4.0.0
+        """
+        if self._extractor is None:
+            return
+        self._extractor.join()
+        self._extractor = None
+
+    def _wait_for_file(self, path):
+        r"""Waits until a file has been extracted, or until all files have
+        been extracted if the file is not in the archive.
+
+        Parameters
+        ----------
+        path : str
+            A filename.
+        """
+        if not self._extracting:
+            return
+        with self._extraction_cond:
+            self._extraction_cond.wait_for(
+                lambda: not self._extracting or path in self._extracted)
+
+    def _folder_index(self, folder):
+        r"""Gives the files in a folder with their sizes. The folder is only
+        listed again when its modification time has changed since it was last
+        indexed, which is the case whenever a file is added, removed, or
+        renamed. Files that are overwritten in place don't change the
+        modification time of the folder, so their size may be outdated until
+        the index is invalidated.
+
+        Parameters
+        ----------
+        folder : str
+            The full path to a folder.
+
+        Returns
+        -------
+        tuple
+            An (mtime_ns, indexed_ns, n_entries, files) tuple, where
+            `n_entries` is the number of entries including subfolders, and
+            `files` is a dict that maps file names onto sizes in bytes.
+        """
+        try:
+            mtime_ns = os.stat(folder).st_mtime_ns
+        except OSError:
+            self._index.pop(folder, None)
+            return None, None, 0, {}
+        index = self._index.get(folder, None)
+        if index is not None and index[0] == mtime_ns and \
+                index[1] - mtime_ns > RACY_INTERVAL:
+            return index
+        indexed_ns = time.time_ns()
+        n_entries = 0
+        files = {}
+        with os.scandir(folder) as it:
+            for entry in it:
+                n_entries += 1
+                try:
+                    if entry.is_file():
+                        files[entry.name] = entry.stat().st_size
+                except OSError:
+                    pass
+        index = mtime_ns, indexed_ns, n_entries, files
+        self._index[folder] = index
+        return index
+
+    def _invalidate_index(self):
+        r"""Forgets all indexed folders, so that they are listed again on
+        the next access. This is necessary when files have been changed in
+        place through the pool.
+        """
+        self._index = {}
+
+    def _extract(self, tar, rename):
+        r"""Runs in the background and extracts files from the pool folder of
+        an archive. See `extract_tarfile()`.
+        """
+        folder = self._folder()
+        try:
+            for tarinfo in tar:
+                if self._cancel_extraction:
+                    break
+                dirname, basename = os.path.split(safe_decode(tarinfo.name))
+                if dirname != u'pool' or not tarinfo.isfile():
+                    continue
+                if rename is not None:
+                    basename = rename(basename)
+                try:
+                    self._extract_file(tar, tarinfo,
+                                       os.path.join(folder, basename))
+                except Exception as e:
+                    oslogger.error(f'failed to extract {basename}: {e}')
+                with self._extraction_cond:
+                    self._extracted.add(basename)
+                    self._extraction_cond.notify_all()
+        except Exception as e:
+            oslogger.error(f'failed to extract file pool: {e}')
+        finally:
+            tar.close()
+            with self._extraction_cond:
+                self._extracting = False
+                self._extraction_cond.notify_all()
+
+    def _extract_file(self, tar, tarinfo, path):
+        r"""Extracts a single file from an archive. The file is first written
+        to a temporary file, so that it never exists in an incomplete state.
+        """
+        fd, tmp_path = tempfile.mkstemp(suffix=u'.partial',
+                                        dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, u'wb') as dst:
+                shutil.copyfileobj(tar.extractfile(tarinfo), dst)
+            os.chmod(tmp_path, tarinfo.mode & 0o777 | 0o600)
+            os.utime(tmp_path, (tarinfo.mtime, tarinfo.mtime))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
 
 
 class FilePoolStoreIterator:
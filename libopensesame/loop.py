@@ -18,15 +18,20 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
 import os
+import threading
 from libopensesame.exceptions import InvalidOpenSesameScript, OSException, \
     ItemDoesNotExist, LoopSourceFileDoesNotExist, UnsupportedLoopSourceFile, \
     InvalidConditionalExpression, PythonError, InvalidValue, \
     ConditionalExpressionError
 from libopensesame.item import Item
+from libopensesame.var_store import coerce_value
 from datamatrix import operations, DataMatrix, functional
 from pseudorandom import Enforce, MaxRep, MinDist
 from openexp.keyboard import Keyboard
 
+# Source files that have been read, as path: ((mtime, size), DataMatrix)
+_source_files = {}
+
 
 class Loop(Item):
     """A loop item runs a single other item multiple times"""
@@ -52,6 +57,9 @@ class Loop(Item):
         self.dm.sorted = False
         self.live_dm = None
         self.live_row = None
+        self._live_plan = None
+        self._valid_column_names = None
+        self._pregenerated = None
         self._operations = []
         self._constraints = []
         self._item = u''
@@ -176,52 +184,147 @@ class Loop(Item):
         DataMatrix
             A live DataMatrix.
         """
+        src_dm = self._source_datamatrix()
+        spec = self._live_datamatrix_spec()
+        dm, self.ef = self._build_live_datamatrix(src_dm, spec)
+        return dm
+
+    def _next_live_datamatrix(self):
+        r"""Gets the live DataMatrix for the next block. If the next block has
+        been pregenerated in the background, and the source table and the
+        evaluated loop settings have not changed since, the pregenerated
+        DataMatrix is used. If `pregenerate` is 'yes', a live DataMatrix for
+        the block after that is then generated in the background. This is
+        useful when constraints take a long time to enforce, but the
+        background thread competes with the experiment for processor time,
+        and draws from the same random number generator, so that the order of
+        random draws is no longer reproducible from a random seed.
+
+        Returns
+        -------
+        DataMatrix
+            A live DataMatrix.
+        """
+        src_dm = self._source_datamatrix()
+        spec = self._live_datamatrix_spec()
+        pregenerated, self._pregenerated = self._pregenerated, None
+        if pregenerated is not None and pregenerated.matches(src_dm, spec):
+            dm, self.ef = pregenerated.result()
+        else:
+            dm, self.ef = self._build_live_datamatrix(src_dm, spec)
+        # Operations that evaluate cells, such as weight, may depend on
+        # variables that change during the block, and are therefore never
+        # pregenerated.
+        if self.var.get(u'pregenerate', u'no', valid=[u'yes', u'no']) \
+                == u'yes' and not any(cmd == u'weight'
+                                      for cmd, arglist in spec[3]):
+            self._pregenerated = _Pregeneration(
+                self._build_live_datamatrix, src_dm, spec)
+        return dm
+
+    def _source_datamatrix(self):
+        r"""Gets the source DataMatrix, which is the loop table or the source
+        file, and checks that all column names are valid. Column names are
+        only checked again when they change.
+
+        Returns
+        -------
+        DataMatrix
+        """
         src_dm = self.dm if self.var.source == u'table' else self._read_file()
-        for column_name in src_dm.column_names:
+        column_names = tuple(src_dm.column_names)
+        if column_names == self._valid_column_names:
+            return src_dm
+        for column_name in column_names:
             if not self.syntax.valid_var_name(column_name):
                 raise InvalidOpenSesameScript(
                     f'The loop table contains an invalid column name: '
                     f'"{column_name}"')
+        self._valid_column_names = column_names
+        return src_dm
+
+    def _live_datamatrix_spec(self):
+        r"""Evaluates the loop settings that determine how the live DataMatrix
+        is built from the source DataMatrix. Variable references are evaluated
+        here, so that the live DataMatrix itself can be built without access
+        to the experimental variables.
+
+        Returns
+        -------
+        tuple
+            A (repeat, order, constraints, operations) tuple, in which
+            constraints and operations are tuples with evaluated arguments.
+        """
         # The number of repeats should be numeric. If not, then give an error.
         # This can also occur when generating a preview of a loop table if
         # repeat is variable.
         if not isinstance(self.var.repeat, (int, float)):
             raise InvalidValue(
                 f'repeat should be numeric, not {self.var.repeat}')
-        length = int(len(src_dm) * self.var.repeat)
+        constraints = tuple(
+            (
+                constraint_cls,
+                self.syntax.auto_type(self.syntax.eval_text(colname)),
+                tuple(
+                    (key, self.syntax.auto_type(self.syntax.eval_text(val)))
+                    for key, val in kwargs.items()
+                )
+            )
+            for constraint_cls, colname, kwargs in self._constraints
+        )
+        operations_ = tuple(
+            (
+                cmd,
+                tuple(self.syntax.auto_type(self.syntax.eval_text(arg))
+                      for arg in arglist)
+            )
+            for cmd, arglist in self._operations
+        )
+        return self.var.repeat, self.var.order, constraints, operations_
+
+    def _build_live_datamatrix(self, src_dm, spec):
+        r"""Builds a live DataMatrix from a source DataMatrix. This doesn't
+        access the experimental variables, so that it can also run in the
+        background.
+
+        Parameters
+        ----------
+        src_dm : DataMatrix
+            The source DataMatrix as returned by `_source_datamatrix()`.
+        spec : tuple
+            The loop settings as returned by `_live_datamatrix_spec()`.
+
+        Returns
+        -------
+        tuple
+            A (DataMatrix, Enforce) tuple, where Enforce is None if there are
+            no constraints.
+        """
+        repeat, order, constraints, operations_ = spec
+        length = int(len(src_dm) * repeat)
         dm = DataMatrix(length=0)
         while len(dm) < length:
             i = min(length-len(dm), len(src_dm))
-            if self.var.order == u'random':
+            if order == u'random':
                 dm <<= operations.shuffle(src_dm)[:i]
             else:
                 dm <<= src_dm[:i]
-        if self.var.order == u'random':
+        if order == u'random':
             dm = operations.shuffle(dm)
         # Constraints come before loop operations
-        if self._constraints:
-            self.ef = Enforce(dm)
-            for constraint_cls, colname, kwargs in self._constraints:
-                colname = self.syntax.auto_type(self.syntax.eval_text(colname))
-                kwargs = {
-                    key: self.syntax.auto_type(self.syntax.eval_text(val))
-                    for key, val in kwargs.items()
-                }
+        ef = None
+        if constraints:
+            ef = Enforce(dm)
+            for constraint_cls, colname, kwargs in constraints:
                 try:
                     cols = dm[colname]
                 except AttributeError:
                     raise InvalidOpenSesameScript(
                         f'Column {colname} does not exist')
-                self.ef.add_constraint(
-                    constraint_cls, cols=cols, **kwargs
-                )
-            dm = self.ef.enforce()
+                ef.add_constraint(constraint_cls, cols=cols, **dict(kwargs))
+            dm = ef.enforce()
         # Operations come last
-        for cmd, arglist in self._operations:
-            arglist = [
-                self.syntax.auto_type(self.syntax.eval_text(arg))
-                for arg in arglist
-            ]
+        for cmd, arglist in operations_:
             # The column name is always specified last, or not at all
             if arglist:
                 try:
@@ -294,7 +397,7 @@ class Loop(Item):
                 except TypeError:
                     raise InvalidValue(
                         'weight values should be non-negative numeric values')
-        return dm
+        return dm, ef
 
     def prepare(self):
         """See item."""
@@ -315,21 +418,26 @@ class Loop(Item):
         """See item."""
         self.set_item_onset()
         if self.live_dm is None or self.var.continuous == u'no':
-            self.live_dm = self._create_live_datamatrix()
+            self.live_dm = self._next_live_datamatrix()
             self.live_row = 0
+            self._live_plan = self._plan_rows(self.live_dm)
+        var = self.experiment.var
         first = True
         while self.live_row < len(self.live_dm):
-            self.experiment.var.repeat_cycle = 0
-            self.experiment.var.live_row = self.live_row
-            self.experiment.var.set('live_row_%s' % self.name, self.live_row)
-            for name, val in self.live_dm[self.live_row]:
-                if isinstance(val, str) and val.startswith(u'='):
-                    try:
-                        val = self.python_workspace._eval(val[1:])
-                    except Exception as e:
-                        raise PythonError(
-                            'Error evaluating Python expression in loop table')
-                self.experiment.var.set(name, val)
+            var.repeat_cycle = 0
+            var.live_row = self.live_row
+            var.set('live_row_%s' % self.name, self.live_row)
+            for step in self._live_plan[self.live_row]:
+                if isinstance(step, dict):
+                    var._update(step)
+                    continue
+                name, code = step
+                try:
+                    val = self.python_workspace._eval(code)
+                except Exception as e:
+                    raise PythonError(
+                        'Error evaluating Python expression in loop table')
+                var.set(name, val)
             # Evaluate the run if statement
             if (
                     self._break_if is not None and
@@ -345,11 +453,15 @@ class Loop(Item):
             # Run the item!
             self.experiment.items.execute(self._item)
             # If the repeat_cycle flag was set, run the item again later
-            if self.experiment.var.repeat_cycle:
+            if var.repeat_cycle:
                 self.live_dm <<= self.live_dm[self.live_row:self.live_row+1]
                 if self.var.order == u'random':
                     self.live_dm = self.live_dm[:self.live_row+1] \
                         << operations.shuffle(self.live_dm[self.live_row+1:])
+                # Only the rows that haven't been run yet need to be planned
+                # again
+                self._live_plan = self._live_plan[:self.live_row+1] + \
+                    self._plan_rows(self.live_dm[self.live_row+1:])
             self.live_row += 1
             first = False
         else:
@@ -357,9 +469,98 @@ class Loop(Item):
             # the next run of the loop item
             self.live_row = None
             self.live_dm = None
+            self._live_plan = None
+        # The end of a loop generally corresponds to the end of a block, which
+        # is a good moment for buffering log back-ends to store their data.
+        if self.log is not None:
+            self.log.end_block()
+
+    def _plan_rows(self, dm):
+        r"""Prepares the rows of a live DataMatrix, so that each row can be
+        assigned to the experimental variables with a single dict update. The
+        column names have already been checked by
+        `_create_live_datamatrix()`, values are converted in the same way as
+        `var.set()` does, and Python expressions (cells that start with `=`)
+        are compiled only once for the entire table.
+
+        Parameters
+        ----------
+        dm : DataMatrix
+            A live DataMatrix.
+
+        Returns
+        -------
+        list
+            A list with one entry for each row. Each entry is a list of steps
+            that are executed in order. A step is either a dict of values that
+            are assigned all at once, or a (name, code) tuple of an expression
+            that is evaluated and then assigned. Steps keep the column order,
+            so that expressions see the values of preceding columns only.
+        """
+        names = dm.column_names
+        columns = []
+        # Maps row indices to (column index, code) tuples
+        expressions = {}
+        # Loop tables often contain the same values many times, so converted
+        # values are remembered. Expressions are remembered as _Expression
+        # objects.
+        converted = {}
+        for col_nr, name in enumerate(names):
+            values = []
+            has_expressions = False
+            for val in dm[name]:
+                key = type(val), val
+                try:
+                    cval = converted.get(key, converted)
+                except TypeError:
+                    cval = coerce_value(val)
+                else:
+                    if cval is converted:
+                        cval = converted[key] = self._convert_cell(val)
+                if type(cval) is _Expression:
+                    has_expressions = True
+                values.append(cval)
+            if has_expressions:
+                for row_nr, cval in enumerate(values):
+                    if type(cval) is _Expression:
+                        expressions.setdefault(row_nr, []).append(
+                            (col_nr, cval.code))
+            columns.append(values)
+        plan = []
+        rows = zip(*columns) if columns else [()] * len(dm)
+        for row_nr, row in enumerate(rows):
+            if row_nr not in expressions:
+                plan.append([dict(zip(names, row))])
+                continue
+            steps = []
+            start = 0
+            for col_nr, code in expressions[row_nr]:
+                steps.append(dict(zip(names[start:col_nr],
+                                      row[start:col_nr])))
+                steps.append((names[col_nr], code))
+                start = col_nr + 1
+            steps.append(dict(zip(names[start:], row[start:])))
+            plan.append(steps)
+        return plan
+
+    def _convert_cell(self, val):
+        r"""Converts a loop-table cell in the same way as `var.set()` does, or
+        compiles it into an _Expression if it starts with `=`.
+        """
+        if not isinstance(val, str) or not val.startswith(u'='):
+            return coerce_value(val)
+        try:
+            return _Expression(compile(val[1:], u'<string>', u'eval'))
+        except SyntaxError:
+            # The error is raised when the expression is evaluated, as it
+            # would be without compiling
+            return _Expression(val[1:])
 
     def _read_file(self):
-        r"""Reads a source file and raises an exception if this fails.
+        r"""Reads a source file and raises an exception if this fails. Source
+        files are cached by path, modification time, and size, so that a file
+        is only read again when it has changed. The returned DataMatrix is
+        shared and should therefore not be modified.
 
         Returns
         -------
@@ -367,20 +568,29 @@ class Loop(Item):
         """
         from datamatrix import io
         src = self.experiment.pool[self.var.source_file]
-        if not os.path.exists(src):
+        try:
+            st = os.stat(src)
+        except OSError:
             raise LoopSourceFileDoesNotExist(self.var.source_file)
+        stamp = st.st_mtime_ns, st.st_size
+        cached = _source_files.get(src)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
         if src.endswith(u'.xlsx'):
             try:
-                return io.readxlsx(src)
+                dm = io.readxlsx(src)
             except Exception as e:
                 raise UnsupportedLoopSourceFile(
                     f'Failed to read .xlsx file: {src}')
-        try:
-            return io.readtxt(src)
-        except Exception as e:
-            raise UnsupportedLoopSourceFile(
-                f'Failed to read text file: {src}. Perhaps it has the wrong '
-                f'format or it is not utf-8 encoded')
+        else:
+            try:
+                dm = io.readtxt(src)
+            except Exception as e:
+                raise UnsupportedLoopSourceFile(
+                    f'Failed to read text file: {src}. Perhaps it has the '
+                    f'wrong format or it is not utf-8 encoded')
+        _source_files[src] = stamp, dm
+        return dm
 
     def _var_info_table(self):
         """
@@ -411,5 +621,73 @@ class Loop(Item):
         )
 
 
+class _Expression:
+
+    r"""A compiled Python expression from a loop table."""
+    __slots__ = u'code',
+
+    def __init__(self, code):
+
+        self.code = code
+
+
+class _Pregeneration:
+
+    r"""Builds a live DataMatrix in a background thread. The result is only
+    used if the source DataMatrix and loop settings are still the same when
+    the next block starts.
+
+    Parameters
+    ----------
+    build : callable
+        Builds the live DataMatrix from the source DataMatrix and the loop
+        settings.
+    src_dm : DataMatrix
+        The source DataMatrix.
+    spec : tuple
+        The evaluated loop settings.
+    """
+    def __init__(self, build, src_dm, spec):
+
+        self._src_dm = src_dm
+        self._spec = spec
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(build,),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, build):
+
+        try:
+            self._result = build(self._src_dm, self._spec)
+        except Exception as e:
+            self._error = e
+
+    def matches(self, src_dm, spec):
+        r"""Checks whether the pregenerated DataMatrix was built from the same
+        source DataMatrix and loop settings.
+
+        Returns
+        -------
+        bool
+        """
+        return src_dm is self._src_dm and spec == self._spec
+
+    def result(self):
+        r"""Waits for the build to finish and returns its result, or raises
+        the exception that occurred while building.
+
+        Returns
+        -------
+        tuple
+            A (DataMatrix, Enforce) tuple.
+        """
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
 # Alias for backwards compatibility
 loop = Loop
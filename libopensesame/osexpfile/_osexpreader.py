@@ -17,12 +17,16 @@ You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
+import io
 import os
-import sys
 import tarfile
-from libopensesame import misc
+from libopensesame.exceptions import InvalidOpenSesameScript
 from libopensesame.osexpfile import OSExpBase
 
+GZIP_MAGIC = b'\x1f\x8b'
+TAR_MAGIC = b'ustar'
+TAR_MAGIC_OFFSET = 257
+
 
 class OSExpReader(OSExpBase):
 
@@ -30,7 +34,9 @@ class OSExpReader(OSExpBase):
     def __init__(self, exp, src):
         r"""Constructor. A side effect of calling this constructor is that all
         files in the file pool of src are extracted to the file pool folder of
-        the experiment.
+        the experiment. This happens in the background, and the file pool
+        waits for files that have not been extracted yet when they are
+        accessed.
 
         Parameters
         ----------
@@ -67,16 +73,15 @@ class OSExpReader(OSExpBase):
                 raise ValueError(u'Path doesn\'t exist)')
         except ValueError:
             return u'script'
-        try:
-            tarfile.open(self._src, u'r:gz')
-            return 'targz'
-        except tarfile.ReadError:
-            pass
-        try:
-            tarfile.open(self._src, u'r')
-            return 'tar'
-        except tarfile.ReadError:
-            return 'scriptfile'
+        # Sniff the format from the magic bytes, rather than trying to open
+        # the file as an archive, which is slow for large archives
+        with open(self._src, u'rb') as fd:
+            header = fd.read(TAR_MAGIC_OFFSET + len(TAR_MAGIC))
+        if header.startswith(GZIP_MAGIC):
+            return u'targz'
+        if header[TAR_MAGIC_OFFSET:] == TAR_MAGIC:
+            return u'tar'
+        return u'scriptfile'
 
     def _read_script(self):
         r"""Reads a script (ie. not a file)"""
@@ -90,7 +95,9 @@ class OSExpReader(OSExpBase):
             self._script = fd.read()
 
     def _read_tarfile(self, format):
-        r"""Reads a tar or targz archive.
+        r"""Reads a tar or targz archive. The script is read directly from the
+        archive, and the files in the pool folder are extracted to the file
+        pool in the background.
 
         Parameters
         ----------
@@ -99,29 +106,21 @@ class OSExpReader(OSExpBase):
         """
         self._experiment_path = os.path.dirname(self._src)
         tar = tarfile.open(self._src, format)
-        for name in tar.getnames():
-            # Tar doesn't return unicode in Python 2
-            uname = safe_decode(name)
-            folder, fname = os.path.split(uname)
-            # Ignore everything except the pool folder
-            if folder != u'pool':
-                continue
-            # Filenames are encoded with U+XXXX notation in the archive. This is
-            # necessary to deal with absence of good unicode support in .tar.gz.
-            fname = self._syntax.from_ascii(fname)
-            pool_folder = safe_str(
-                self._pool.folder(),
-                enc=sys.getfilesystemencoding()
-            )
-            tar.extract(name, pool_folder)
-            from_name = os.path.join(self._pool.folder(), uname)
-            to_name = os.path.join(self._pool.folder(), fname)
-            os.rename(from_name, to_name)
-            os.rmdir(os.path.join(self._pool.folder(), folder))
-        # Temporarily extract the script file to the file pool, and remove it
-        # right away
-        script_path = os.path.join(self._pool.folder(), u'script.opensesame')
-        tar.extract(u'script.opensesame', self._pool.folder())
-        with safe_open(script_path) as fd:
-            self._script = fd.read()
-        os.remove(script_path)
+        try:
+            # The script is the first file in archives that are written by
+            # OpenSesame, so we usually don't need to read any further
+            for tarinfo in tar:
+                if tarinfo.name == u'script.opensesame':
+                    break
+            else:
+                raise InvalidOpenSesameScript(
+                    f'{self._src} does not contain an experiment script')
+            with io.TextIOWrapper(tar.extractfile(tarinfo),
+                                  encoding=u'utf-8') as fd:
+                self._script = fd.read()
+        except Exception:
+            tar.close()
+            raise
+        # Filenames are encoded with U+XXXX notation in the archive. This is
+        # necessary to deal with absence of good unicode support in .tar.gz.
+        self._pool.extract_tarfile(tar, rename=self._syntax.from_ascii)
@@ -17,20 +17,46 @@ You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
+import gzip
+import hashlib
 import os
 import tarfile
 import tempfile
+import time
 import shutil
+from libopensesame.exceptions import InvalidValue
 from libopensesame.osexpfile import OSExpBase
 from libopensesame.oslogging import oslogger
 
+# Files with these extensions are already compressed, and are therefore stored
+# in the archive without compression
+COMPRESSED_EXTENSIONS = {
+    u'.png', u'.jpg', u'.jpeg', u'.gif', u'.webp', u'.mp3', u'.ogg',
+    u'.oga', u'.m4a', u'.aac', u'.flac', u'.mp4', u'.m4v', u'.webm', u'.mkv',
+    u'.avi', u'.mov', u'.zip', u'.gz', u'.bz2', u'.xz', u'.7z', u'.npz'
+}
+CHUNK_SIZE = 1024 ** 2
+# Each member of an archive is written as a separate gzip stream, which means
+# that an unchanged pool file can be copied as-is from an archive that was
+# written before. The index maps (archive name, content hash, compression
+# level) to (archive path, archive stat, offset, length, member size), where
+# the member size is the uncompressed size of the member including its header.
+_segments = {}
+# Maps pool-file paths to (size, mtime, content hash), so that unchanged files
+# don't need to be hashed again
+_digests = {}
+
 
 class OSExpWriter(OSExpBase):
 
     r"""A writer of osexp files. The format (plain text or tar.gz) depends on
     whether the file pool contains files.
+
+    Archives are written as a series of gzip streams, one for each file, which
+    is still a regular .tar.gz file. This allows unchanged pool files to be
+    reused from a previously written archive without compressing them again.
     """
-    def __init__(self, exp, path):
+    def __init__(self, exp, path, compresslevel=6, reuse_pool_files=True):
         r"""Constructor.
 
         Parameters
@@ -39,10 +65,24 @@ class OSExpWriter(OSExpBase):
             An experiment object.
         path : str
             A path to the experiment file.
+        compresslevel : int, optional
+            The gzip compression level from 0 (no compression) to 9. Pool
+            files that are already compressed, such as images and sounds, are
+            never compressed again. New in 4.0.0
+        reuse_pool_files : bool, optional
+            Indicates whether pool files that have not changed since they
+            were last saved are copied from the previously saved archive, if
+            it still exists. New in 4.0.0
         """
         super().__init__(exp)
+        if compresslevel not in range(10):
+            raise InvalidValue(
+                f'compresslevel should be between 0 and 9, not '
+                f'{compresslevel}')
         self._path = path
         self._experiment_path = os.path.dirname(path)
+        self._compresslevel = compresslevel
+        self._reuse_pool_files = reuse_pool_files
         if self.format == 'scriptfile':
             self._write_scriptfile()
         elif self.format == 'tarfile':
@@ -65,34 +105,197 @@ class OSExpWriter(OSExpBase):
             fd.write(self.script)
 
     def _write_tarfile(self):
-        r"""Writes a .tar.gz file."""
-        # Write the script to a text file in the file pool
-        script_path = os.path.join(self._pool.folder(), u'script.opensesame')
-        with safe_open(script_path, u'w') as fd:
-            fd.write(self.script)
-        # Create the archive in a a temporary folder and move it afterwards.
-        # This hack is needed, because tarfile fails on a Unicode path.
+        r"""Writes a .tar.gz file. The script and the pool files are streamed
+        directly into the archive.
+        """
+        # Create the archive in a a temporary folder and move it afterwards,
+        # so that an existing file is not corrupted if writing fails
         tmp_path = tempfile.mktemp(suffix=u'.osexp')
-        tar = tarfile.open(tmp_path, u'w:gz')
-        tar.add(script_path, u'script.opensesame')
-        os.remove(script_path)
-        # We also create a temporary pool folder, where all the filenames are
-        # Unicode sanitized to ASCII format. Again, this is necessary to deal
-        # with poor Unicode support in .tar.gz.
-        tmp_pool = tempfile.mkdtemp(suffix=u'.opensesame.pool')
-        for fname in os.listdir(self._pool.folder()):
-            src = os.path.join(self._pool.folder(), fname)
-            if not os.path.isfile(src):
-                oslogger.warning('{} is not a file'.format(src))
-                continue
-            dst = os.path.join(tmp_pool, self._syntax.to_ascii(fname))
-            shutil.copyfile(src, dst)
-        tar.add(tmp_pool, u'pool', True)
-        tar.close()
-        # Move the file to the intended location
-        shutil.move(tmp_path, self._path)
-        # Clean up the temporary pool folder
+        segments = {}
         try:
-            shutil.rmtree(tmp_pool)
-        except:
-            pass
+            with open(tmp_path, u'wb') as fd:
+                script = safe_encode(self.script)
+                size = self._write_member(fd, u'script.opensesame', script,
+                                          len(script), self._compresslevel)
+                pool_folder = self._pool.folder()
+                for fname in sorted(os.listdir(pool_folder)):
+                    src = os.path.join(pool_folder, fname)
+                    if not os.path.isfile(src):
+                        oslogger.warning('{} is not a file'.format(src))
+                        continue
+                    # Filenames are Unicode sanitized to ASCII format, because
+                    # of poor Unicode support in .tar.gz.
+                    size += self._write_pool_file(
+                        fd, src, u'pool/' + self._syntax.to_ascii(fname),
+                        segments)
+                # An archive ends with two empty blocks, and is padded to a
+                # full record
+                padding = 2 * tarfile.BLOCKSIZE
+                padding += -(size + padding) % tarfile.RECORDSIZE
+                self._write_member(fd, None, bytes(padding), padding,
+                                   self._compresslevel)
+            # Move the file to the intended location
+            shutil.move(tmp_path, self._path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        # Remember where the pool files are, so that they can be reused
+        path = os.path.abspath(self._path)
+        stat = _archive_stat(path)
+        for key, segment in list(_segments.items()):
+            if segment[0] == path:
+                del _segments[key]
+        for key, (offset, length, member_size) in segments.items():
+            _segments[key] = path, stat, offset, length, member_size
+
+    def _write_pool_file(self, fd, src, arcname, segments):
+        r"""Writes a pool file to the archive, either by copying it from a
+        previously written archive or by compressing it.
+
+        Parameters
+        ----------
+        fd : file
+            The archive.
+        src : str
+            The path to the pool file.
+        arcname : str
+            The name of the file in the archive.
+        segments : dict
+            A dict to which the location of the file in the archive is added.
+
+        Returns
+        -------
+        int
+            The uncompressed size of the member, including the header.
+        """
+        level = 0 if os.path.splitext(src)[1].lower() \
+            in COMPRESSED_EXTENSIONS else self._compresslevel
+        st = os.stat(src)
+        offset = fd.tell()
+        if self._reuse_pool_files:
+            key = arcname, _content_hash(src, st), level
+            size = _copy_segment(fd, key)
+            if size is not None:
+                segments[key] = offset, fd.tell() - offset, size
+                return size
+        with open(src, u'rb') as src_fd:
+            size = self._write_member(fd, arcname, src_fd, st.st_size, level,
+                                      mtime=st.st_mtime,
+                                      mode=st.st_mode & 0o777)
+        if self._reuse_pool_files:
+            segments[key] = offset, fd.tell() - offset, size
+        return size
+
+    def _write_member(self, fd, arcname, data, size, compresslevel,
+                      mtime=None, mode=0o644):
+        r"""Writes a single member as a separate gzip stream.
+
+        Parameters
+        ----------
+        fd : file
+            The archive.
+        arcname : str or None
+            The name of the file in the archive, or None to write only the
+            data, without a header.
+        data : bytes or file
+            The data.
+        size : int
+            The size of the data.
+        compresslevel : int
+            The gzip compression level.
+        mtime : float, optional
+            The modification time, or None for the current time.
+        mode : int, optional
+            The file permissions.
+
+        Returns
+        -------
+        int
+            The uncompressed size of the member, including the header.
+        """
+        with gzip.GzipFile(fileobj=fd, mode=u'wb', mtime=0,
+                           compresslevel=compresslevel) as gz:
+            if arcname is not None:
+                tarinfo = tarfile.TarInfo(arcname)
+                tarinfo.size = size
+                tarinfo.mode = mode
+                tarinfo.mtime = int(time.time() if mtime is None else mtime)
+                header = tarinfo.tobuf(tarfile.PAX_FORMAT)
+                gz.write(header)
+            else:
+                header = b''
+            if isinstance(data, bytes):
+                gz.write(data)
+            else:
+                remaining = size
+                while remaining:
+                    chunk = data.read(min(CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise OSError(f'{arcname} changed while saving')
+                    gz.write(chunk)
+                    remaining -= len(chunk)
+            if arcname is not None:
+                gz.write(bytes(-size % tarfile.BLOCKSIZE))
+        return len(header) + size + (-size % tarfile.BLOCKSIZE
+                                     if arcname is not None else 0)
+
+
+def _archive_stat(path):
+    r"""Returns a tuple that identifies a specific version of a file."""
+    st = os.stat(path)
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _content_hash(path, st):
+    r"""Returns the SHA-1 hash of the contents of a file, which is only
+    recomputed if the size or modification time of the file has changed.
+    """
+    version = st.st_size, st.st_mtime_ns
+    cached = _digests.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    h = hashlib.sha1()
+    with open(path, u'rb') as fd:
+        for chunk in iter(lambda: fd.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    digest = h.hexdigest()
+    _digests[path] = version, digest
+    return digest
+
+
+def _copy_segment(fd, key):
+    r"""Copies a gzip stream from a previously written archive, if the archive
+    still exists and hasn't changed.
+
+    Returns
+    -------
+    int or None
+        The uncompressed size of the member, including the header, if the
+        stream was copied, or None otherwise.
+    """
+    segment = _segments.get(key)
+    if segment is None:
+        return None
+    path, stat, offset, length, member_size = segment
+    start = fd.tell()
+    try:
+        if _archive_stat(path) != stat:
+            raise OSError(f'{path} has changed')
+        with open(path, u'rb') as src_fd:
+            src_fd.seek(offset)
+            remaining = length
+            while remaining:
+                chunk = src_fd.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise OSError(f'{path} is truncated')
+                fd.write(chunk)
+                remaining -= len(chunk)
+    except OSError as e:
+        oslogger.debug(f'cannot reuse {key[0]}: {e}')
+        del _segments[key]
+        # Discard anything that has been written already
+        fd.seek(start)
+        fd.truncate()
+        return None
+    return member_size
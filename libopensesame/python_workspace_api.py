@@ -25,6 +25,7 @@ from libopensesame.py3compat import *
 import random
 import math
 import warnings
+import numpy as np
 # The classes below are unused, but imported so that they are available in the
 # workspace.
 from openexp.canvas_elements import (Rect, Line, Text, Ellipse, Circle,
@@ -353,9 +354,9 @@ def xy_from_polar(rho, phi, pole=(0, 0)):
 
     Parameters
     ----------
-    rho : float
+    rho : float, array-like
         The radial coordinate, also distance or eccentricity.
-    phi : float
+    phi : float, array-like
         The angular coordinate. This reflects a clockwise rotation in degrees
         (i.e. not radians), where 0 is straight right.
     pole : tuple, optional
@@ -364,7 +365,8 @@ def xy_from_polar(rho, phi, pole=(0, 0)):
     Returns
     -------
     tuple
-        An (x, y) coordinate tuple.
+        An (x, y) coordinate tuple. If `rho` or `phi` is array-like (new in
+        4.0.0), x and y are NumPy arrays.
 
     Examples
     --------
@@ -375,7 +377,17 @@ def xy_from_polar(rho, phi, pole=(0, 0)):
     >>> c.line(x1, y1, -x1, -y1)
     >>> c.line(x2, y2, -x2, -y2)
     >>> c.show()
+    >>> # Get the coordinates of points on a spiral
+    >>> x, y = xy_from_polar(range(0, 100, 10), range(0, 360, 36))
     """
+    if _is_array_like(rho) or _is_array_like(phi):
+        try:
+            rho = np.asarray(rho, dtype=float)
+            phi = np.radians(np.asarray(phi, dtype=float))
+        except (ValueError, TypeError):
+            raise TypeError('rho and phi should be numeric in xy_from_polar()')
+        ox, oy = parse_pole(pole)
+        return rho * np.cos(phi) + ox, rho * np.sin(phi) + oy
     try:
         rho = float(rho)
     except:
@@ -397,9 +409,9 @@ def xy_to_polar(x, y, pole=(0, 0)):
 
     Parameters
     ----------
-    x : float
+    x : float, array-like
         The X coordinate.
-    y : float
+    y : float, array-like
         The Y coordinate.
     pole : tuple, optional
         The refence point.
@@ -410,12 +422,24 @@ def xy_to_polar(x, y, pole=(0, 0)):
         An (rho, phi) coordinate tuple. Here, `rho` is the radial coordinate,
         also distance or eccentricity. `phi` is the angular coordinate in
         degrees (i.e. not radians), and reflects a counterclockwise rotation,
-        where 0 is straight right.
+        where 0 is straight right. If `x` or `y` is array-like (new in 4.0.0),
+        rho and phi are NumPy arrays.
 
     Examples
     --------
     >>> rho, phi = xy_to_polar(100, 100)
+    >>> rho, phi = xy_to_polar([100, 0, -100], [0, 100, 0])
     """
+    if _is_array_like(x) or _is_array_like(y):
+        try:
+            x = np.asarray(x, dtype=float)
+            y = np.asarray(y, dtype=float)
+        except (ValueError, TypeError):
+            raise TypeError('x and y should be numeric in xy_to_polar()')
+        ox, oy = parse_pole(pole)
+        dx = x - ox
+        dy = y - oy
+        return np.sqrt(dx ** 2 + dy ** 2), np.degrees(np.arctan2(dy, dx))
     try:
         x = float(x)
     except:
@@ -461,7 +485,7 @@ def xy_distance(x1, y1, x2, y2):
     return math.sqrt((x1-x2)**2+(y1-y2)**2)
 
 
-def xy_circle(n, rho, phi0=0, pole=(0, 0)):
+def xy_circle(n, rho, phi0=0, pole=(0, 0), as_array=False):
     r"""Generates a list of points (x,y coordinates) in a circle. This can be
     used to draw stimuli in a circular arrangement.
 
@@ -478,11 +502,14 @@ def xy_circle(n, rho, phi0=0, pole=(0, 0)):
         straight right.
     pole : tuple, optional
         The refence point.
+    as_array : bool, optional
+        Indicates whether the points should be returned as an n x 2 NumPy
+        array, rather than a list. New in 4.0.0
 
     Returns
     -------
-    list
-        A list of (x,y) coordinate tuples.
+    list, ndarray
+        A list of (x,y) coordinate tuples, or an array if `as_array` is True.
 
     Examples
     --------
@@ -503,14 +530,15 @@ def xy_circle(n, rho, phi0=0, pole=(0, 0)):
         phi0 = float(phi0)
     except (ValueError, TypeError):
         raise TypeError('phi0 should be numeric in xy_circle()')
-    l = []
-    for i in range(n):
-        l.append(xy_from_polar(rho, phi0, pole=pole))
-        phi0 += 360./n
-    return l
+    try:
+        rho = float(rho)
+    except (ValueError, TypeError):
+        raise TypeError('rho should be numeric in xy_circle()')
+    phi = phi0 + np.arange(n) * (360. / max(n, 1))
+    return _xy_result(*xy_from_polar(rho, phi, pole=pole), as_array)
 
 
-def xy_grid(n, spacing, pole=(0, 0)):
+def xy_grid(n, spacing, pole=(0, 0), as_array=False):
     r"""Generates a list of points (x,y coordinates) in a grid. This can be
     used to draw stimuli in a grid arrangement.
 
@@ -525,11 +553,15 @@ def xy_grid(n, spacing, pole=(0, 0)):
         (col_spacing, row_spacing) tuple.
     pole : tuple, optional
         The refence point.
+    as_array : bool, optional
+        Indicates whether the points should be returned as an n x 2 NumPy
+        array, rather than a list. New in 4.0.0
 
     Returns
     -------
-    list
-        A list of (x,y) coordinate tuples.
+    list, ndarray
+        A list of (x,y) coordinate tuples, or an array if `as_array` is True.
+        The points are ordered row by row.
 
     Examples
     --------
@@ -565,16 +597,12 @@ def xy_grid(n, spacing, pole=(0, 0)):
         raise ValueError('spacing should be a non-negative numeric or a '
                          'tuple of two non-negative numerics in xy_grid()')
     pole = parse_pole(pole)
-    l = []
-    for row in range(n_row):
-        y = (row - (n_row-1) / 2.) * s_row + pole[1]
-        for col in range(n_col):
-            x = (col - (n_col-1) / 2.) * s_col + pole[0]
-            l.append((x, y))
-    return l
+    y = (np.arange(n_row) - (n_row-1) / 2.) * s_row + pole[1]
+    x = (np.arange(n_col) - (n_col-1) / 2.) * s_col + pole[0]
+    return _xy_result(np.tile(x, n_row), np.repeat(y, n_col), as_array)
 
 
-def xy_random(n, width, height, min_dist=0, pole=(0, 0)):
+def xy_random(n, width, height, min_dist=0, pole=(0, 0), as_array=False):
     r"""Generates a list of random points (x,y coordinates) with a minimum
     spacing between each pair of points. This function will raise an
     Exception when the coordinate list cannot be generated,  typically because
@@ -593,11 +621,14 @@ def xy_random(n, width, height, min_dist=0, pole=(0, 0)):
         The minimum distance between each point.
     pole : tuple, optional
         The refence point.
+    as_array : bool, optional
+        Indicates whether the points should be returned as an n x 2 NumPy
+        array, rather than a list. New in 4.0.0
 
     Returns
     -------
-    list
-        A list of (x,y) coordinate tuples.
+    list, ndarray
+        A list of (x,y) coordinate tuples, or an array if `as_array` is True.
 
     Examples
     --------
@@ -626,27 +657,37 @@ def xy_random(n, width, height, min_dist=0, pole=(0, 0)):
         min_dist = float(min_dist)
     except:
         raise TypeError('min_dist should be numeric in xy_random()')
-    pole = parse_pole(pole)
+    ox, oy = parse_pole(pole)
+    rand = random.random
     max_try = 1000
     for t1 in range(max_try):
         l = []
+        # Accepted points are hashed into square cells with a size of
+        # min_dist, so that a new point only needs to be checked against
+        # points in the same and the eight neighboring cells
+        cells = {}
         for i in range(n):
             for t2 in range(max_try):
-                x1 = (random.random()-.5)*width + pole[0]
-                y1 = (random.random()-.5)*height + pole[1]
-                for x2, y2 in l:
-                    if xy_distance(x1, y1, x2, y2) < min_dist:
-                        break
-                else:
-                    # Point does not collide, so add to the list
+                x1 = (rand()-.5)*width + ox
+                y1 = (rand()-.5)*height + oy
+                if min_dist <= 0:
                     l.append((x1, y1))
                     break
+                cell = math.floor(x1 / min_dist), math.floor(y1 / min_dist)
+                if _collides(cells, cell, x1, y1, min_dist):
+                    continue
+                # Point does not collide, so add to the list
+                cells.setdefault(cell, []).append((x1, y1))
+                l.append((x1, y1))
+                break
             else:
                 # All level-2 tries have failed, so break to start a new level-1
                 # try.
                 break
         else:
             # All points have been successfully added, so return the list
+            if as_array:
+                return np.array(l, dtype=float).reshape(n, 2)
             return l
     # All level-1 tries have failed
     raise RuntimeError('Failed to generate random coordinates in xy_random()')
@@ -669,6 +710,35 @@ def parse_pole(pole):
     return ox, oy
 
 
+def _is_array_like(value):
+    """
+    visible: False
+    """
+    return isinstance(value, (np.ndarray, list, tuple, range))
+
+
+def _xy_result(x, y, as_array):
+    """
+    visible: False
+    """
+    if as_array:
+        return np.column_stack((x, y))
+    return list(zip(x.tolist(), y.tolist()))
+
+
+def _collides(cells, cell, x1, y1, min_dist):
+    """
+    visible: False
+    """
+    cx, cy = cell
+    for gx in (cx - 1, cx, cx + 1):
+        for gy in (cy - 1, cy, cy + 1):
+            for x2, y2 in cells.get((gx, gy), ()):
+                if math.sqrt((x1-x2)**2+(y1-y2)**2) < min_dist:
+                    return True
+    return False
+
+
 def set_aliases():
     """
     visible: False
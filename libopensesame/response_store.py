@@ -108,8 +108,7 @@ class ResponseStore:
             The experiment object.
         """
         self._experiment = experiment
-        self._responses = []
-        self._feedback_from = 0
+        self.clear()
 
     @property
     def acc(self):
@@ -121,10 +120,9 @@ class ResponseStore:
         --------
         >>> print('The accuracy was %s%%' % responses.acc)
         """
-        l = self._select(feedback=True)._selectnot(correct=None).correct
-        if not l:
+        if not self._feedback_correct_count:
             return u'undefined'
-        return 100.*sum(l)/len(l)
+        return 100. * self._feedback_correct_sum / self._feedback_correct_count
 
     @property
     def avg_rt(self):
@@ -136,11 +134,9 @@ class ResponseStore:
         --------
         >>> print('The average RT was %s ms' % responses.avg_rt)
         """
-        l = self._select(feedback=True)._selectnot(response_time=None) \
-                .response_time
-        if not l:
+        if not self._feedback_rt_count:
             return u'undefined'
-        return 1.*sum(l)/len(l)
+        return 1. * self._feedback_rt_sum / self._feedback_rt_count
 
     @property
     def response(self):
@@ -152,7 +148,7 @@ class ResponseStore:
         >>> for response in responses.response:
         >>>         print(response)
         """
-        return [r.response for r in self._responses]
+        return self._response[::-1]
 
     @property
     def correct(self):
@@ -163,7 +159,7 @@ class ResponseStore:
         >>> for correct in responses.correct:
         >>>         print(correct)
         """
-        return [r.correct for r in self._responses]
+        return self._correct[::-1]
 
     @property
     def response_time(self):
@@ -174,7 +170,7 @@ class ResponseStore:
         >>> for rt in responses.response_time:
         >>>         print(rt)
         """
-        return [r.response_time for r in self._responses]
+        return self._response_time[::-1]
 
     @property
     def item(self):
@@ -186,7 +182,7 @@ class ResponseStore:
         >>> for item in responses.item:
         >>>         print(item)
         """
-        return [r.item for r in self._responses]
+        return self._item[::-1]
 
     @property
     def feedback(self):
@@ -198,7 +194,8 @@ class ResponseStore:
         >>> for feedback in responses.feedback:
         >>>         print(feedback)
         """
-        return [r.feedback for r in self._responses]
+        return [self._feedback_at(i)
+                for i in range(len(self._response) - 1, -1, -1)]
 
     @property
     def var(self):
@@ -233,7 +230,8 @@ class ResponseStore:
             correct = u'undefined'
         else:
             correct = r.correct
-        self._responses.insert(0, r)
+        self._append(r.response, r.correct, r.response_time, r.item,
+                     r.feedback)
         self.var.response = self._experiment.syntax.sanitize(r.response)
         self.var.response_time = r.response_time
         self.var.correct = correct
@@ -245,13 +243,11 @@ class ResponseStore:
         self.var.acc = self.var.accuracy = self.acc
         self.var.avg_rt = self.avg_rt
         # Old variables, mostly for backwards compatibility
-        rs = self._select(feedback=True)
         self.var.accuracy = self.var.acc
         self.var.average_response_time = self.var.avg_rt
-        self.var.total_response_time = sum(
-            rs._selectnot(response_time=None).response_time)
-        self.var.total_responses = len(rs)
-        self.var.total_correct = len(rs._select(correct=1))
+        self.var.total_response_time = self._feedback_rt_sum
+        self.var.total_responses = self._feedback_count
+        self.var.total_correct = self._feedback_correct_sum
 
     def clear(self):
         r"""Clears all responses.
@@ -260,7 +256,14 @@ class ResponseStore:
         --------
         >>> responses.clear()
         """
-        self._responses = []
+        # Responses are stored in order of arrival, as one list per attribute
+        self._response = []
+        self._correct = []
+        self._response_time = []
+        self._item = []
+        self._feedback = []
+        self._feedback_from = 0
+        self._reset_counters()
 
     def reset_feedback(self):
         r"""Sets the feedback status of all responses to False, so that only
@@ -270,37 +273,98 @@ class ResponseStore:
         --------
         >>> responses.reset_feedback()
         """
-        for r in self._responses:
-            r.feedback = False
+        # Responses that were added before _feedback_from are not included in
+        # feedback, regardless of their own feedback status
+        self._feedback_from = len(self._response)
+        self._reset_counters()
+
+    def _reset_counters(self):
+        r"""Resets the running counts and sums of the responses that are
+        included in feedback.
+        """
+        self._feedback_count = 0
+        self._feedback_correct_count = 0
+        self._feedback_correct_sum = 0
+        self._feedback_rt_count = 0
+        self._feedback_rt_sum = 0
+
+    def _append(self, response, correct, response_time, item, feedback):
+        r"""Appends a response and updates the running counters."""
+        self._response.append(response)
+        self._correct.append(correct)
+        self._response_time.append(response_time)
+        self._item.append(item)
+        self._feedback.append(feedback)
+        if feedback != True:
+            return
+        self._feedback_count += 1
+        if correct is not None:
+            self._feedback_correct_count += 1
+            self._feedback_correct_sum += correct
+        if response_time is not None:
+            self._feedback_rt_count += 1
+            self._feedback_rt_sum += response_time
+
+    def _feedback_at(self, index):
+        r"""Gets the feedback status of a response by its position in order of
+        arrival, taking into account reset_feedback().
+        """
+        return False if index < self._feedback_from else self._feedback[index]
 
-    def _select(self, **kwdict):
+    def _info_at(self, index):
+        r"""Creates a response object for a response by its position in order
+        of arrival.
+        """
+        return ResponseInfo(self, response=self._response[index],
+                            correct=self._correct[index],
+                            response_time=self._response_time[index],
+                            item=self._item[index],
+                            feedback=self._feedback_at(index))
 
+    def _subset(self, indices):
+        r"""Creates a new response store with a subset of the responses.
+
+        Parameters
+        ----------
+        indices : iterable
+            Positions of responses in order of arrival.
+        """
         rs = ResponseStore(self._experiment)
-        for r in self._responses:
-            if r.match(**kwdict):
-                rs._responses.append(r)
+        for i in indices:
+            rs._append(self._response[i], self._correct[i],
+                       self._response_time[i], self._item[i],
+                       self._feedback_at(i))
         return rs
 
+    def _select(self, **kwdict):
+
+        return self._subset(i for i in range(len(self))
+                            if self._info_at(i).match(**kwdict))
+
     def _selectnot(self, **kwdict):
 
-        rs = ResponseStore(self._experiment)
-        for r in self._responses:
-            if r.matchnot(**kwdict):
-                rs._responses.append(r)
-        return rs
+        return self._subset(i for i in range(len(self))
+                            if self._info_at(i).matchnot(**kwdict))
 
     def __len__(self):
 
-        return len(self._responses)
+        return len(self._response)
 
     def __getitem__(self, key):
 
+        # Keys index responses in reverse order of arrival, so that the last
+        # response comes first
         if isinstance(key, slice):
-            rs = ResponseStore(self._experiment)
-            rs._responses = self._responses[key]
-            return rs
+            n = len(self)
+            return self._subset(reversed([n - 1 - i
+                                          for i in range(n)[key]]))
         if isinstance(key, int):
-            return self._responses[key]
+            n = len(self)
+            if key < 0:
+                key += n
+            if not 0 <= key < n:
+                raise IndexError(u'response index out of range')
+            return self._info_at(n - 1 - key)
         raise TypeError(u'A key for responses should be either slice or int')
 
     def __str__(self):
@@ -312,8 +376,8 @@ class ResponseStore:
 
     def __iter__(self):
 
-        for r in self._responses:
-            yield r
+        for i in range(len(self) - 1, -1, -1):
+            yield self._info_at(i)
 
 
 # Alias for backwards compatibility
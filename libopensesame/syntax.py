@@ -16,7 +16,6 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
-import shlex
 import re
 import codecs
 import os
@@ -38,6 +37,92 @@ PYTHON_CONDITIONAL_DEPRECATION_WARNING = 'Starting a conditiional statement ' \
 SQUARE_BRACKET_CONDITIONAL_DEPRECATION_WARNING = 'The square-bracket ' \
     'notation is deprecated and will be removed in future versions of ' \
     'OpenSesame. Use Python expressions instead.'
+# The maximum number of compiled texts that eval_text() keeps in memory
+TEXT_TEMPLATE_CACHE_SIZE = 4096
+# Markers for texts that are not compiled into a TextTemplate
+_LITERAL_TEXT = 'literal'
+_FSTRING_TEXT = 'fstring'
+_LEGACY_TEXT = 'legacy'
+# The maximum number of split lines and parsed commands that split() and
+# parse_cmd() keep in memory
+SPLIT_CACHE_SIZE = 65536
+# Regular expressions for split_line(). Only space, tab, carriage return, and
+# newline count as whitespace, as in shlex.
+_WORD = re.compile(r'[^ \t\r\n]+')
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_TOKEN = re.compile(
+    r'''(?:[^ \t\r\n'"\\]+|\\.|'[^']*'|"(?:[^"\\]|\\.)*")+''', re.S)
+_TOKEN_PART = re.compile(
+    r'''([^ \t\r\n'"\\]+)|\\(.)|'([^']*)'|"((?:[^"\\]|\\.)*)"''', re.S)
+_QUOTED_ESCAPE = re.compile(r'\\(["\\])')
+
+
+def split_line(s):
+    r"""Splits a line into tokens in the same way as `shlex.split()` does in
+    POSIX mode: tokens are separated by whitespace, single quotes preserve
+    everything, double quotes preserve everything except escaped double
+    quotes and backslashes, and outside of quotes a backslash escapes any
+    character. Quoted and unquoted parts without whitespace in between form a
+    single token.
+
+    Parameters
+    ----------
+    s : str
+        The line to split.
+
+    Returns
+    -------
+    list
+        A list of tokens.
+    """
+    if u'"' not in s and u"'" not in s and u'\\' not in s:
+        return _WORD.findall(s)
+    tokens = []
+    pos = _WHITESPACE.match(s).end()
+    while pos < len(s):
+        m = _TOKEN.match(s, pos)
+        if m is None:
+            raise ValueError(u'No closing quotation or escaped character')
+        token = m.group()
+        if u'"' in token or u"'" in token or u'\\' in token:
+            parts = []
+            for word, escaped, single, double in _TOKEN_PART.findall(token):
+                if double:
+                    parts.append(_QUOTED_ESCAPE.sub(r'\1', double))
+                else:
+                    parts.append(word or escaped or single)
+            token = u''.join(parts)
+        tokens.append(token)
+        pos = _WHITESPACE.match(s, m.end()).end()
+    return tokens
+
+
+class TextTemplate:
+
+    r"""A text with square-bracket variable references ([width]) and inline
+    Python expressions ([=10*10]), which has been parsed into a list of parts
+    by Syntax.compile_text(). Literal parts are strings, and the placeholders
+    for variables and expressions are filled in when the template is
+    rendered.
+
+    Parameters
+    ----------
+    parts : list
+        The parts of the text, where placeholders are None.
+    variables : list
+        A list of (index, escape, name) tuples, where index is the index of
+        the placeholder in parts, escape is the escape sequence that precedes
+        the value, and name is the variable name.
+    expressions : list
+        A list of (index, escape, bytecode, source) tuples, where source is
+        the original text of the inline expression, including brackets.
+    """
+    __slots__ = 'parts', 'variables', 'expressions'
+
+    def __init__(self, parts, variables, expressions):
+        self.parts = parts
+        self.variables = variables
+        self.expressions = expressions
 
 
 class Syntax:
@@ -92,6 +177,13 @@ class Syntax:
         # Unsanitization is used to replace U+XXXX unicode notation
         self.re_from_ascii = re.compile(r'U\+([A-F0-9]{4})')
         self.re_front_matter = re.compile(r'---(?P<info>.*?)---', re.S)
+        # Texts are compiled once by compile_text(), and the result is cached
+        # here with the text as key.
+        self._templates = {}
+        # Split lines and parsed commands are cached here with the line,
+        # without leading whitespace, as key
+        self._tokens = {}
+        self._commands = {}
 
     def auto_type(self, val):
         r"""Casts a value to its best-fitting type, i.e. float, int, or
@@ -173,8 +265,10 @@ class Syntax:
             allow_unicode=True))
 
     def split(self, s):
-        r"""A unicode-safe bash-style split function. This is a wrapper around
-        shlex.split() which is not unicode-safe on Python 2.
+        r"""A bash-style split function, which gives the same result as
+        shlex.split(). The tokens are cached, so that lines that are split
+        repeatedly while an experiment is parsed, for example first by the
+        experiment and then by an item, are tokenized only once.
 
         Parameters
         ----------
@@ -186,12 +280,21 @@ class Syntax:
         list
             The string split into a list.
         """
-        try:
-            return shlex.split(s)
-        except Exception as e:
-            raise InvalidOpenSesameScript(f'Failed to parse line "{s}". Is '
-                                          f'there a closing quotation '
-                                          f'missing?')
+        # Leading whitespace doesn't affect the tokens, so lines that differ
+        # only in indentation share a cache entry
+        key = s.lstrip(u' \t\r\n')
+        tokens = self._tokens.get(key)
+        if tokens is None:
+            try:
+                tokens = tuple(split_line(key))
+            except Exception as e:
+                raise InvalidOpenSesameScript(f'Failed to parse line "{s}". '
+                                              f'Is there a closing quotation '
+                                              f'missing?')
+            if len(self._tokens) >= SPLIT_CACHE_SIZE:
+                self._tokens.clear()
+            self._tokens[key] = tokens
+        return list(tokens)
 
     def parse_cmd(self, cmd):
         """Parses OpenSesame command strings, which consist of a command,
@@ -214,7 +317,12 @@ class Syntax:
         tuple
             A (command, arglist, kwdict) tuple.
         """
-        l = self.split(cmd)
+        key = cmd.lstrip(u' \t\r\n')
+        parsed = self._commands.get(key)
+        if parsed is not None:
+            cmd, arglist, kwdict = parsed
+            return cmd, list(arglist), dict(kwdict)
+        l = self.split(key)
         if len(l) == 0:
             return None, [], {}
         cmd = l[0]
@@ -228,6 +336,9 @@ class Syntax:
                 kwdict[arg] = self.auto_type(val)
             else:
                 arglist.append(self.auto_type(s))
+        if len(self._commands) >= SPLIT_CACHE_SIZE:
+            self._commands.clear()
+        self._commands[key] = cmd, tuple(arglist), tuple(kwdict.items())
         return cmd, arglist, kwdict
 
     def create_cmd(self, cmd, arglist=[], kwdict={}):
@@ -282,16 +393,167 @@ class Syntax:
 
         if not isinstance(txt, str):
             return txt
-        if self.re_fstring.search(txt):
+        template = self._template(txt)
+        if template is _LITERAL_TEXT:
+            return txt
+        if template is _FSTRING_TEXT:
             return self.experiment.python_workspace.eval_fstring(txt)
-        
-        def get_escape_sequence(m):
-            return u'' if m.group(1) is None \
-                else m.group(1)[:len(m.group(1))//2]
         if var is None:
             var = self.experiment.var
-        if round_float:
-            float_template = u'%%.%sf' % var.round_decimals
+        if template is _LEGACY_TEXT:
+            return self._eval_square_brackets(txt, round_float, var)
+        return self._render_template(template, txt, round_float, var)
+
+    def is_literal_text(self, txt):
+        r"""Checks whether a value evaluates to itself, that is, whether it is
+        not a string, or a string without variable references, inline Python
+        expressions, or f-string expressions.
+
+        Parameters
+        ----------
+        txt
+            The value to check.
+
+        Returns
+        -------
+        bool
+        """
+        return not isinstance(txt, str) or \
+            self._template(txt) is _LITERAL_TEXT
+
+    def _template(self, txt):
+        r"""Gets the compiled template for a text from the cache, or compiles
+        it and adds it to the cache.
+        """
+        template = self._templates.get(txt)
+        if template is None:
+            template = self.compile_text(txt)
+            if len(self._templates) >= TEXT_TEMPLATE_CACHE_SIZE:
+                self._templates.clear()
+            self._templates[txt] = template
+        return template
+
+    def compile_text(self, txt):
+        r"""Parses a text into a TextTemplate, so that square-bracket variable
+        references and inline Python expressions don't need to be searched
+        for every time that the text is evaluated.
+
+        Templates are only created for texts in which the literal parts
+        contain no square brackets, and in which variable references and
+        inline expressions don't overlap. For such texts, rendering the
+        template gives the same result as repeatedly searching and replacing
+        references, as long as the values contain no square brackets and
+        don't end with a backslash (which is checked during rendering).
+
+        Parameters
+        ----------
+        txt : str
+            The text to compile.
+
+        Returns
+        -------
+        TextTemplate or str
+            A TextTemplate, or a marker indicating that the text is literal,
+            an f-string, or should be evaluated without a template.
+        """
+        if self.re_fstring.search(txt):
+            return _FSTRING_TEXT
+        var_matches = list(self.re_txt.finditer(txt))
+        py_matches = list(self.re_txt_py.finditer(txt))
+        if not var_matches and not py_matches:
+            if u'\\[' in txt or u'\\]' in txt:
+                return _LEGACY_TEXT
+            return _LITERAL_TEXT
+        matches = sorted(var_matches + py_matches, key=lambda m: m.start(0))
+        parts = []
+        variables = []
+        expressions = []
+        pos = 0
+        for m in matches:
+            if m.start(0) < pos:
+                # Overlapping variable references and inline expressions
+                return _LEGACY_TEXT
+            literal = txt[pos:m.start(0)]
+            if u'[' in literal or u']' in literal:
+                return _LEGACY_TEXT
+            if literal:
+                parts.append(literal)
+            escape = self._escape_sequence(m)
+            if m.re is self.re_txt:
+                variables.append((len(parts), escape, m.group(2)[1:-1]))
+            else:
+                try:
+                    bytecode = compile(self.unescape(m.group(2)[2:-1]),
+                                       u'<string>', u'eval')
+                except SyntaxError:
+                    # Let the error occur during evaluation, as before
+                    return _LEGACY_TEXT
+                expressions.append((len(parts), escape, bytecode,
+                                    m.group(0)))
+            parts.append(None)
+            pos = m.end(0)
+        literal = txt[pos:]
+        if u'[' in literal or u']' in literal:
+            return _LEGACY_TEXT
+        if literal:
+            parts.append(literal)
+        return TextTemplate(parts, variables, expressions)
+
+    def _render_template(self, template, txt, round_float, var):
+        r"""Renders a TextTemplate. If a value contains characters that could
+        change how the rest of the text is interpreted, evaluation falls back
+        to searching and replacing, so that the result remains the same.
+        """
+        warnings.warn(SQUARE_BRACKET_TEXT_DEPRECATION_WARNING,
+                      category=DeprecationWarning)
+        parts = template.parts[:]
+        for i, escape, varname in template.variables:
+            piece = escape + self._format_value(var.get(varname), round_float,
+                                                var)
+            if not self._is_inert(piece):
+                return self._eval_square_brackets(txt, round_float, var)
+            parts[i] = piece
+        for j, (i, escape, bytecode, source) in enumerate(
+                template.expressions):
+            parts[i] = escape + safe_decode(
+                self.experiment.python_workspace._eval(bytecode))
+            if not self._is_inert(parts[i]):
+                # Continue with the remaining expressions as if the
+                # previous ones had been searched and replaced
+                for i, escape, bytecode, source in template.expressions[j + 1:]:
+                    parts[i] = source
+                return self.unescape(
+                    self._eval_square_bracket_expressions(u''.join(parts)))
+        return u''.join(parts)
+
+    def _format_value(self, val, round_float, var):
+
+        if round_float and isinstance(val, float):
+            return u'%%.%sf' % var.round_decimals % val
+        return safe_decode(val)
+
+    @staticmethod
+    def _is_inert(piece):
+        r"""Checks whether a substituted value, including the preceding escape
+        sequence, cannot change how the text around it is interpreted. This
+        is the case if it doesn't contain square brackets, and doesn't end
+        with a backslash that would escape a subsequent reference.
+        """
+        return u'[' not in piece and u']' not in piece \
+            and not piece.endswith(u'\\')
+
+    @staticmethod
+    def _escape_sequence(m):
+        r"""Gets the escape sequence from a variable or expression match.
+        """
+        return u'' if m.group(1) is None \
+            else m.group(1)[:len(m.group(1))//2]
+
+    def _eval_square_brackets(self, txt, round_float, var):
+        r"""Evaluates variables and inline Python in a text string by
+        repeatedly searching and replacing them. This is used for texts that
+        cannot be compiled into a TextTemplate.
+        """
         while True:
             m = self.re_txt.search(txt)
             if m is None:
@@ -299,13 +561,15 @@ class Syntax:
             warnings.warn(SQUARE_BRACKET_TEXT_DEPRECATION_WARNING,
                           category=DeprecationWarning)
             varname = m.group(2)[1:-1]
-            val = var.get(varname)
-            if round_float and isinstance(val, float):
-                val = float_template % val
-            else:
-                val = safe_decode(val)
-            txt = txt[:m.start(0)] + get_escape_sequence(m) + val \
+            val = self._format_value(var.get(varname), round_float, var)
+            txt = txt[:m.start(0)] + self._escape_sequence(m) + val \
                 + txt[m.end(0):]
+        return self.unescape(self._eval_square_bracket_expressions(txt))
+
+    def _eval_square_bracket_expressions(self, txt):
+        r"""Evaluates inline Python in a text string by repeatedly searching
+        and replacing it.
+        """
         # Detect Python inlines [=10*10]
         while True:
             m = self.re_txt_py.search(txt)
@@ -315,9 +579,9 @@ class Syntax:
                           category=DeprecationWarning)
             py = self.unescape(m.group(2)[2:-1])
             val = self.experiment.python_workspace._eval(py)
-            txt = txt[:m.start(0)] + get_escape_sequence(m) + safe_decode(val) \
-                + txt[m.end(0):]
-        return self.unescape(txt)
+            txt = txt[:m.start(0)] + self._escape_sequence(m) \
+                + safe_decode(val) + txt[m.end(0):]
+        return txt
 
     def quotable_symbol(self, s):
         """
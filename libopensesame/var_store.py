@@ -81,6 +81,9 @@ class VarStore:
         object.__setattr__(self, u'__parent__', parent)
         object.__setattr__(self, u'__vars__', {})
         object.__setattr__(self, u'__lock__', None)
+        # Maps variable names to (raw value, resolved value) tuples, or to
+        # _PARENT for variables that are resolved by the parent. See get().
+        object.__setattr__(self, u'__cache__', {})
         self._copy_class_description()
 
     def _copy_class_description(self):
@@ -123,6 +126,7 @@ class VarStore:
 
     def __delattr__(self, var):
         r"""Implements the `del` statement to delete a variable."""
+        self.__cache__.clear()
         if var in self.__vars__:
             del self.__vars__[var]
         if hasattr(self.__item__, var):
@@ -155,6 +159,7 @@ class VarStore:
         for var in list(self.__vars__.keys()):
             if var not in preserve:
                 del self.__vars__[var]
+        self.__cache__.clear()
         self._copy_class_description()
 
     def get(self, var, default=None, _eval=True, valid=None):
@@ -181,40 +186,158 @@ class VarStore:
         >>> # But if you want to pass keyword arguments you need to use `get()`:
         >>> var.get(u'my_variable', default=u'a_default_value')
         """
+        # Fast path for values that don't need to be evaluated. The cached
+        # value is only used if the variable still refers to the same raw
+        # value, which also catches assignments in the Python workspace, which
+        # bypass set(). A value that is resolved by the parent is only used if
+        # the variable hasn't been defined in this store or as an item
+        # attribute in the meantime. If the value from the parent still needs
+        # to be evaluated, it is passed on, so that the parent is not asked
+        # twice.
+        parent_val = _MISSING
+        if _eval and valid is None:
+            cached = self.__cache__.get(var)
+            if cached is _PARENT:
+                if var not in self.__vars__ and \
+                        not hasattr(self.__item__, var):
+                    parent_val = self.__parent__.get(var, default=default)
+                    if self.__item__.syntax.is_literal_text(parent_val):
+                        return parent_val
+            elif cached is not None and \
+                    self.__vars__.get(var, _MISSING) is cached[0]:
+                return cached[1]
         self._check_var_name(var)
         if self.__lock__ == var:
             raise OSException(f"Recursion detected! Is variable {var} defined "
                               f"in terms of itself (e.g., 'var = [var]')")
         if var in self.__vars__:
             val = self.__vars__[var]
+            cacheable = True
         elif hasattr(self.__item__, var):
             warnings.warn(
                 u'var %s is stored as attribute of item %s'
                 % (var, self.__item__.name)
             )
             val = getattr(self.__item__, var)
+            cacheable = False
         elif self.__parent__ is not None:
-            val = self.__parent__.get(
-                var,
-                default=default,
-                _eval=_eval,
-                valid=valid
-            )
+            if parent_val is _MISSING:
+                val = self.__parent__.get(
+                    var,
+                    default=default,
+                    _eval=_eval,
+                    valid=valid
+                )
+            else:
+                val = parent_val
+            # Remember that the parent resolves this variable, so that the
+            # item doesn't need to be checked next time
+            if var in self.__parent__.__vars__ or \
+                    self.__parent__.__cache__.get(var) is _PARENT:
+                self.__cache__[var] = _PARENT
+            cacheable = False
         elif default is not None:
             val = default
+            cacheable = False
         else:
             raise VariableDoesNotExist(var)
         if valid is not None and val not in valid:
             raise InvalidValue(
                 f'Variable {var} should be in {valid}, not {val}')
         if _eval:
-            object.__setattr__(self, u'__lock__', var)
+            if cacheable:
+                return self._resolve(var, val)
+            return self._evaluate(var, val)
+        if isinstance(val, bool):
+            return u'yes' if val else u'no'
+        return val
+
+    def _resolve(self, var, val):
+        r"""Evaluates a value that is stored in this variable store, and
+        caches the result if the value evaluates to itself.
+
+        Parameters
+        ----------
+        var : str
+            The name of the variable.
+        val
+            The raw value.
+
+        Returns
+        -------
+        The evaluated value.
+        """
+        cached = self.__cache__.get(var)
+        if cached is not None and cached is not _PARENT and cached[0] is val:
+            return cached[1]
+        if not self.__item__.syntax.is_literal_text(val):
+            return self._evaluate(var, val)
+        resolved = self._evaluate(var, val)
+        self.__cache__[var] = val, resolved
+        return resolved
+
+    def _evaluate(self, var, val):
+        r"""Evaluates variable references and inline Python in a value, and
+        converts bools to 'yes' or 'no'.
+
+        Parameters
+        ----------
+        var : str
+            The name of the variable, which is used to detect recursion.
+        val
+            The raw value.
+
+        Returns
+        -------
+        The evaluated value.
+        """
+        object.__setattr__(self, u'__lock__', var)
+        try:
             val = self.__item__.syntax.eval_text(val)
+        finally:
             object.__setattr__(self, u'__lock__', None)
         if isinstance(val, bool):
             return u'yes' if val else u'no'
         return val
 
+    def snapshot(self, _eval=True):
+        r"""*New in 4.0.0*
+
+        Returns all experimental variables, including those of the parent
+        (experiment) variable store, as a plain `dict`. Reading from this
+        `dict` is much faster than reading the variables one at a time, but
+        the `dict` doesn't change when variables change. See `var.vars()` for a
+        note about the non-exhaustiveness of this function.
+
+        Parameters
+        ----------
+        _eval : bool, optional
+            Determines whether the values should be evaluated for variable
+            references.
+
+        Returns
+        -------
+        dict
+            A dict with variable names as keys.
+
+        Examples
+        --------
+        >>> variables = var.snapshot()
+        >>> print(variables[u'width'], variables[u'height'])
+        """
+        if self.__parent__ is None:
+            d = {}
+        else:
+            d = self.__parent__.snapshot(_eval=_eval)
+        for var, val in self.__vars__.items():
+            if _eval:
+                d[var] = self._resolve(var, val)
+            elif isinstance(val, bool):
+                d[var] = u'yes' if val else u'no'
+            else:
+                d[var] = val
+        return d
+
     def has(self, var):
         r"""Checks if an experimental variable exists.
 
@@ -250,25 +373,20 @@ class VarStore:
         >>> var.my_variable = u'my_value'
         """
         self._check_var_name(var)
-        # The logic here is that we first try to convert to float, and if this
-        # is not successful, return the orignal type. If this is succesful we
-        # turn the float into an int if this doesn't result in data loss, and
-        # otherwise return the float.
-        try:
-            val = float(val)
-        except (TypeError, ValueError):
-            pass
-        try:
-            ival = int(val)
-        except (ValueError, ArithmeticError):
-            # A float can always be converted to an int, except nan values,
-            # which result in ValueError, or inf values, which result in an
-            # OverFlowError (which is a subclass of ArithmeticError).
-            pass
-        else:
-            if ival == val:
-                val = ival
-        self.__setattr__(var, val)
+        self.__setattr__(var, coerce_value(val))
+
+    def _update(self, values):
+        r"""Sets multiple variables at once, without checking the variable
+        names and without converting the values. The caller is responsible
+        for this, which allows the loop item to check and convert an entire
+        loop table in advance (see `coerce_value()`).
+
+        Parameters
+        ----------
+        values : dict
+            A dict with variable names as keys.
+        """
+        self.__vars__.update(values)
 
     def unset(self, var):
         r"""Deletes a variable.
@@ -354,25 +472,29 @@ class VarStore:
         return not var.startswith('_') and \
             isinstance(val, (str, bytes, NoneType, Number))
 
-    def inspect(self):
+    def inspect(self, var_info=None):
         r"""Generates a description of all experimental variables, both alive
         and hypothetical.
 
+        Parameters
+        ----------
+        var_info : dict, optional
+            The hypothetical variables as returned by `var_info_index()`. This
+            allows the index to be cached, because it only changes when items
+            change. If None, the index is created.
+
         Returns
         -------
         dict
             A dict where variable names are keys, and values are dicts with
             source, value, and alive keys.
         """
-        d = {}
-        for item_name, item in list(self.__item__.items.items()) \
-                + [(u'global', self.__item__)]:
-            for var, desc in item.var_info():
-                if var not in d:
-                    d[var] = {u'source': []}
-                d[var][u'source'].append(item_name)
-                d[var][u'value'] = None
-                d[var][u'alive'] = False
+        if var_info is None:
+            var_info = self.var_info_index()
+        d = {
+            var: {u'source': list(sources), u'value': None, u'alive': False}
+            for var, sources in var_info.items()
+        }
         for var in self:
             val = self.get(var, _eval=False)
             if var not in d:
@@ -387,6 +509,23 @@ class VarStore:
             d[var][u'alive'] = True
         return d
 
+    def var_info_index(self):
+        r"""Collects the variables that are defined by the var_info()
+        functions of the experiment and all items.
+
+        Returns
+        -------
+        dict
+            A dict where variable names are keys, and values are lists of the
+            names of the items that define them.
+        """
+        index = {}
+        for item_name, item in list(self.__item__.items.items()) \
+                + [(u'global', self.__item__)]:
+            for var, desc in item.var_info():
+                index.setdefault(var, []).append(item_name)
+        return index
+
     def __reduce__(self):
         r"""Implements custom pickling. See var_store_pickle."""
         try:
@@ -410,6 +549,7 @@ class VarStorePickle(VarStore):
     def __init__(self, inspect):
 
         object.__setattr__(self, u'__inspect__', inspect)
+        object.__setattr__(self, u'__cache__', {})
         _vars = {}
         for var, info in inspect.items():
             if info[u'alive']:
@@ -432,7 +572,7 @@ class VarStorePickle(VarStore):
             raise AttributeError(u'The variable %s does not exist' % var)
         return self.__vars__[var]
 
-    def inspect(self):
+    def inspect(self, var_info=None):
 
         return self.__inspect__
 
@@ -461,6 +601,44 @@ class VarStoreIterator:
         return self.vars.pop()
 
 
+def coerce_value(val):
+    r"""Converts a value in the way that `VarStore.set()` does. That is,
+    values that can be converted to float are converted to float, and then to
+    int if this doesn't result in data loss. Other values are returned as is.
+
+    Parameters
+    ----------
+    val : any
+        The value to convert.
+
+    Returns
+    -------
+    any
+        The converted value.
+    """
+    # The logic here is that we first try to convert to float, and if this
+    # is not successful, return the orignal type. If this is succesful we
+    # turn the float into an int if this doesn't result in data loss, and
+    # otherwise return the float.
+    try:
+        val = float(val)
+    except (TypeError, ValueError):
+        pass
+    try:
+        ival = int(val)
+    except (ValueError, ArithmeticError):
+        # A float can always be converted to an int, except nan values,
+        # which result in ValueError, or inf values, which result in an
+        # OverFlowError (which is a subclass of ArithmeticError).
+        pass
+    else:
+        if ival == val:
+            val = ival
+    return val
+
+
+_MISSING = object()
+_PARENT = object()
 # Alias for backwards compatibility
 var_store = VarStore
 var_store_pickle = VarStorePickle
@@ -127,8 +127,8 @@ class Checkbox(Button):
                                                            y+self.y_pad, checked=True)
         self._unchecked_element = self.form.theme_engine.box(x+self.box_pad,
                                                              y+self.y_pad, checked=False)
-        self.canvas.add_element(self._checked_element)
-        self.canvas.add_element(self._unchecked_element)
+        self._add_element(self._checked_element)
+        self._add_element(self._unchecked_element)
         Button._init_canvas_elements(self)
         self.set_checked(self.checked)
 
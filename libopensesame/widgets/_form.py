@@ -25,6 +25,12 @@ from openexp.keyboard import keyboard
 from openexp._keyboard.keybabel import KeyBabel
 from libopensesame.widgets.widget_factory import WidgetFactory
 
+# The maximum time in milliseconds that the form sleeps while waiting for
+# input, which determines how quickly clicks are noticed while the form is
+# waiting for key presses, and how quickly a release of the mouse button is
+# noticed.
+INPUT_WAIT_INTERVAL = 10
+
 
 class Form:
 
@@ -162,20 +168,55 @@ class Form:
         for coroutine in coroutines.values():
             coroutine.send(None)
         self.canvas.show()
+        for widget in coroutines:
+            widget._rendered_state = widget._render_state()
+        # While the form is executed, changes to canvas elements don't
+        # trigger a redraw of the full canvas. Instead, only widgets that have
+        # changed are redrawn after each interaction.
+        auto_prepare = self.canvas.auto_prepare
+        self.canvas.auto_prepare = False
+        try:
+            resp = self._interact(ms, kb, babel, coroutines, focus_widget)
+        finally:
+            self.canvas.auto_prepare = auto_prepare
+        kb.show_virtual_keyboard(False)
+        ms.show_cursor(False)
+        for coroutine in coroutines.values():
+            try:
+                coroutine.send({u'type': u'stop'})
+            except StopIteration:
+                pass
+        self.experiment.var.form_response = resp
+        return resp
+
+    def _interact(self, ms, kb, babel, coroutines, focus_widget):
+        r"""Collects clicks and key presses, and passes them on to the widgets
+        until a widget returns a response.
+
+        Returns
+        -------
+        Any
+            The response, or None if a timeout occurred.
+        """
         self.start_time = None
         mousedown = False
         while True:
             if self.timed_out():
-                resp = None
-                break
+                return None
             msg = None
             # Handle mouse clicks, including waiting until the mouse is released
-            # after a mouse click.
+            # after a mouse click. The form sleeps in between, rather than
+            # continuously checking the mouse.
             if mousedown:
                 while any(ms.get_pressed()):
-                    pass
+                    self.item.clock.sleep(INPUT_WAIT_INTERVAL)
                 mousedown = False
-            button, xy, timestamp = ms.get_click(visible=True)
+            # If no widget has the focus, only clicks are relevant, and we can
+            # wait for them. Otherwise, we check for clicks and then wait for
+            # key presses.
+            button, xy, timestamp = ms.get_click(
+                visible=True,
+                timeout=self._input_timeout() if focus_widget is None else 0)
             if button is not None:
                 mousedown = True
                 # Switch the focus to the newly clicked widget (if any)
@@ -194,7 +235,7 @@ class Form:
                 }
             # Handle key presses clicks
             elif focus_widget is not None:
-                key, timestamp = kb.get_key()
+                key, timestamp = kb.get_key(timeout=self._input_timeout())
                 modifiers = kb.get_mods()
                 if key is not None:
                     msg = {
@@ -209,18 +250,54 @@ class Form:
             if msg is None:
                 continue
             resp = coroutines[focus_widget].send(msg)
-            self.canvas.show()
+            self._show_changed_widgets()
             if resp is not None and self._validator():
-                break
-        kb.show_virtual_keyboard(False)
-        ms.show_cursor(False)
-        for coroutine in coroutines.values():
-            try:
-                coroutine.send({u'type': u'stop'})
-            except StopIteration:
-                pass
-        self.experiment.var.form_response = resp
-        return resp
+                return resp
+
+    def _input_timeout(self):
+        r"""Gets the maximum time that the form can wait for input, which is
+        the shortest of INPUT_WAIT_INTERVAL and the time until the form times
+        out.
+
+        Returns
+        -------
+        int, float
+        """
+        if self.timeout is None or self.start_time is None:
+            return INPUT_WAIT_INTERVAL
+        remaining = self.start_time + self.timeout - self.item.clock.time()
+        return max(0, min(INPUT_WAIT_INTERVAL, remaining))
+
+    def _show_changed_widgets(self):
+        r"""Redraws and shows only those widgets whose canvas elements have
+        changed since they were last shown. Each widget is redrawn inside its
+        cell, including part of the surrounding spacing.
+
+        Returns
+        -------
+        int, float, NoneType
+            A timestamp of when the widgets were shown, or None if no widgets
+            had changed.
+        """
+        rects = []
+        elements = set()
+        for widget in self.widgets:
+            if widget is None:
+                continue
+            state = widget._render_state()
+            if state == widget._rendered_state:
+                continue
+            widget._rendered_state = state
+            # Cells are separated by twice the spacing, so that half the
+            # spacing can be safely redrawn as well
+            pad = self.spacing / 2
+            x, y, w, h = widget.rect
+            rects.append((x - pad, y - pad, w + 2 * pad, h + 2 * pad))
+            elements.update(widget._elements)
+        if not rects:
+            return None
+        self.canvas.redraw_rects(rects, elements)
+        return self.canvas.show_rects(rects)
 
     def timed_out(self):
         """
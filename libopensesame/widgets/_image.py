@@ -89,7 +89,7 @@ class ImageWidget(Widget):
         x, y, w, h = self.rect
         x += w/2
         y += h/2
-        self.canvas.add_element(
+        self._add_element(
             ImageElement(_path, x=x, y=y, scale=self.scale, center=True)
             .construct(self.canvas)
         )
@@ -87,7 +87,7 @@ class Label(Widget):
         w -= 2*self.x_pad
         self._text_element = RichText(self.text, center=self.center,
                                       x=x, y=y, max_width=w, html=self.html).construct(self.canvas)
-        self.canvas.add_element(self._text_element)
+        self._add_element(self._text_element)
         Widget._init_canvas_elements(self)
 
     def _update_text(self, text):
@@ -139,7 +139,7 @@ class RatingScale(Widget):
             raise InvalidValue(f'rating_scale orientation must be '
                                f'"horizontal" or "vertical", not '
                                f'{self.orientation}')
-        self.canvas.add_element(
+        self._add_element(
             self.form.theme_engine.frame(*box_rect, style=u'light')
         )
         self._checked_boxes = []
@@ -163,15 +163,15 @@ class RatingScale(Widget):
                 text_y = node_y - .5 * text_height + .5 * bs
                 center = False
             self.pos_list.append((node_x, node_y))
-            self.canvas.add_element(
+            self._add_element(
                 RichText(node, center=center, x=text_x, y=text_y)
             )
             cb = self.form.theme_engine.box(node_x, node_y, checked=True)
             ub = self.form.theme_engine.box(node_x, node_y, checked=False)
             self._checked_boxes.append(cb)
             self._unchecked_boxes.append(ub)
-            self.canvas.add_element(cb)
-            self.canvas.add_element(ub)
+            self._add_element(cb)
+            self._add_element(ub)
 
     def _update(self):
         r"""Draws the widget."""
@@ -18,7 +18,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
 from libopensesame.widgets._form import Form
-from openexp.canvas_elements import Rect
+from openexp.canvas_elements import Rect, ElementFactory
 
 
 class Widget:
@@ -38,6 +38,8 @@ class Widget:
         self.rect = None
         self._focus = False
         self.var = None
+        self._elements = []
+        self._rendered_state = None
         # Check if the form parameter is valid
         if not isinstance(form, Form):
             raise TypeError(f'The first parameter passed to the constructor '
@@ -76,6 +78,38 @@ class Widget:
         r"""Initializes all canvas elements."""
         self._frame_elements = {}
 
+    def _add_element(self, element):
+        r"""Adds a canvas element to the form canvas, and remembers that it
+        belongs to this widget.
+
+        Parameters
+        ----------
+        element : Element, ElementFactory
+            The element to add.
+        """
+        if isinstance(element, ElementFactory):
+            element = element.construct(self.canvas)
+        self.canvas.add_element(element)
+        self._elements.append(element)
+
+    def _render_state(self):
+        r"""Gets the state of all canvas elements of the widget. The form
+        compares this to the state at the time that the widget was last shown
+        to decide whether the widget needs to be redrawn.
+
+        Returns
+        -------
+        list
+            A list of element-property dicts.
+        """
+        state = []
+        for element in self._elements:
+            state.append(dict(element._properties))
+            # Groups also contain other elements
+            state += [dict(child._properties) for child in element
+                      if child is not element]
+        return state
+
     def _update_frame(self, rect=None, style=u'normal'):
         r"""Draws a simple frame around the widget.
 
@@ -92,7 +126,7 @@ class Widget:
         if style not in self._frame_elements:
             element = self.theme_engine.frame(*self.rect, style=style)
             self._frame_elements[style] = element
-            self.canvas.add_element(element)
+            self._add_element(element)
             self.canvas.lower_to_bottom(element)
         for element_style, element in self._frame_elements.items():
             element.visible = element_style == style
@@ -110,6 +144,7 @@ class Widget:
             A (left, top, width, height) tuple.
         """
         self.rect = rect
+        self._elements = []
         self._init_canvas_elements()
         self._update()
 
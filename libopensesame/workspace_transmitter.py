@@ -0,0 +1,303 @@
+# -*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+from libopensesame.oslogging import oslogger
+import hashlib
+import os
+import pickle
+import queue
+import threading
+import numpy as np
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:
+    shared_memory = None
+
+# Values that take more than this many bytes are sent through shared memory,
+# rather than through the pipe of the output channel
+SHARED_MEMORY_THRESHOLD = 1024 ** 2
+# Values of these types can change in place into values that can be pickled,
+# so pickling failures are not remembered for these types
+CONTAINER_TYPES = list, tuple, dict, set, frozenset, np.ndarray
+# On Windows, a block of shared memory disappears as soon as the sending
+# process closes it, which may be before the receiving process has read it
+USE_SHARED_MEMORY = shared_memory is not None and os.name != u'nt'
+
+
+class WorkspaceDelta:
+
+    r"""The changes to the workspace since the previous transmission. Changed
+    values are serialized by the sending process, and only deserialized when
+    the delta is applied by the receiving process.
+
+    New in 4.0.0
+
+    Parameters
+    ----------
+    changed : dict
+        A dict that maps names to (kind, data) tuples, where kind is `pickle`,
+        `shared_pickle`, or `shared_array`.
+    deleted : list
+        The names that have been removed from the workspace.
+    extra : dict
+        Extra items that are sent along with the workspace, such as the
+        `__heartbeat__` and `__pause__` flags.
+    """
+    def __init__(self, changed, deleted, extra):
+
+        self.changed = changed
+        self.deleted = deleted
+        self.extra = extra
+
+    def apply(self, workspace):
+        r"""Applies the delta to a workspace. Values that cannot be
+        deserialized are left out.
+
+        Parameters
+        ----------
+        workspace : dict
+            The workspace as it has been received so far. This dict is updated
+            in place.
+
+        Returns
+        -------
+        dict
+            A copy of the updated workspace, including the extra items.
+        """
+        for name in self.deleted:
+            workspace.pop(name, None)
+        for name, (kind, data) in self.changed.items():
+            try:
+                if kind == u'shared_pickle':
+                    workspace[name] = pickle.loads(_read_shared_memory(*data))
+                elif kind == u'shared_array':
+                    workspace[name] = _read_shared_array(*data)
+                else:
+                    workspace[name] = pickle.loads(data)
+            except Exception as e:
+                oslogger.warning(f'failed to receive {name}: {e}')
+                workspace.pop(name, None)
+        d = workspace.copy()
+        d.update(self.extra)
+        return d
+
+
+class WorkspaceTransmitter:
+
+    r"""Sends the workspace through an output channel as a series of
+    `WorkspaceDelta` objects. A delta contains only the values that changed
+    since the previous transmission. Serialization happens in a background
+    thread, and large values are passed through shared memory, which is
+    released by the receiving process when it applies the delta.
+
+    New in 4.0.0
+
+    Parameters
+    ----------
+    channel : object
+        The output channel, which must support a `put` method.
+    """
+    def __init__(self, channel):
+
+        self.channel = channel
+        # Maps names to fingerprints of the values that have been sent
+        self._sent = {}
+        # Maps names to values that could not be pickled. Whether a value can
+        # be pickled may depend on its contents, so failures are remembered
+        # per value, and values are tried again when they are replaced.
+        self._unpicklable = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def transmit(self, workspace, extra=None, wait=False):
+        r"""Queues the workspace for transmission.
+
+        Parameters
+        ----------
+        workspace : dict
+            The workspace. A shallow copy is made right away, so that changes
+            to the dict itself do not affect the transmission.
+        extra : dict, optional
+            Extra items to be sent along with the workspace.
+        wait : bool, optional
+            Indicates whether the function should block until the workspace
+            has been sent, so that it arrives before anything that is put on
+            the channel afterwards.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        done = threading.Event() if wait else None
+        self._queue.put((workspace.copy(), extra or {}, done))
+        if done is not None:
+            done.wait()
+
+    def close(self):
+        r"""Sends all queued transmissions and stops the background thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def delta(self, workspace, extra=None):
+        r"""Determines which values changed since the previous delta, and
+        serializes them. This is called by the background thread, but can
+        also be called directly.
+
+        Parameters
+        ----------
+        workspace : dict
+            The workspace.
+        extra : dict, optional
+            Extra items to be sent along with the workspace.
+
+        Returns
+        -------
+        WorkspaceDelta
+        """
+        changed = {}
+        failed = set()
+        unpicklable = {}
+        for name, value in workspace.items():
+            if name in self._unpicklable and self._unpicklable[name] is value:
+                unpicklable[name] = value
+                failed.add(name)
+                continue
+            try:
+                fingerprint, payload = self._serialize(value,
+                                                       self._sent.get(name))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                if not isinstance(value, CONTAINER_TYPES):
+                    unpicklable[name] = value
+                failed.add(name)
+                continue
+            except Exception as e:
+                # This can happen when the value changes while it is being
+                # pickled. It is then tried again with the next delta.
+                oslogger.debug(f'failed to pickle {name}: {e}')
+                fingerprint, payload = self._sent.get(name), None
+            if fingerprint is None:
+                continue
+            if payload is not None:
+                changed[name] = payload
+            self._sent[name] = fingerprint
+        self._unpicklable = unpicklable
+        deleted = [name for name in self._sent
+                   if name not in workspace or name in failed]
+        for name in deleted:
+            del self._sent[name]
+        return WorkspaceDelta(changed, deleted, extra or {})
+
+    def _serialize(self, value, previous):
+        r"""Serializes a value, unless it is unchanged.
+
+        Returns
+        -------
+        tuple
+            A (fingerprint, payload) tuple, where payload is None if the
+            fingerprint is equal to the previous fingerprint.
+        """
+        if type(value) is np.ndarray and value.flags.c_contiguous and \
+                value.dtype.kind in u'biuf' and \
+                value.nbytes >= SHARED_MEMORY_THRESHOLD and USE_SHARED_MEMORY:
+            # Large arrays are fingerprinted and copied without pickling them,
+            # which (unlike pickling) releases the GIL, so that the experiment
+            # is not held up in the meantime
+            buffer = memoryview(value).cast(u'B')
+            fingerprint = u'array', value.dtype.str, value.shape, \
+                hashlib.sha256(buffer).digest()
+            if fingerprint == previous:
+                return fingerprint, None
+            try:
+                name = _write_shared_memory(buffer)
+            except OSError as e:
+                oslogger.warning(f'failed to use shared memory: {e}')
+            else:
+                return fingerprint, (u'shared_array',
+                                     (name, value.dtype.str, value.shape))
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        fingerprint = u'pickle', hashlib.sha256(data).digest()
+        if fingerprint == previous:
+            return fingerprint, None
+        if len(data) >= SHARED_MEMORY_THRESHOLD and USE_SHARED_MEMORY:
+            try:
+                name = _write_shared_memory(memoryview(data))
+            except OSError as e:
+                oslogger.warning(f'failed to use shared memory: {e}')
+            else:
+                return fingerprint, (u'shared_pickle', (name, len(data)))
+        return fingerprint, (u'pickle', data)
+
+    def _run(self):
+        r"""Runs in the background and sends queued workspaces."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            workspace, extra, done = item
+            try:
+                self.channel.put(self.delta(workspace, extra))
+            except Exception as e:
+                oslogger.error(f'failed to transmit workspace: {e}')
+            finally:
+                if done is not None:
+                    done.set()
+
+
+def _write_shared_memory(buffer):
+    r"""Copies a buffer into a new block of shared memory, and returns the
+    name of the block. The block is unlinked by the receiving process. If the
+    delta is never received, for example because the receiving process
+    crashed, the block is not released.
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(buffer)))
+    shm.buf[:len(buffer)] = buffer
+    # The block should outlive this process, so it should not be cleaned up by
+    # the resource tracker when this process exits
+    resource_tracker.unregister(shm._name, u'shared_memory')
+    name = shm.name
+    shm.close()
+    return name
+
+
+def _read_shared_memory(name, size):
+    r"""Reads and releases a block of shared memory."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _read_shared_array(name, dtype, shape):
+    r"""Reads and releases a block of shared memory that contains an array."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        a = view.copy()
+        del view
+        return a
+    finally:
+        shm.close()
+        shm.unlink()
@@ -300,12 +300,9 @@ class Loop(QtStructureItem, QtItem, LoopRuntime):
                 max_depth=max_depth-1)
         return widget
 
-    @QtStructureItem.cached_children
     def children(self):
         """See QtItem."""
-        if self._item not in self.experiment.items:
-            return []
-        return [self._item] + self.experiment.items[self._item].children()
+        return self.experiment.items.descendants(self.name)
 
     def direct_children(self):
 
@@ -313,8 +310,7 @@ class Loop(QtStructureItem, QtItem, LoopRuntime):
 
     def is_child_item(self, item):
         """See QtItem."""
-        return self._item == item or (self._item in self.experiment.items and
-                                      self.experiment.items[self._item].is_child_item(item))
+        return self.experiment.items.is_descendant(item, self.name)
 
     @QtStructureItem.clears_children_cache
     def insert_child_item(self, item_name, index=0):
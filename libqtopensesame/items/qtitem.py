@@ -604,11 +604,7 @@ class QtItem:
                 desc:	A list of all parents (names) of the current item.
                 type:	list
         """
-        l = [self.name]
-        for item in self.experiment.items:
-            if self.experiment.items[item].is_child_item(self.name):
-                l.append(item)
-        return l
+        return [self.name] + self.experiment.items.ancestors(self.name)
 
     def get_ready(self):
         r"""This function should be overridden to do any last-minute stuff that
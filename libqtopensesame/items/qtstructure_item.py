@@ -33,6 +33,11 @@ class QtStructureItem:
         super().update()
         self.experiment.build_item_tree()
 
+    def from_string(self, string):
+        """See item."""
+        super().from_string(string)
+        self.experiment.items.mark_changed(self.name)
+
     def apply_script_changes(self):
         """See qtitem."""
         super().apply_script_changes()
@@ -40,13 +45,20 @@ class QtStructureItem:
 
     @staticmethod
     def clears_children_cache(fnc):
-        r"""A decorator for functions that change the structure of the
-        experiment, and thus need a clearing of the children cache.
+        r"""A decorator for functions that change the children of an item, and
+        thus need an update of the hierarchy index for that item. The index is
+        updated lazily, when it is queried next.
         """
         def inner(self, *args, **kwargs):
 
-            self.experiment.items.clear_cache()
-            return fnc(self, *args, **kwargs)
+            # The index is also marked before the change, because functions
+            # such as insert_child_item() rebuild the item tree, and thus
+            # query the index, before returning
+            self.experiment.items.mark_changed(self.name)
+            try:
+                return fnc(self, *args, **kwargs)
+            finally:
+                self.experiment.items.mark_changed(self.name)
 
         return inner
 
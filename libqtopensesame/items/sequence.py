@@ -147,15 +147,9 @@ class Sequence(QtStructureItem, QtPlugin, SequenceRuntime):
         """
         self.items[index] = self.items[index][0], cond
 
-    @QtStructureItem.cached_children
     def children(self):
         """See qtitem."""
-        self._children = []
-        for item, cond in self.items:
-            if item not in self.experiment.items:
-                continue
-            self._children += [item] + self.experiment.items[item].children()
-        return self._children
+        return self.experiment.items.descendants(self.name)
 
     def direct_children(self):
 
@@ -167,7 +161,7 @@ class Sequence(QtStructureItem, QtPlugin, SequenceRuntime):
 
     def is_child_item(self, item):
         """See qtitem."""
-        return item in self.children()
+        return self.experiment.items.is_descendant(item, self.name)
 
     @QtStructureItem.clears_children_cache
     def insert_child_item(self, item_name, index=0):
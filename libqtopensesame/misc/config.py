@@ -48,6 +48,8 @@ DEFAULT_CONFIG = {
     "file_pool_size_warning": 104857600,
     "loop_wizard": None,
     "onetabmode": True,
+    "osexp_compress_level": 6,
+    "osexp_reuse_pool_files": True,
     "quick_run_logfile": u"quickrun.csv",
     "recent_files": u"",
     "reset_console_on_experiment_start": True,
@@ -38,6 +38,7 @@ class QtItemStore(ItemStore):
         """
         super().__init__(experiment)
         self.error_log = []
+        self._invalidate_index()
 
     @property
     def main_window(self):
@@ -78,6 +79,7 @@ class QtItemStore(ItemStore):
         fnc = self.experiment.build_item_tree
         self.experiment.build_item_tree = lambda: None
         del self.__items__[name]
+        self._invalidate_index()
         for _name in self:
             self[_name].remove_child_item(name, index=-1)
         self.experiment.build_item_tree = fnc
@@ -121,6 +123,9 @@ class QtItemStore(ItemStore):
             oslogger.warning(yaml.dump(warning_list))
             self.console.write(yaml.dump(warning_list))
 
+        # A new item may be the child of items that referred to its name
+        # before it existed
+        self._invalidate_index()
         self.main_window.set_unsaved(True)
         return item
 
@@ -160,6 +165,7 @@ class QtItemStore(ItemStore):
         # Copy the item in the __items__dictionary
         self.__items__[to_name] = self.__items__[from_name]
         del self.__items__[from_name]
+        self._invalidate_index()
         # Give all items a chance to update
         for item in self.values():
             item.rename(from_name, to_name)
@@ -191,7 +197,7 @@ class QtItemStore(ItemStore):
         if self.experiment.var.start not in self:
             return []
         return [self.experiment.var.start] + \
-                self[self.experiment.var.start].children()
+            self.descendants(self.experiment.var.start)
 
     def unused(self):
         """
@@ -199,9 +205,171 @@ class QtItemStore(ItemStore):
             desc: A list of unused item names.
             type: list
         """
-        _used = self.used()
-        return list(filter(lambda item: item not in _used,
-                           self.__items__.keys()))
+        used = self._used_set()
+        return [name for name in self.__items__ if name not in used]
+
+    def descendants(self, name):
+        r"""Gives all items that are somewhere downstream from an item in the
+        experimental hierarchy, in the order in which they appear in the item
+        tree. Items that occur multiple times are listed multiple times.
+
+        Parameters
+        ----------
+        name : str
+            The item name.
+
+        Returns
+        -------
+        list
+            A list of item names. This list should not be modified.
+        """
+        descendants = self._descendants.get(name)
+        if descendants is not None:
+            return descendants
+        descendants = []
+        for child in self._index()[0].get(name, ()):
+            descendants += [child] + self.descendants(child)
+        self._descendants[name] = descendants
+        return descendants
+
+    def ancestors(self, name):
+        r"""Gives all items of which an item is somewhere downstream in the
+        experimental hierarchy. This only walks up the hierarchy, and
+        therefore doesn't depend on the size of the experiment.
+
+        Parameters
+        ----------
+        name : str
+            The item name.
+
+        Returns
+        -------
+        list
+            A list of item names, starting with the direct parents.
+        """
+        parent_index = self._index()[1]
+        ancestors = []
+        seen = {name}
+        queue = [name]
+        while queue:
+            for parent in parent_index.get(queue.pop(0), ()):
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                ancestors.append(parent)
+                queue.append(parent)
+        return ancestors
+
+    def is_descendant(self, name, ancestor):
+        r"""Checks whether an item is somewhere downstream from another item
+        in the experimental hierarchy.
+
+        Parameters
+        ----------
+        name : str
+            The name of the potential descendant.
+        ancestor : str
+            The name of the potential ancestor.
+
+        Returns
+        -------
+        bool
+        """
+        return ancestor in self.ancestors(name)
+
+    def in_unused_tree(self, name):
+        r"""Checks whether an item is shown in the unused-items bin of the
+        item tree, either because it is unused itself, or because it is a
+        descendant of an unused item.
+
+        Parameters
+        ----------
+        name : str
+            The item name.
+
+        Returns
+        -------
+        bool
+        """
+        used = self._used_set()
+        return name not in used or any(
+            ancestor not in used for ancestor in self.ancestors(name))
+
+    def mark_changed(self, name):
+        r"""Indicates that the children of an item may have changed. Only the
+        children of this item are indexed again when the hierarchy is
+        queried next.
+
+        Parameters
+        ----------
+        name : str
+            The item name.
+        """
+        self._changed.add(name)
+        self._descendants = {}
+        self._used = None
+
+    def _invalidate_index(self):
+        r"""Indicates that the entire hierarchy needs to be indexed again."""
+        self._child_index = None
+        self._parent_index = None
+        self._changed = set()
+        self._descendants = {}
+        self._used = None
+
+    def _index(self):
+        r"""Gives the hierarchy index, and brings it up to date for items that
+        have changed.
+
+        Returns
+        -------
+        tuple
+            A (child_index, parent_index) tuple, where child_index maps item
+            names to tuples of direct children, and parent_index maps item
+            names to sets of direct parents.
+        """
+        if self._child_index is None:
+            self._child_index = {}
+            self._parent_index = {}
+            self._changed = set(self.__items__)
+        for name in self._changed:
+            for child in self._child_index.pop(name, ()):
+                parents = self._parent_index.get(child)
+                if parents is not None:
+                    parents.discard(name)
+            if name not in self.__items__:
+                continue
+            children = tuple(self.__items__[name].direct_children())
+            if not children:
+                continue
+            self._child_index[name] = children
+            for child in children:
+                self._parent_index.setdefault(child, set()).add(name)
+        self._changed.clear()
+        return self._child_index, self._parent_index
+
+    def _used_set(self):
+        r"""Gives the names of all used items as a set, which is cached as long
+        as the hierarchy and the start item don't change.
+
+        Returns
+        -------
+        set
+        """
+        start = self.experiment.var.start
+        if self._used is not None and self._used[0] == start:
+            return self._used[1]
+        child_index = self._index()[0]
+        used = set()
+        queue = [start] if start in self else []
+        while queue:
+            name = queue.pop()
+            if name in used:
+                continue
+            used.add(name)
+            queue += child_index.get(name, ())
+        self._used = start, used
+        return used
 
     def valid_type(self, _type):
         """
@@ -217,11 +385,12 @@ class QtItemStore(ItemStore):
         return _type in self.built_in_types or _type in self.plugin_manager
 
     def clear_cache(self):
-        r"""Clears the cache, currently only the cache with children for each
-        item.
+        r"""Clears the cache with children for each item, and the index of the
+        experimental hierarchy.
         """
         for item in self.values():
             item._children = None
+        self._invalidate_index()
 
     def is_supported(self, _type):
         supported = self.extension_manager.provide(
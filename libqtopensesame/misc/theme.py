@@ -46,6 +46,7 @@ class Theme:
         theme -- the theme to be used or None to use config (default=None)
         """
         self.main_window = main_window
+        self._file_icons = {}
         self.fallback_icon = QtGui.QIcon(resources['theme/fallback.png'])
         self.theme = cfg.theme if theme is None else theme
         self.theme_folder = resources[f'theme/{self.theme}']
@@ -100,7 +101,8 @@ class Theme:
             self.load_icons(widget.ui)
 
     def qfileicon(self, path):
-        r"""Gets an filetype icon for a file.
+        r"""Gets an filetype icon for a file. Icons are cached by file
+        extension, so that files with the same extension share an icon.
 
         Parameters
         ----------
@@ -111,6 +113,17 @@ class Theme:
         -------
         QIcon
         """
+        ext = os.path.splitext(path)[1].lower()
+        # Files without an extension may be recognized by their contents, and
+        # are therefore not cached
+        if not ext:
+            return self._qfileicon(path)
+        if ext not in self._file_icons:
+            self._file_icons[ext] = self._qfileicon(path)
+        return self._file_icons[ext]
+
+    def _qfileicon(self, path):
+        r"""Gets an uncached filetype icon for a file. See `qfileicon()`."""
         try:
             import fileinspector
         except ImportError:
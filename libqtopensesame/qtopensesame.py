@@ -818,7 +818,10 @@ class QtOpenSesame(QtWidgets.QMainWindow, BaseComponent):
             return
         # Try to save the experiment if it doesn't exist already
         try:
-            self.experiment.save(self.current_path, overwrite=True)
+            self.experiment.save(
+                self.current_path, overwrite=True,
+                compresslevel=cfg.osexp_compress_level,
+                reuse_pool_files=cfg.osexp_reuse_pool_files)
             self.set_busy(False)
         except Exception as e:
             self.console.write(e)
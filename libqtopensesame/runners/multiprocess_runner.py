@@ -23,6 +23,7 @@ from libqtopensesame.runners import BaseRunner
 from qtpy import QtWidgets
 from libopensesame.exceptions import UserKilled, ExperimentProcessDied
 from libopensesame.oslogging import oslogger
+from libopensesame.workspace_transmitter import WorkspaceDelta
 
 JOIN_TIMEOUT = 3  # Seconds to wait for the process to end cleanly
 
@@ -46,6 +47,7 @@ class MultiprocessRunner(BaseRunner):
         from libqtopensesame.misc import process, _
 
         self._workspace_globals = {}
+        workspace = {}
         self.channel = multiprocessing.Queue()
         try:
             self.exp_process = process.ExperimentProcess(
@@ -92,8 +94,12 @@ class MultiprocessRunner(BaseRunner):
                     oslogger.warning(
                         'experiment process was forcibly terminated')
                 return msg
-            # The workspace globals are sent as a dict. A special __pause__ key
-            # indicates whether the experiment should be paused or resumed.
+            # The workspace globals are sent as deltas, which are applied to
+            # the workspace that has been received so far. This results in a
+            # dict, in which a special __pause__ key indicates whether the
+            # experiment should be paused or resumed.
+            if isinstance(msg, WorkspaceDelta):
+                msg = msg.apply(workspace)
             if isinstance(msg, dict):
                 self._workspace_globals = msg
                 if u'__kill__' in msg:
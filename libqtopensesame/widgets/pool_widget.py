@@ -29,6 +29,10 @@ import os.path
 import shutil
 from libqtopensesame.misc.translate import translation_context
 _ = translation_context(u'pool_widget', category=u'core')
+# The number of files that are added to the list at once. The remaining files
+# are added in the background, so that the list remains responsive for large
+# file pools.
+POPULATE_BATCH_SIZE = 500
 
 
 class PoolWidget(BaseWidget):
@@ -43,7 +47,11 @@ class PoolWidget(BaseWidget):
             The main-window object.
         """
         self.max_len = 5
+        self._pending = None
         super().__init__(main_window, ui=u'widgets.pool_widget')
+        self._populate_timer = QtCore.QTimer(self)
+        self._populate_timer.setInterval(0)
+        self._populate_timer.timeout.connect(self._populate)
         self.ui.button_pool_add.clicked.connect(self.select_and_add)
         self.ui.button_refresh.clicked.connect(self.refresh)
         self.ui.button_help_pool.clicked.connect(self.help)
@@ -130,6 +138,7 @@ class PoolWidget(BaseWidget):
         fname : str, unicode
             The file to be selected.
         """
+        self._populate(all_files=True)
         for i in range(self.ui.list_pool.count()):
             item = self.ui.list_pool.item(i)
             if item.text() == fname:
@@ -145,17 +154,9 @@ class PoolWidget(BaseWidget):
             return
         filt = self.ui.edit_pool_filter.text().lower()
         self.ui.list_pool.clear()
-        for path in path_iterator:
-            oslogger.debug(path)
-            fname = os.path.basename(path)
-            if filt in fname.lower():
-                icon = self.theme.qfileicon(self.pool[path])
-                item = QtWidgets.QListWidgetItem(icon, fname)
-                item.setFlags(item.flags() | QtCore.Qt.ItemIsEditable)
-                item.icon = icon
-                item.path = path
-                item.setToolTip(path)
-                self.ui.list_pool.addItem(item)
+        self._pending = iter(sorted(path for path in path_iterator
+                                    if filt in os.path.basename(path).lower()))
+        self._populate()
         try:
             size = self.pool.size()
         except:
@@ -170,6 +171,36 @@ class PoolWidget(BaseWidget):
         else:
             self.ui.label_size_warning.setVisible(False)
 
+    def _populate(self, all_files=False):
+        r"""Adds the next batch of files that are waiting to be added to the
+        list. The batches are added through a timer until all files have been
+        added.
+
+        Parameters
+        ----------
+        all_files : bool, optional
+            Indicates whether all waiting files should be added at once.
+        """
+        if self._pending is None:
+            self._populate_timer.stop()
+            return
+        n = 0
+        for path in self._pending:
+            fname = os.path.basename(path)
+            icon = self.theme.qfileicon(self.pool[path])
+            item = QtWidgets.QListWidgetItem(icon, fname)
+            item.setFlags(item.flags() | QtCore.Qt.ItemIsEditable)
+            item.icon = icon
+            item.path = path
+            item.setToolTip(path)
+            self.ui.list_pool.addItem(item)
+            n += 1
+            if not all_files and n == POPULATE_BATCH_SIZE:
+                self._populate_timer.start()
+                return
+        self._pending = None
+        self._populate_timer.stop()
+
     def open_file(self, path):
         r"""Opens a file in a platform specific way.
 
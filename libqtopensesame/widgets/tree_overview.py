@@ -451,11 +451,9 @@ class TreeOverview(BaseSubcomponent, BaseDraggable, QtWidgets.QTreeWidget):
                     return
             # If the dropped item is in the unused items bin, then we need to
             # check whether the target item is a child.
-            if item_name in self.unused_items():
-                if (
-                        target_treeitem.name
-                        in self.experiment.items[item_name].children()
-                ):
+            if self.experiment.items.in_unused_tree(item_name):
+                if self.experiment.items.is_descendant(target_treeitem.name,
+                                                       item_name):
                     if e is not None:
                         e.ignore()
                     return
@@ -868,11 +866,11 @@ class TreeOverview(BaseSubcomponent, BaseDraggable, QtWidgets.QTreeWidget):
         Get a list of unused items
 
         Returns:
-        A list of unused items (names as strings)
+        A list of unused items (names as strings), including the descendants
+        of unused items
         """
-        return self.main_window.ui.itemtree.recursive_children(
-            self.main_window.ui.itemtree.topLevelItem(
-                self.main_window.ui.itemtree.topLevelItemCount()-1))
+        items = self.experiment.items
+        return [name for name in items if items.in_unused_tree(name)]
 
     def rename(self, from_name, to_name):
         r"""Renames an item.
@@ -19,6 +19,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 import numpy as np
 from openexp._canvas import canvas
+from openexp._canvas.stimulus_cache import stimulus_cache
 
 
 class PsychoElement:
@@ -69,14 +70,28 @@ class PsychoElement:
         if env == u'r':
             return u'None', size
         if env == u'l':
-            _env = np.zeros([size, size])
-            for x in range(size):
-                for y in range(size):
-                    r = np.sqrt((x-size/2)**2+(y-size/2)**2)
-                    _env[x, y] = (max(0, (0.5*size-r) / (0.5*size))-0.5)*2
-            return _env, size
+            return stimulus_cache.cached((u'psycho_linear_mask', size),
+                                         self._linear_mask, size), size
         raise ValueError('Invalid mask')
 
+    @staticmethod
+    def _linear_mask(size):
+        r"""Generates a linear PsychoPy mask.
+
+        Parameters
+        ----------
+        size : int
+            The stimulus size.
+
+        Returns
+        -------
+        ndarray
+            A PsychoPy mask.
+        """
+        x, y = np.meshgrid(np.arange(size), np.arange(size), indexing='ij')
+        r = np.sqrt((x - size / 2) ** 2 + (y - size / 2) ** 2)
+        return (np.maximum(0, (0.5 * size - r) / (0.5 * size)) - 0.5) * 2
+
 
 class RotatingElement:
 
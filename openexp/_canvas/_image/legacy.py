@@ -22,6 +22,36 @@ import pygame
 from libopensesame.exceptions import UnsupportedImageFormat, ImageDoesNotExist
 from openexp._canvas._image.image import Image
 from openexp._canvas._element.legacy import LegacyElement
+from openexp._canvas.stimulus_cache import stimulus_cache, file_key
+
+
+def image_surface(fname):
+    r"""Loads an image file into a PyGame surface. Loaded surfaces are kept in
+    the stimulus cache, which is shared with the xpyriment back-end. The
+    returned surface should therefore not be modified.
+
+    Parameters
+    ----------
+    fname : str
+        The path to the image file.
+
+    Returns
+    -------
+    Surface
+        A PyGame surface.
+    """
+    if not os.path.isfile(fname):
+        raise ImageDoesNotExist(fname)
+    key = file_key(u'image_surface', fname)
+    surface = stimulus_cache.get(key)
+    if surface is None:
+        with open(fname, u'rb') as fd:
+            try:
+                surface = pygame.image.load(fd)
+            except pygame.error:
+                raise UnsupportedImageFormat(fname)
+        stimulus_cache.put(key, surface)
+    return surface
 
 
 class Legacy(LegacyElement, Image):
@@ -31,40 +61,19 @@ class Legacy(LegacyElement, Image):
         if not hasattr(self, '_image_surface') or self._dirty:
             self._dirty = False
             fname = safe_decode(self.fname)
-            if not os.path.isfile(fname):
-                raise ImageDoesNotExist(fname)
-            with open(fname, u'rb') as fd:
-                try:
-                    self._image_surface = pygame.image.load(fd)
-                except pygame.error:
-                    raise UnsupportedImageFormat(fname)
-            # After rotation, the figure gets bigger. We therefore need to
-            # compensate by moving it a bit
-            if self.rotation is not None and self.rotation != 0:
-                w1, h1 = self._image_surface.get_size()
-                self._image_surface = pygame.transform.rotate(
-                    self._image_surface.convert_alpha(), -self.rotation
-                )
-                w2, h2 = self._image_surface.get_size()
-                self._dx = (w2-w1)/2
-                self._dy = (h2-h1)/2
-            else:
+            surface = image_surface(fname)
+            if not self.rotation and self.scale is None:
+                self._image_surface = surface
                 self._dx = self._dy = 0
-            if self.scale is not None:
-                try:
-                    self._image_surface = pygame.transform.smoothscale(
-                        self._image_surfacesurface,
-                        (int(self._image_surface.get_width()*self.scale),
-                         int(self._image_surface.get_height()*self.scale))
-                    )
-                except:
-                    self._image_surface = pygame.transform.scale(
-                        self._image_surface,
-                        (int(self._image_surface.get_width()*self.scale),
-                         int(self._image_surface.get_height()*self.scale))
-                    )
-                self._dx *= self.scale
-                self._dy *= self.scale
+            else:
+                # The rotated and scaled surface is cached separately
+                key = file_key(u'legacy_image', fname, self.rotation,
+                               self.scale)
+                transformed = stimulus_cache.get(key)
+                if transformed is None:
+                    transformed = self._transform(surface)
+                    stimulus_cache.put(key, transformed)
+                self._image_surface, self._dx, self._dy = transformed
         size = self._image_surface.get_size()
         x, y = self.to_xy(self.x, self.y)
         if self.center:
@@ -75,6 +84,49 @@ class Legacy(LegacyElement, Image):
             y -= self._dy
         self.surface.blit(self._image_surface, (x, y))
 
+    def _transform(self, surface):
+        r"""Rotates and scales a surface.
+
+        Parameters
+        ----------
+        surface : Surface
+            The surface as loaded from the image file.
+
+        Returns
+        -------
+        tuple
+            A (surface, dx, dy) tuple, where dx and dy indicate how much the
+            surface has grown because of the rotation.
+        """
+        # After rotation, the figure gets bigger. We therefore need to
+        # compensate by moving it a bit
+        if self.rotation is not None and self.rotation != 0:
+            w1, h1 = surface.get_size()
+            surface = pygame.transform.rotate(
+                surface.convert_alpha(), -self.rotation
+            )
+            w2, h2 = surface.get_size()
+            dx = (w2-w1)/2
+            dy = (h2-h1)/2
+        else:
+            dx = dy = 0
+        if self.scale is not None:
+            try:
+                surface = pygame.transform.smoothscale(
+                    surface,
+                    (int(surface.get_width()*self.scale),
+                     int(surface.get_height()*self.scale))
+                )
+            except:
+                surface = pygame.transform.scale(
+                    surface,
+                    (int(surface.get_width()*self.scale),
+                     int(surface.get_height()*self.scale))
+                )
+            dx *= self.scale
+            dy *= self.scale
+        return surface, dx, dy
+
     @staticmethod
     def _setter(key, self, val):
 
@@ -19,7 +19,10 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from openexp._canvas._image.image import Image
 from openexp._canvas._element.psycho import PsychoElement, RotatingElement
+from openexp._canvas.stimulus_cache import stimulus_cache, file_key
+from libopensesame.exceptions import UnsupportedImageFormat, ImageDoesNotExist
 from psychopy import visual
+import os
 
 
 class Psycho(RotatingElement, PsychoElement, Image):
@@ -28,7 +31,7 @@ class Psycho(RotatingElement, PsychoElement, Image):
 
         self._stim = visual.ImageStim(
             win=self.win,
-            image=safe_decode(self.fname)
+            image=self._pil_image(safe_decode(self.fname))
         )
         if self.rotation is not None and self.rotation != 0:
             self._stim.ori = self.rotation
@@ -43,3 +46,32 @@ class Psycho(RotatingElement, PsychoElement, Image):
             x += size[0] / 2
             y -= size[1] / 2
         self._stim.pos = x, y
+
+    @staticmethod
+    def _pil_image(fname):
+        r"""Loads an image file into a PIL image, which is kept in the stimulus
+        cache so that the file is decoded only once.
+
+        Parameters
+        ----------
+        fname : str
+            The path to the image file.
+
+        Returns
+        -------
+        Image
+            A PIL image.
+        """
+        from PIL import Image as PILImage
+        if not os.path.isfile(fname):
+            raise ImageDoesNotExist(fname)
+        key = file_key(u'image_pil', fname)
+        im = stimulus_cache.get(key)
+        if im is None:
+            try:
+                im = PILImage.open(fname)
+                im.load()
+            except OSError:
+                raise UnsupportedImageFormat(fname)
+            stimulus_cache.put(key, im)
+        return im
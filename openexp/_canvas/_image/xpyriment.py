@@ -18,15 +18,21 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
 from openexp._canvas._image.image import Image
+from openexp._canvas._image.legacy import image_surface
 from openexp._canvas._element.xpyriment import XpyrimentElement
-from expyriment.stimuli import Picture
+from expyriment.stimuli._visual import Visual
 
 
 class Xpyriment(XpyrimentElement, Image):
 
     def prepare(self):
 
-        self._stim = Picture(filename=safe_decode(self.fname))
+        # The decoded image is taken from the stimulus cache, which is shared
+        # with the legacy back-end. convert_alpha() returns a copy, so the
+        # cached surface is never modified.
+        surface = image_surface(safe_decode(self.fname)).convert_alpha()
+        self._stim = Visual()
+        self._stim.set_surface(surface)
         if self.rotation is not None and self.rotation != 0:
             w1, h1 = self._stim.surface_size
             self._stim.rotate(-self.rotation)
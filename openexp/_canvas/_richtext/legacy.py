@@ -19,6 +19,7 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from openexp._canvas._richtext.richtext import RichText
 from openexp._canvas._element.legacy import LegacyElement
+from openexp._canvas.stimulus_cache import stimulus_cache
 import pygame
 
 
@@ -27,9 +28,15 @@ class Legacy(LegacyElement, RichText):
     def prepare(self):
 
         if not hasattr(self, '_text_surface') or self._dirty:
-            im = self._to_pil()
-            self._text_surface = pygame.image.fromstring(
-                im.tobytes(), im.size, im.mode)
+            # The converted surface is cached as well, so that identical text
+            # is converted only once
+            key = self._render_key() + (u'surface',)
+            self._text_surface = stimulus_cache.get(key)
+            if self._text_surface is None:
+                im = self._to_pil()
+                self._text_surface = pygame.image.fromstring(
+                    im.tobytes(), im.size, im.mode)
+                stimulus_cache.put(key, self._text_surface)
             self._dirty = False
         x, y = self.to_xy(self.x, self.y)
         if self.center:
@@ -24,6 +24,7 @@ from libopensesame import misc
 from libopensesame.oslogging import oslogger
 import warnings
 from openexp._canvas._element.element import Element
+from openexp._canvas.stimulus_cache import stimulus_cache
 from qtpy.QtWidgets import (
     QGraphicsTextItem,
     QStyleOptionGraphicsItem,
@@ -74,7 +75,6 @@ class RichText(Element):
             'y': y,
             'max_width': max_width
         })
-        self._cached_size = None
         Element.__init__(self, canvas, **properties)
 
     def _init_pyqt(self, exp):
@@ -146,13 +146,7 @@ class RichText(Element):
     @property
     def size(self):
 
-        if self._cached_size:
-            return self._cached_size
-        bbox = Image.fromqimage(self._to_qimage()).getbbox()
-        x1, y1, x2, y2 = (0, 0, 1, 1) if bbox is None else bbox
-        y2 = max(y1 + self.font_size, y2)
-        self._cached_size = x2 - x1, y2 - y1
-        return self._cached_size
+        return self._render()[1]
 
     @property
     def rect(self):
@@ -174,12 +168,7 @@ class RichText(Element):
             )
         else:
             t.setPlainText(self.text)
-        mw = self.max_width
-        if mw is None:
-            mw = self._canvas.width // 2 - self.x
-        if self.center:
-            mw *= 2
-        t.setTextWidth(mw)
+        t.setTextWidth(self._text_width())
         # Register custom fonts that are placed in the file pool
         self._register_custom_font(self.font_family)
         f = QFont(
@@ -193,6 +182,52 @@ class RichText(Element):
         t.setFont(f)
         return t
 
+    def _text_width(self):
+        r"""Returns the width at which the text wraps, which is derived from
+        the position of the text if no maximum width has been specified.
+        """
+        mw = self.max_width
+        if mw is None:
+            mw = self._canvas.width // 2 - self.x
+        if self.center:
+            mw *= 2
+        return mw
+
+    def _render_key(self):
+        r"""Returns a key that captures everything that affects how the text
+        is rendered, but not where it is drawn. Text that is rendered in the
+        same way is shared through the stimulus cache, across elements,
+        canvases, and back-ends.
+        """
+        return (u'richtext', self.text, self.html, self.center,
+                self._text_width(), self.font_family, self.font_size,
+                bool(self.font_bold), bool(self.font_italic),
+                self.color.hexcolor)
+
+    def _render(self):
+        r"""Renders the text, or gets it from the stimulus cache. The returned
+        image is shared and should therefore not be modified.
+
+        Returns
+        -------
+        tuple
+            An (image, size) tuple, where image is the cropped PIL image of the
+            text, and size is a (width, height) tuple that is used to lay out
+            the text.
+        """
+        key = self._render_key()
+        rendered = stimulus_cache.get(key)
+        if rendered is not None:
+            return rendered
+        im = Image.fromqimage(self._to_qimage())
+        bbox = im.getbbox()
+        x1, y1, x2, y2 = (0, 0, 1, 1) if bbox is None else bbox
+        size = x2 - x1, max(y1 + self.font_size, y2) - y1
+        y1 = min(y2 - self.font_size, y1)
+        rendered = im.crop((x1, y1 + 1, x2, y2 - 1)), size
+        stimulus_cache.put(key, rendered)
+        return rendered
+
     def _to_qimage(self):
 
         t = self._to_qgraphicstextitem()
@@ -215,11 +250,7 @@ class RichText(Element):
 
     def _to_pil(self):
 
-        im = Image.fromqimage(self._to_qimage())
-        bbox = im.getbbox()
-        x1, y1, x2, y2 = (0, 0, 1, 1) if bbox is None else bbox
-        y1 = min(y2 - self.font_size, y1)
-        return im.crop((x1, y1 + 1, x2, y2 - 1))
+        return self._render()[0]
 
     @staticmethod
     def _setter(key, self, val):
@@ -227,8 +258,3 @@ class RichText(Element):
         if key == u'text':
             val = safe_decode(val)
         super(RichText, self)._setter(key, self, val)
-
-    def _on_attribute_change(self, **kwargs):
-
-        self._cached_size = None
-        super(RichText, self)._on_attribute_change(key, self, val)
@@ -25,6 +25,10 @@ from openexp.backend import Backend, configurable
 from openexp.color import Color
 from PIL import Image as PILImage
 from collections import OrderedDict
+try:
+    import numpy
+except ImportError:
+    numpy = None
 from openexp.canvas_elements import (
     Line,
     Rect,
@@ -41,6 +45,7 @@ from openexp.canvas_elements import (
 )
 from openexp._canvas._element.element import Element
 from openexp._canvas._element.group import Group
+from openexp._canvas.stimulus_cache import stimulus_cache
 
 
 class Canvas(Backend):
@@ -704,6 +709,45 @@ class Canvas(Backend):
             if element.visible:
                 element.prepare()
 
+    def redraw_rects(self, rects, elements=None):
+        r"""Redraws only the parts of the canvas that fall inside a list of
+        rectangles, which is faster than redrawing the entire canvas when only
+        a few elements have changed. Back-ends that cannot redraw part of the
+        canvas redraw the entire canvas. For internal use.
+
+        New in 4.0.0
+
+        Parameters
+        ----------
+        rects : list
+            A list of (left, top, width, height) tuples.
+        elements : list, NoneType, optional
+            The elements that should be redrawn, or None to redraw all
+            elements. Elements that are not in this list should not overlap
+            with the rectangles.
+        """
+        self.prepare()
+
+    def show_rects(self, rects):
+        r"""Shows only the parts of the canvas that fall inside a list of
+        rectangles, assuming that the rest of the canvas is already on the
+        screen. Back-ends that cannot show part of the canvas show the entire
+        canvas. For internal use.
+
+        New in 4.0.0
+
+        Parameters
+        ----------
+        rects : list
+            A list of (left, top, width, height) tuples.
+
+        Returns
+        -------
+        int, float
+            A timestamp, like for [canvas.show].
+        """
+        return self.show()
+
     def show(self):
         r"""Shows, or 'flips', the canvas on the screen.
 
@@ -1208,7 +1252,9 @@ ENV_SYNONYMS = {
     u"l": u"l"
 }
 
-canvas_cache = {}
+# Alias for backwards compatibility. Patches and images are now kept in a
+# bounded stimulus cache that is shared by all back-ends.
+canvas_cache = stimulus_cache
 
 
 def _color(col):
@@ -1230,15 +1276,87 @@ def _color(col):
 
 def _xyr(x, y, size, orient=0):
     r"""Gets the coordinates relative to the center and compensating for the
-    rotation.
+    rotation. This works for scalars and, if numpy is available, for arrays.
     """
     dx = x - 0.5 * size
     dy = y - 0.5 * size
+    if numpy is not None and isinstance(dx, numpy.ndarray):
+        t = numpy.arctan2(dy, dx) + orient
+        r = numpy.sqrt(dx ** 2 + dy ** 2)
+        return r * numpy.cos(t), r * numpy.sin(t), r
     t = math.atan2(dy, dx) + orient
     r = math.sqrt(dx ** 2 + dy ** 2)
     return r * math.cos(t), r * math.sin(t), r
 
 
+def _check_bgmode(bgmode):
+    r"""Raises a ValueError if bgmode is not a valid background mode."""
+    if bgmode not in (u"avg", u"col2"):
+        raise ValueError(
+            u"Invalid argument for bgmode: %s "
+            u"(should be one of 'avg','col2')"
+            % bgmode
+        )
+
+
+def _envelope_array(ux, uy, r, env, size, stdev):
+    r"""Returns the envelope as an array with the same shape as the coordinate
+    arrays. This is the vectorized equivalent of the envelope adjustment in
+    _gabor_pixelwise() and _noise_patch_pixelwise().
+    """
+    if env == u"g":
+        return numpy.exp(-0.5 * (ux / stdev) ** 2 - 0.5 * (uy / stdev) ** 2)
+    if env == u"l":
+        return numpy.maximum(0, (0.5 * size - r) / (0.5 * size))
+    if env == u"c":
+        return numpy.where(r > 0.5 * size, 0.0, 1.0)
+    return numpy.ones_like(r)
+
+
+def _patch_image(amp, f, col1, col2, bgmode):
+    r"""Applies the envelope to an amplitude array and mixes the two colors
+    into a PIL image. This is the vectorized equivalent of the pixel loop in
+    _gabor_pixelwise() and _noise_patch_pixelwise().
+
+    Parameters
+    ----------
+    amp
+        A (size, size) array of amplitudes (0 .. 1) without envelope, indexed
+        as [y, x].
+    f
+        A (size, size) array with the envelope.
+    col1
+        A PyGame color object.
+    col2
+        A PyGame color object.
+    bgmode : str
+        "avg" or "col2"
+
+    Returns
+    -------
+    A PIL image.
+    """
+    if bgmode == u"avg":
+        amp = amp * f + 0.5 * (1.0 - f)
+    else:
+        amp = amp * f
+    rgb = numpy.empty(amp.shape + (3,), dtype=numpy.uint8)
+    for i, (c1, c2) in enumerate(
+            zip((col1.r, col1.g, col1.b), (col2.r, col2.g, col2.b))):
+        # Casting truncates towards zero, just like int() does
+        rgb[..., i] = c1 * amp + c2 * (1.0 - amp)
+    return PILImage.fromarray(rgb, u'RGB')
+
+
+def _coordinate_arrays(size, orient=0):
+    r"""Returns rotated coordinate arrays for a patch, indexed as [y, x]."""
+    rx, ry = numpy.meshgrid(
+        numpy.arange(size, dtype=float),
+        numpy.arange(size, dtype=float)
+    )
+    return _xyr(rx, ry, size, orient)
+
+
 def _gabor(
         orient,
         freq,
@@ -1257,20 +1375,30 @@ def _gabor(
     # Generating a Gabor patch takes quite some time, so keep
     # a cache of previously generated Gabor patches to speed up
     # the process.
-    global canvas_cache
-    key = u"gabor_%s_%s_%s_%s_%s_%s_%s_%s_%s" % (
-        orient,
-        freq,
-        env,
-        size,
-        stdev,
-        phase,
-        col1,
-        col2,
-        bgmode
-    )
-    if key in canvas_cache:
-        return canvas_cache[key]
+    key = (u'gabor', orient, freq, env, size, stdev, phase, str(col1),
+           str(col2), bgmode)
+    im = stimulus_cache.get(key)
+    if im is not None:
+        return im
+    if numpy is None:
+        im = _gabor_pixelwise(orient, freq, env, size, stdev, phase, col1,
+                              col2, bgmode)
+    else:
+        _check_bgmode(bgmode)
+        ux, uy, r = _coordinate_arrays(size, math.radians(-orient))
+        amp = 0.5 + 0.5 * numpy.cos(2.0 * math.pi * (ux * freq + phase))
+        f = _envelope_array(ux, uy, r, env, size, stdev)
+        im = _patch_image(amp, f, _color(col1), _color(col2), bgmode)
+    stimulus_cache.put(key, im)
+    return im
+
+
+def _gabor_pixelwise(orient, freq, env, size, stdev, phase, col1, col2,
+                     bgmode):
+    r"""Generates a Gabor patch one pixel at a time. This is used when numpy is
+    not available. The envelope should already have been matched with
+    _match_env().
+    """
     im = PILImage.new(u'RGB', (size, size))
     px = im.load()
     # Conver the orientation to radians
@@ -1301,16 +1429,11 @@ def _gabor(
         elif bgmode == u"col2":
             amp = amp * f
         else:
-            raise ValueError(
-                u"Invalid argument for bgmode: %s "
-                u"(should be one of 'avg','col2')"
-                % bgmode
-            )
+            _check_bgmode(bgmode)
         r = col1.r * amp + col2.r * (1.0 - amp)
         g = col1.g * amp + col2.g * (1.0 - amp)
         b = col1.b * amp + col2.b * (1.0 - amp)
         px[rx, ry] = int(r), int(g), int(b)
-    canvas_cache[key] = im
     return im
 
 
@@ -1329,11 +1452,34 @@ def _noise_patch(
     # Generating a noise patch takes quite some time, so keep
     # a cache of previously generated noise patches to speed up
     # the process.
-    global canvas_cache
-    key = u"noise_%s_%s_%s_%s_%s_%s" % (env, size, stdev, col1, col2, bgmode)
-    if key in canvas_cache:
-        return canvas_cache[key]
-    # Create a surface
+    key = (u'noise', env, size, stdev, str(col1), str(col2), bgmode)
+    im = stimulus_cache.get(key)
+    if im is not None:
+        return im
+    if numpy is None:
+        im = _noise_patch_pixelwise(env, size, stdev, col1, col2, bgmode)
+    else:
+        _check_bgmode(bgmode)
+        ux, uy, r = _coordinate_arrays(size)
+        # The noise is drawn from the random module, rather than from
+        # numpy.random, and in the same column-by-column order as the pixelwise
+        # implementation. This way, a seeded experiment produces the same noise
+        # regardless of whether numpy is available.
+        amp = numpy.array(
+            [random.random() for i in range(size * size)],
+            dtype=float
+        ).reshape(size, size).T
+        f = _envelope_array(ux, uy, r, env, size, stdev)
+        im = _patch_image(amp, f, _color(col1), _color(col2), bgmode)
+    stimulus_cache.put(key, im)
+    return im
+
+
+def _noise_patch_pixelwise(env, size, stdev, col1, col2, bgmode):
+    r"""Generates a noise patch one pixel at a time. This is used when numpy is
+    not available. The envelope should already have been matched with
+    _match_env().
+    """
     im = PILImage.new(u'RGB', (size, size))
     px = im.load()
     col1 = _color(col1)
@@ -1362,16 +1508,11 @@ def _noise_patch(
         elif bgmode == u"col2":
             amp = amp * f
         else:
-            raise ValueError(
-                u"Invalid argument for bgmode: %s "
-                u"(should be one of 'avg','col2')"
-                % bgmode
-            )
+            _check_bgmode(bgmode)
         r = col1.r * amp + col2.r * (1.0 - amp)
         g = col1.g * amp + col2.g * (1.0 - amp)
         b = col1.b * amp + col2.b * (1.0 - amp)
         px[rx, ry] = int(r), int(g), int(b)
-    canvas_cache[key] = im
     return im
 
 
@@ -17,6 +17,7 @@ You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
+import math
 import os
 import pygame
 import platform
@@ -86,11 +87,11 @@ class Legacy(Canvas, LegacyCoordinates):
 
     def show(self):
 
-        t0 = pygame.time.get_ticks()
+        t0 = self.experiment.clock.time()
         self.experiment.surface.blit(self.surface, (0, 0))
         self.experiment.last_shown_canvas = self.surface
         pygame.display.flip()
-        t1 = pygame.time.get_ticks()
+        t1 = self.experiment.clock.time()
         if t1 - t0 > self.MAX_SHOW_DT:
             oslogger.warning('Canvas.show() took {0} ms'.format(t1 - t0))
         return t1
@@ -104,7 +105,50 @@ class Legacy(Canvas, LegacyCoordinates):
         self.experiment.last_shown_canvas = self.surface
         pygame.display.flip()
         pygame.event.pump()
-        return pygame.time.get_ticks()
+        return self.experiment.clock.time()
+
+    def redraw_rects(self, rects, elements=None):
+
+        background_color = self.background_color.backend_color
+        # Elements are drawn in the order in which they are in the canvas
+        elements = [
+            element for element in self._elements.values()
+            if element.visible and (elements is None or element in elements)
+        ]
+        for rect in rects:
+            # Drawing is clipped to the rect, so that elements outside of it
+            # are cheap to draw and the rest of the surface is left untouched
+            self.surface.set_clip(self._surface_rect(rect))
+            self.surface.fill(background_color)
+            for element in elements:
+                element.prepare()
+        self.surface.set_clip(None)
+
+    def show_rects(self, rects):
+
+        t0 = self.experiment.clock.time()
+        surface_rects = [self._surface_rect(rect) for rect in rects]
+        for surface_rect in surface_rects:
+            self.experiment.surface.blit(self.surface, surface_rect,
+                                         surface_rect)
+        self.experiment.last_shown_canvas = self.surface
+        pygame.display.update(surface_rects)
+        if platform.system() == u'Darwin':
+            pygame.event.pump()
+        t1 = self.experiment.clock.time()
+        if t1 - t0 > self.MAX_SHOW_DT:
+            oslogger.warning('Canvas.show_rects() took {0} ms'.format(t1 - t0))
+        return t1
+
+    def _surface_rect(self, rect):
+        r"""Converts a (left, top, width, height) tuple in canvas coordinates
+        to a pygame.Rect in surface coordinates that fully covers it.
+        """
+        x, y, w, h = rect
+        x1, y1 = self.to_xy(x, y)
+        x2, y2 = math.ceil(x1 + w), math.ceil(y1 + h)
+        x1, y1 = math.floor(x1), math.floor(y1)
+        return pygame.Rect(x1, y1, x2 - x1, y2 - y1)
 
     def prepare(self):
         r"""Finishes pending canvas operations (if any), so that a subsequent
@@ -219,6 +263,8 @@ class Legacy(Canvas, LegacyCoordinates):
             fileobjects.pop().close()
         while fonts:
             fonts.pop(list(fonts.keys())[0], None)
+        # Events that are still queued belong to the closed display
+        experiment._event_pump = None
         pygame.display.quit()
 
 
@@ -0,0 +1,293 @@
+# -*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+from libopensesame.oslogging import oslogger
+from collections import OrderedDict
+import threading
+import os
+
+# The default maximum size of the cache in megabytes. This can be changed
+# through the stimulus_cache_max_mb experiment variable.
+DEFAULT_MAX_MB = 256
+
+
+class StimulusCache:
+
+    r"""A least-recently-used cache for prepared stimuli, such as Gabor
+    patches, noise patches, decoded images, and sounds. The cache is bounded
+    by the total number of bytes of the cached stimuli, rather than by the
+    number of stimuli. When a new stimulus does not fit, the
+    least-recently-used stimuli are evicted.
+
+    The cache also supports the `dict`-like `in`, `[]` and `clear()`
+    operations, so that it can stand in for the old (unbounded) canvas_cache
+    `dict`.
+    """
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 ** 2):
+        r"""Constructor.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            The maximum size of the cache in bytes. A value of 0 disables the
+            cache.
+        """
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._max_bytes = max_bytes
+        self.nbytes = 0
+        self.reset_stats()
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        with self._lock:
+            self._max_bytes = max(0, int(max_bytes))
+            self._evict()
+
+    def reset_stats(self):
+        r"""Resets the hit, miss, and eviction counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        r"""Gives information about the cache.
+
+        Returns
+        -------
+        dict
+            A dict with hits, misses, evictions, entries, nbytes, and max_bytes
+            keys.
+        """
+        with self._lock:
+            return {
+                u'hits': self.hits,
+                u'misses': self.misses,
+                u'evictions': self.evictions,
+                u'entries': len(self._entries),
+                u'nbytes': self.nbytes,
+                u'max_bytes': self._max_bytes
+            }
+
+    def get(self, key, default=None):
+        r"""Gets a stimulus from the cache and marks it as recently used.
+
+        Parameters
+        ----------
+        key
+            A hashable key.
+        default, optional
+            The value to return if the key is not in the cache.
+
+        Returns
+        -------
+        The cached stimulus, or the default value.
+        """
+        with self._lock:
+            try:
+                value, nbytes = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, nbytes=None):
+        r"""Adds a stimulus to the cache, evicting least-recently-used
+        stimuli if necessary. Stimuli that are larger than the entire cache are
+        not stored.
+
+        Parameters
+        ----------
+        key
+            A hashable key.
+        value
+            The stimulus.
+        nbytes : int, NoneType, optional
+            The size of the stimulus in bytes, or None to estimate it.
+        """
+        if nbytes is None:
+            nbytes = estimate_nbytes(value)
+        with self._lock:
+            self._discard(key)
+            if nbytes > self._max_bytes:
+                return
+            self._entries[key] = value, nbytes
+            self.nbytes += nbytes
+            self._evict()
+
+    def cached(self, key, fnc, *args, **kwargs):
+        r"""Gets a stimulus from the cache, or creates it by calling a function
+        and adds it to the cache.
+
+        Parameters
+        ----------
+        key
+            A hashable key.
+        fnc
+            A function that creates the stimulus.
+        *args
+            Passed to fnc.
+        **kwargs
+            Passed to fnc.
+
+        Returns
+        -------
+        The cached or newly created stimulus.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fnc(*args, **kwargs)
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        r"""Removes all stimuli from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _discard(self, key):
+
+        try:
+            value, nbytes = self._entries.pop(key)
+        except KeyError:
+            return
+        self.nbytes -= nbytes
+
+    def _evict(self):
+
+        while self.nbytes > self._max_bytes and self._entries:
+            key, (value, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+            self.evictions += 1
+
+    def __contains__(self, key):
+
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key):
+
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+
+        self.put(key, value)
+
+    def __delitem__(self, key):
+
+        with self._lock:
+            if key not in self._entries:
+                raise KeyError(key)
+            self._discard(key)
+
+    def __len__(self):
+
+        return len(self._entries)
+
+
+def estimate_nbytes(value):
+    r"""Estimates the memory size of a stimulus. This supports PIL images,
+    PyGame surfaces, numpy arrays, and tuples or lists of these.
+
+    Parameters
+    ----------
+    value
+        A stimulus.
+
+    Returns
+    -------
+    int
+        An estimated size in bytes.
+    """
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(v) for v in value)
+    # numpy arrays
+    if hasattr(value, u'nbytes'):
+        return int(value.nbytes)
+    # PyGame surfaces
+    if hasattr(value, u'get_bytesize'):
+        w, h = value.get_size()
+        return w * h * value.get_bytesize()
+    # PIL images
+    if hasattr(value, u'getbands'):
+        w, h = value.size
+        return w * h * len(value.getbands())
+    return 64
+
+
+def file_key(kind, path, *args):
+    r"""Creates a cache key for a stimulus that is based on a file. The key
+    includes the modification time and size of the file, so that the cached
+    stimulus is not used anymore when the file changes.
+
+    Parameters
+    ----------
+    kind : str
+        The kind of stimulus, e.g. 'image_surface'.
+    path : str
+        The path to the file.
+    *args
+        Any additional values that should be part of the key, such as a
+        rotation or scale.
+
+    Returns
+    -------
+    tuple
+        A hashable key.
+    """
+    st = os.stat(path)
+    return (kind, path, st.st_mtime_ns, st.st_size) + args
+
+
+def configure(experiment):
+    r"""Configures the cache based on the experiment variables. The
+    stimulus_cache_max_mb variable indicates the maximum size of the cache in
+    megabytes, where 0 disables the cache.
+
+    Parameters
+    ----------
+    experiment : Experiment
+        The experiment object.
+    """
+    max_mb = experiment.var.get(u'stimulus_cache_max_mb', DEFAULT_MAX_MB)
+    try:
+        max_mb = float(max_mb)
+    except (TypeError, ValueError):
+        oslogger.warning(
+            u'invalid stimulus_cache_max_mb: %s, using %d' % (max_mb,
+                                                              DEFAULT_MAX_MB))
+        max_mb = DEFAULT_MAX_MB
+    stimulus_cache.max_bytes = max_mb * 1024 ** 2
+    stimulus_cache.reset_stats()
+
+
+_MISSING = object()
+# A single instance of the cache that is shared by all canvas back-ends and
+# the legacy sampler back-end
+stimulus_cache = StimulusCache()
@@ -18,15 +18,23 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
 from openexp._clock.clock import Clock
+from time import perf_counter
 import pygame
 
+# Timestamps are in milliseconds since this module was imported
+_T0 = perf_counter()
+
 
 class Legacy(Clock):
 
-    r"""For docstrings, see openexp._clock.clock."""
+    r"""For docstrings, see openexp._clock.clock. Timestamps are based on the
+    high-resolution performance counter, rather than on PyGame's millisecond
+    ticks, and are shared by the PyGame-based canvas, keyboard, and mouse
+    back-ends.
+    """
     def time(self):
 
-        return float(pygame.time.get_ticks())
+        return 1000 * (perf_counter() - _T0)
 
     def sleep(self, ms):
 
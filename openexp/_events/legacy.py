@@ -0,0 +1,196 @@
+# -*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+from collections import deque
+import itertools
+import math
+import pygame
+
+# The maximum number of events that are kept per event type. Events of types
+# that no device collects, such as window events, are dropped once this
+# number is exceeded.
+MAX_QUEUED_EVENTS = 1024
+
+
+class EventPump:
+
+    r"""A single pump for the PyGame event queue, which is shared by the
+    legacy keyboard, mouse, and joystick back-ends of an experiment. Events
+    are taken from PyGame once, timestamped, and routed into a queue per event
+    type. Devices collect events of the types that they are interested in,
+    and leave all other events for other devices. Use `event_pump()` to get
+    the pump of an experiment.
+
+    Parameters
+    ----------
+    experiment : Experiment
+        The experiment object.
+    """
+    def __init__(self, experiment):
+
+        self.experiment = experiment
+        self._queues = {}
+        self._counter = itertools.count()
+
+    def pump(self, timeout=0):
+        r"""Takes all events from the PyGame event queue and routes them into
+        the queues. If there are no events, and timeout is not 0, this sleeps
+        until an event arrives.
+
+        Parameters
+        ----------
+        timeout : int, float, NoneType, optional
+            The maximum time in milliseconds to wait for an event, or `None`
+            to wait indefinitely.
+        """
+        events = pygame.event.get()
+        if not events and timeout != 0:
+            if timeout is None:
+                events = [pygame.event.wait()]
+            elif timeout > 0:
+                events = [pygame.event.wait(math.ceil(timeout))]
+        if not events:
+            return
+        # The timestamp is taken as soon as the events have been received,
+        # using the high-resolution time of the clock
+        time = self.experiment.clock.time()
+        for event in events:
+            if event.type == pygame.NOEVENT:
+                continue
+            queue = self._queues.get(event.type)
+            if queue is None:
+                queue = self._queues[event.type] = deque(
+                    maxlen=MAX_QUEUED_EVENTS)
+            queue.append((next(self._counter), time, event))
+
+    def get(self, event_types, timeout=None, wait=True, escape=True):
+        r"""Gets the oldest event of one of the specified types.
+
+        Parameters
+        ----------
+        event_types : list
+            A list of PyGame event types.
+        timeout : int, float, NoneType, optional
+            A timeout in milliseconds, or `None` for no timeout.
+        wait : bool, optional
+            Indicates whether the pump should sleep until an event arrives,
+            or continuously poll for events.
+        escape : bool, optional
+            Indicates whether the experiment should be paused when the
+            Escape key is pressed.
+
+        Returns
+        -------
+        tuple
+            An (event, timestamp) tuple, where event is None if a timeout
+            occurred.
+        """
+        clock = self.experiment.clock
+        start_time = clock.time()
+        self.pump()
+        while True:
+            if escape:
+                self.handle_escape()
+            item = self._pop_oldest(event_types)
+            if item is not None:
+                return item
+            time = clock.time()
+            if timeout is not None and time - start_time >= timeout:
+                return None, time
+            if not wait:
+                self.pump()
+            elif timeout is None:
+                self.pump(None)
+            else:
+                self.pump(start_time + timeout - time)
+
+    def get_all(self, event_types):
+        r"""Gets all queued events of the specified types, without waiting.
+
+        Parameters
+        ----------
+        event_types : list
+            A list of PyGame event types.
+
+        Returns
+        -------
+        list
+            A list of (event, timestamp) tuples, ordered by arrival.
+        """
+        self.pump()
+        items = []
+        for event_type in event_types:
+            queue = self._queues.get(event_type)
+            if queue:
+                items += queue
+                queue.clear()
+        return [(event, time) for counter, time, event in sorted(
+            items, key=lambda item: item[0])]
+
+    def handle_escape(self):
+        r"""Pauses the experiment if the Escape key has been pressed. The
+        Escape keypresses are removed from the queue, while other keypresses
+        are left in the queue.
+        """
+        queue = self._queues.get(pygame.KEYDOWN)
+        if not queue or not any(event.key == pygame.K_ESCAPE
+                                for counter, time, event in queue):
+            return
+        escapes = [item for item in queue if item[2].key == pygame.K_ESCAPE]
+        for item in escapes:
+            queue.remove(item)
+        for item in escapes:
+            self.experiment.pause()
+
+    def _pop_oldest(self, event_types):
+        r"""Removes and returns the oldest queued event of the specified
+        types.
+
+        Returns
+        -------
+        tuple, NoneType
+            An (event, timestamp) tuple, or None if there are no such events.
+        """
+        oldest = None
+        for event_type in event_types:
+            queue = self._queues.get(event_type)
+            if queue and (oldest is None or queue[0][0] < oldest[0][0]):
+                oldest = queue
+        if oldest is None:
+            return None
+        counter, time, event = oldest.popleft()
+        return event, time
+
+
+def event_pump(experiment):
+    r"""Gets the event pump of an experiment, and creates it if necessary.
+
+    Parameters
+    ----------
+    experiment : Experiment
+        The experiment object.
+
+    Returns
+    -------
+    EventPump
+    """
+    pump = getattr(experiment, u'_event_pump', None)
+    if pump is None:
+        pump = experiment._event_pump = EventPump(experiment)
+    return pump
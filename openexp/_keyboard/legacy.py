@@ -22,6 +22,7 @@ import pygame
 from pygame.locals import *
 from string import whitespace
 from openexp._keyboard.keyboard import Keyboard
+from openexp._events.legacy import event_pump
 from openexp.backend import configurable
 
 # Whitespace, backspace, and empty strings are not acceptable names for keys.
@@ -48,6 +49,14 @@ class Legacy(Keyboard):
     r"""This is a keyboard backend built on top of PyGame. For function
     specifications and docstrings, see `openexp._keyboard.keyboard`.
     """
+    settings = {
+        u"keyboard_event_wait": {
+            u"name": u"Wait for key events",
+            u"description": u"Sleep until a key event arrives, instead of continuously polling for key events",
+            u"default": u"yes",
+        }
+    }
+
     def __init__(self, experiment, **resp_args):
 
         pygame.init()
@@ -85,39 +94,66 @@ class Legacy(Keyboard):
 
     def _get_key_event(self, event_type):
 
-        start_time = pygame.time.get_ticks()
-        time = start_time
+        wait = self.experiment.var.get(u'keyboard_event_wait', u'yes',
+                                       [u'yes', u'no']) == u'yes'
+        pump = event_pump(self.experiment)
+        clock = self.experiment.clock
+        start_time = clock.time()
         keylist = self.keylist
         timeout = self.timeout
         while True:
-            time = pygame.time.get_ticks()
-            # Some input methods send multiple key events at the same time,
-            # for example when composing a multicharacter Chinese or Japanese
-            # string. That's why we process up all events, rather than
-            # assuming that there's only a single relevant event in the queue.
-            key = u''
-            for event in pygame.event.get(event_type):
-                if event.key == pygame.K_ESCAPE:
-                    self.experiment.pause()
-                # KEYUP events don't have a unicode property, so in that case
-                # we fall back to converting the key code straight to an ASCII
-                # value. This is not great, because it assumes a QWERTY
-                # keyboard layout.
-                if hasattr(event, u'unicode'):
-                    ucode = event.unicode
-                elif event.key < 128:
-                    ucode = chr(event.key)
-                else:
-                    ucode = u''
-                if ucode in invalid_unicode:
-                    key += self.key_name(event.key)
-                else:
-                    key += ucode
+            remaining = None if timeout is None \
+                else start_time + timeout - clock.time()
+            event, time = pump.get([event_type], timeout=remaining, wait=wait,
+                                   escape=False)
+            if event is None:
+                break
+            # Events that arrived at the same time are processed together
+            events = [event] + [
+                event for event, _time in pump.get_all([event_type])]
+            key = self._events_to_key(events)
             if key and (keylist is None or key in keylist):
                 return key, time
             if timeout is not None and time - start_time >= timeout:
                 break
-        return None, time
+        return None, clock.time()
+
+    def _events_to_key(self, events):
+        r"""Converts a list of key events to a key name.
+
+        Parameters
+        ----------
+        events : list
+            A list of KEYDOWN or KEYUP events.
+
+        Returns
+        -------
+        str
+            A key name, or an empty string if there were no events.
+        """
+        # Some input methods send multiple key events at the same time,
+        # for example when composing a multicharacter Chinese or Japanese
+        # string. That's why we process up all events, rather than
+        # assuming that there's only a single relevant event in the queue.
+        key = u''
+        for event in events:
+            if event.key == pygame.K_ESCAPE:
+                self.experiment.pause()
+            # KEYUP events don't have a unicode property, so in that case
+            # we fall back to converting the key code straight to an ASCII
+            # value. This is not great, because it assumes a QWERTY
+            # keyboard layout.
+            if hasattr(event, u'unicode'):
+                ucode = event.unicode
+            elif event.key < 128:
+                ucode = chr(event.key)
+            else:
+                ucode = u''
+            if ucode in invalid_unicode:
+                key += self.key_name(event.key)
+            else:
+                key += ucode
+        return key
 
     def get_mods(self):
 
@@ -148,12 +184,12 @@ class Legacy(Keyboard):
     def flush(self):
 
         keypressed = False
-        for event in pygame.event.get():
+        for event, time in event_pump(self.experiment).get_all(
+                [KEYDOWN, KEYUP]):
             if event.type == KEYDOWN:
                 keypressed = True
                 if event.key == pygame.K_ESCAPE:
                     self.experiment.pause()
-        pygame.event.pump()
         return keypressed
 
     def key_name(self, key):
@@ -0,0 +1,280 @@
+# -*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+from libopensesame.exceptions import InvalidValue, LogWriteError
+from libopensesame.oslogging import oslogger
+from openexp._log.csv import Csv
+import atexit
+import os
+import queue
+import tempfile
+import threading
+import time
+
+# Durability policies, which determine when data is synced to disk:
+# - row: after every row
+# - batch: after log_flush_rows rows or log_flush_interval ms
+# - block: when a loop finishes, and when the log is closed
+# - exit: only when the log is closed
+DURABILITY_POLICIES = u'row', u'batch', u'block', u'exit'
+_CLOSE = object()
+
+
+class BufferedCsv(Csv):
+
+    r"""A log back-end that writes the same CSV format as the `csv` back-end,
+    but does so from a background thread, so that logging doesn't block the
+    experiment with synchronous disk writes. Select it by setting the
+    `log_backend` variable to `buffered_csv`.
+
+    Rows are always handed to the operating system as soon as the writer
+    thread gets to them, so they survive a crash of the experiment process.
+    The `log_durability` variable determines when rows are also synced to
+    disk, which protects them against a crash of the operating system or a
+    power failure: `row`, `batch` (the default, after `log_flush_rows` rows or
+    `log_flush_interval` milliseconds), `block` (when a loop finishes), or
+    `exit` (when the log is closed).
+
+    If writing fails, the next call to `write()`, `write_vars()`, or
+    `flush()` raises a `LogWriteError`, and all rows that have not been
+    written are saved to a recovery file when the log is closed. These
+    functions also raise a `LogWriteError` when they are called after the log
+    has been closed.
+    """
+    def __init__(self, experiment, path):
+
+        self._thread = None
+        Csv.__init__(self, experiment, path)
+
+    def open(self, path):
+
+        self.close()
+        # The settings are checked before the log file is opened, so that the
+        # log remains closed if they are invalid
+        var = self.experiment.var
+        self._durability = var.get(u'log_durability', u'batch')
+        if self._durability not in DURABILITY_POLICIES:
+            raise InvalidValue(
+                f'log_durability should be one of {DURABILITY_POLICIES}, '
+                f'not {self._durability}')
+        try:
+            self._flush_rows = int(var.get(u'log_flush_rows', 100))
+            self._flush_interval = float(
+                var.get(u'log_flush_interval', 1000)) / 1000
+        except ValueError:
+            raise InvalidValue(
+                'log_flush_rows and log_flush_interval should be numeric')
+        Csv.open(self, path)
+        self._error = None
+        self._error_reported = False
+        self._unwritten = []
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+        # Make sure that pending rows are written if the experiment process
+        # exits without closing the log
+        atexit.register(self.close)
+
+    def close(self):
+
+        if self._thread is None:
+            return
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.close)
+        try:
+            Csv.close(self)
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+        self._log = None
+        if self._error is None:
+            return
+        recovery_path = self._save_unwritten()
+        if not self._error_reported or recovery_path is None:
+            self._error_reported = True
+            raise LogWriteError(
+                f'Failed to write to log file {self._path}: {self._error}. '
+                f'Unwritten rows have been saved to {recovery_path}')
+
+    def write(self, msg, newline=True):
+
+        self._check_open()
+        self._check_error()
+        msg = safe_decode(msg)
+        self._queue.put(msg + u'\n' if newline else msg)
+
+    def write_vars(self, var_list=None):
+
+        self._check_open()
+        self._check_error()
+        if var_list is None:
+            var_list = self.all_vars()
+        if not self._header_written:
+            self._queue.put(list(var_list))
+            self._header_written = True
+        # The values are retrieved immediately, because they may change before
+        # the writer thread gets to them. Formatting is left to the thread.
+        self._queue.put(self.row_values(var_list))
+
+    def flush(self):
+
+        self._check_open()
+        self._check_error()
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+        self._check_error()
+
+    def end_block(self):
+
+        if self._thread is not None and self._durability == u'block':
+            self.flush()
+
+    def _check_open(self):
+        r"""Raises a LogWriteError if the log has been closed, because rows
+        would then never be written.
+        """
+        if self._thread is None:
+            raise LogWriteError(
+                f'Cannot write to log file {self._path}, because the log has '
+                f'been closed')
+
+    def _check_error(self):
+        r"""Raises a LogWriteError if the writer thread has failed."""
+        if self._error is None:
+            return
+        self._error_reported = True
+        raise LogWriteError(
+            f'Failed to write to log file {self._path}: {self._error}. '
+            f'Unwritten rows will be saved to a recovery file when the log is '
+            f'closed.')
+
+    def _writer(self):
+        r"""Runs in the background and writes queued rows to the log file.
+        Flush requests are threading.Event objects that are set once all
+        preceding rows have been written and synced. Other callables are
+        called after the preceding rows have been written, which allows
+        subclasses to do additional work on the writer thread.
+        """
+        unsynced = 0
+        last_sync = time.monotonic()
+        while True:
+            timeout = None
+            if unsynced and self._durability == u'batch':
+                timeout = max(0, last_sync + self._flush_interval
+                              - time.monotonic())
+            try:
+                items = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            # Drain the queue so that rows are written in batches
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            events = []
+            tasks = []
+            closing = False
+            for item in items:
+                if item is _CLOSE:
+                    closing = True
+                elif isinstance(item, threading.Event):
+                    events.append(item)
+                elif isinstance(item, list):
+                    lines.append(self.format_row(item) + u'\n')
+                elif callable(item):
+                    tasks.append(item)
+                else:
+                    lines.append(item)
+            unsynced += len(lines)
+            sync = closing or events or (
+                unsynced and (
+                    self._durability == u'row' or (
+                        self._durability == u'batch' and (
+                            unsynced >= self._flush_rows or
+                            time.monotonic() - last_sync
+                            >= self._flush_interval
+                        )
+                    )
+                )
+            )
+            if self._error is not None:
+                self._unwritten += lines
+            else:
+                try:
+                    if lines:
+                        self._log.write(u''.join(lines))
+                        self._log.flush()
+                    if sync and unsynced:
+                        os.fsync(self._log)
+                except Exception as e:
+                    oslogger.error(f'failed to write to log file: {e}')
+                    self._error = e
+                    self._unwritten += lines
+            for task in tasks:
+                try:
+                    task()
+                except Exception as e:
+                    oslogger.error(f'failed to write to log file: {e}')
+                    if self._error is None:
+                        self._error = e
+            if sync:
+                unsynced = 0
+                last_sync = time.monotonic()
+            for event in events:
+                event.set()
+            if closing:
+                return
+
+    def _save_unwritten(self):
+        r"""Saves rows that could not be written to a recovery file next to the
+        log file, or in the temporary folder if that fails as well.
+
+        Returns
+        -------
+        str
+            The path to the recovery file.
+        """
+        content = u''.join(self._unwritten)
+        for path in (
+            self._path + u'.recovered',
+            os.path.join(tempfile.gettempdir(),
+                         os.path.basename(self._path) + u'.recovered')
+        ):
+            try:
+                with safe_open(path, u'a') as fd:
+                    fd.write(content)
+                    fd.flush()
+                    os.fsync(fd)
+            except Exception as e:
+                oslogger.error(f'failed to write recovery file {path}: {e}')
+                continue
+            oslogger.warning(f'saved {len(self._unwritten)} unwritten rows to '
+                             f'{path}')
+            self._unwritten = []
+            return path
+        return None
+
+
+# Non PEP-8 alias for backwards compatibility
+buffered_csv = BufferedCsv
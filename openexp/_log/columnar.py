@@ -0,0 +1,464 @@
+# -*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+from libopensesame.exceptions import InvalidValue, LogWriteError, \
+    MissingDependency, VariableDoesNotExist
+from libopensesame.oslogging import oslogger
+from openexp._log.buffered_csv import BufferedCsv
+from numbers import Integral, Real
+import csv as _csv
+import os
+import zipfile
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The string that indicates a missing value in the CSV file and in string
+# columns
+MISSING = u'NA'
+FORMATS = u'csv', u'npz', u'parquet', u'feather'
+
+
+class Columnar(BufferedCsv):
+
+    r"""A log back-end that writes the same CSV file as the `buffered_csv`
+    back-end, and in addition writes all rows that are logged with
+    `write_vars()` as typed columns to an `.npz` file next to the CSV file.
+    Select it by setting the `log_backend` variable to `columnar`.
+
+    Rows are collected in chunks of `log_chunk_rows` rows (default: 1000).
+    Each chunk is appended to the `.npz` file as one array per column, named
+    `[chunk]/[column].npy`. Columns of which all values are ints are stored as
+    int64, columns of which all values are numeric are stored as float64 with
+    NaN for missing values, and all other columns are stored as strings with
+    'NA' for missing values. Use `read_columns()` to load the file into a
+    `dict` of numpy arrays, or convert it to Parquet or Feather with:
+
+        python -m openexp._log.columnar subject-0.npz subject-0.parquet
+
+    The CSV file remains the primary record: rows that have not been written
+    to the `.npz` file when the experiment crashes can be recovered from the
+    CSV file with the same command.
+    """
+    def __init__(self, experiment, path):
+
+        self._chunk = None
+        BufferedCsv.__init__(self, experiment, path)
+
+    def open(self, path):
+
+        if np is None:
+            raise MissingDependency(
+                u'The columnar log back-end requires numpy')
+        self.close()
+        try:
+            self._chunk_rows = int(
+                self.experiment.var.get(u'log_chunk_rows', 1000))
+        except ValueError:
+            raise InvalidValue('log_chunk_rows should be numeric')
+        BufferedCsv.open(self, path)
+        self._columnar_path = os.path.splitext(self._path)[0] + u'.npz'
+        if self._columnar_path not in self.experiment.data_files:
+            self.experiment.data_files.append(self._columnar_path)
+        if os.path.exists(self._columnar_path):
+            os.remove(self._columnar_path)
+        self._chunk = []
+        self._chunk_nr = 0
+        self._columnar_error = None
+
+    def close(self):
+
+        if self._chunk is None:
+            BufferedCsv.close(self)
+            return
+        if self._chunk:
+            self._write_chunk()
+        self._chunk = None
+        BufferedCsv.close(self)
+        if self._columnar_error is not None:
+            raise LogWriteError(
+                f'Failed to write to {self._columnar_path}: '
+                f'{self._columnar_error}. All rows have been written to '
+                f'{self._path}.')
+
+    def write_vars(self, var_list=None):
+
+        if var_list is None:
+            var_list = self.all_vars()
+        BufferedCsv.write_vars(self, var_list)
+        self._chunk.append(self.typed_row_values(var_list))
+        if len(self._chunk) >= self._chunk_rows:
+            self._write_chunk()
+
+    def typed_row_values(self, var_list):
+        r"""Gets the values of a list of variables as a dict, without
+        converting them to strings. Variables that don't exist are left out.
+
+        Parameters
+        ----------
+        var_list : list
+            A list of variable names.
+
+        Returns
+        -------
+        dict
+        """
+        row = {}
+        for var in var_list:
+            try:
+                row[var] = self.experiment.var.get(var, _eval=False)
+            except VariableDoesNotExist:
+                pass
+        return row
+
+    def _write_chunk(self):
+        r"""Hands the current chunk to the writer thread, which appends it to
+        the .npz file.
+        """
+        chunk, self._chunk = self._chunk, []
+        nr = self._chunk_nr
+        self._chunk_nr += 1
+
+        def task():
+            if self._columnar_error is not None:
+                return
+            try:
+                append_chunk(self._columnar_path, nr, rows_to_columns(chunk))
+            except Exception as e:
+                oslogger.error(
+                    f'failed to write to {self._columnar_path}: {e}')
+                self._columnar_error = e
+
+        self._queue.put(task)
+
+
+def column_array(values):
+    r"""Converts a list of values to a typed numpy array. None indicates a
+    missing value.
+
+    Parameters
+    ----------
+    values : list
+        A list of values.
+
+    Returns
+    -------
+    ndarray
+        An int64 array if all values are ints, a float64 array (with NaN for
+        missing values) if all values are numeric, and otherwise a str array
+        (with 'NA' for missing values).
+    """
+    present = [val for val in values if val is not None]
+    if all(isinstance(val, Integral) and not isinstance(val, bool)
+           for val in present):
+        if len(present) == len(values):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if val is None else val for val in values],
+                        dtype=np.float64)
+    if all(isinstance(val, Real) and not isinstance(val, bool)
+           for val in present):
+        return np.array([np.nan if val is None else val for val in values],
+                        dtype=np.float64)
+    return np.array([MISSING if val is None else safe_decode(val)
+                     for val in values], dtype=str)
+
+
+def rows_to_columns(rows):
+    r"""Converts a list of rows to typed columns. The columns are the union of
+    the variables in all rows, in order of appearance.
+
+    Parameters
+    ----------
+    rows : list
+        A list of dicts with variable names as keys.
+
+    Returns
+    -------
+    dict
+        A dict with variable names as keys and numpy arrays as values.
+    """
+    names = {}
+    for row in rows:
+        names.update(dict.fromkeys(row))
+    return {name: column_array([row.get(name) for row in rows])
+            for name in names}
+
+
+def append_chunk(path, nr, columns):
+    r"""Appends a chunk of columns to an .npz file. The file is opened and
+    closed for each chunk, so that it is complete after every chunk.
+
+    Parameters
+    ----------
+    path : str
+        The path to the .npz file.
+    nr : int
+        The chunk number.
+    columns : dict
+        A dict with column names as keys and numpy arrays as values.
+    """
+    with zipfile.ZipFile(path, u'a', compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, array in columns.items():
+            with zf.open(f'{nr:05d}/{name}.npy', u'w',
+                         force_zip64=True) as fd:
+                np.lib.format.write_array(fd, array, allow_pickle=False)
+
+
+def concatenate_columns(chunks):
+    r"""Concatenates chunks of columns into single columns. Columns that are
+    missing from a chunk are filled with missing values, and columns whose type
+    differs between chunks are converted to the most general type.
+
+    Parameters
+    ----------
+    chunks : list
+        A list of (length, columns) tuples, where columns is a dict with
+        column names as keys and numpy arrays as values.
+
+    Returns
+    -------
+    dict
+        A dict with column names as keys and numpy arrays as values.
+    """
+    names = {}
+    for length, columns in chunks:
+        names.update(dict.fromkeys(columns))
+    result = {}
+    for name in names:
+        parts = [columns.get(name) for length, columns in chunks]
+        kinds = {part.dtype.kind for part in parts if part is not None}
+        complete = all(part is not None for part in parts)
+        if kinds <= {u'i'} and complete:
+            dtype = np.int64
+        elif kinds <= {u'i', u'f'}:
+            dtype = np.float64
+        else:
+            dtype = str
+        result[name] = np.concatenate([
+            _missing_array(length, dtype) if part is None
+            else _convert_array(part, dtype)
+            for part, (length, columns) in zip(parts, chunks)
+        ])
+    return result
+
+
+def read_columns(path):
+    r"""Reads an .npz file that has been written by the columnar log back-end.
+
+    Parameters
+    ----------
+    path : str
+        The path to the .npz file.
+
+    Returns
+    -------
+    dict
+        A dict with column names as keys and numpy arrays as values.
+    """
+    chunks = {}
+    with zipfile.ZipFile(path) as zf:
+        for member in zf.namelist():
+            nr, name = os.path.splitext(member)[0].split(u'/', 1)
+            with zf.open(member) as fd:
+                chunks.setdefault(nr, {})[name] = np.lib.format.read_array(
+                    fd, allow_pickle=False)
+    return concatenate_columns([
+        (len(next(iter(columns.values()))), columns)
+        for nr, columns in sorted(chunks.items(),
+                                  key=lambda item: int(item[0]))
+    ])
+
+
+def write_columns(path, columns):
+    r"""Writes columns to an .npz file in the format of the columnar log
+    back-end, as a single chunk.
+
+    Parameters
+    ----------
+    path : str
+        The path to the .npz file.
+    columns : dict
+        A dict with column names as keys and numpy arrays as values.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    append_chunk(path, 0, columns)
+
+
+def read_csv(path):
+    r"""Reads a CSV file that has been written by the csv, buffered_csv, or
+    columnar log back-ends. Values are converted to numbers in the same way as
+    `var.set()` does, and 'NA' indicates a missing value.
+
+    Parameters
+    ----------
+    path : str
+        The path to the CSV file.
+
+    Returns
+    -------
+    dict
+        A dict with column names as keys and numpy arrays as values.
+    """
+    with safe_open(path, newline=u'') as fd:
+        reader = _csv.reader(fd, escapechar=u'\\', doublequote=False)
+        header = next(reader, [])
+        rows = [row for row in reader if len(row) == len(header)]
+    return {
+        name: column_array([_csv_value(row[i]) for row in rows])
+        for i, name in enumerate(header)
+    }
+
+
+def write_csv(path, columns):
+    r"""Writes columns to a CSV file in the format of the csv log back-end.
+
+    Parameters
+    ----------
+    path : str
+        The path to the CSV file.
+    columns : dict
+        A dict with column names as keys and numpy arrays as values.
+    """
+    names = list(columns)
+    values = [[_csv_str(val) for val in columns[name].tolist()]
+              for name in names]
+    with safe_open(path, u'w') as fd:
+        fd.write(BufferedCsv.format_row(names) + u'\n')
+        for row in zip(*values):
+            fd.write(BufferedCsv.format_row(row) + u'\n')
+
+
+def convert(src, dst):
+    r"""Converts a data file to another format. The format is determined by
+    the extension, which should be .csv, .npz, .parquet, or .feather. Parquet
+    and Feather files require pyarrow.
+
+    Parameters
+    ----------
+    src : str
+        The path to the source file.
+    dst : str
+        The path to the destination file.
+    """
+    src_fmt = _format(src)
+    dst_fmt = _format(dst)
+    if src_fmt == u'csv':
+        columns = read_csv(src)
+    elif src_fmt == u'npz':
+        columns = read_columns(src)
+    else:
+        table = _arrow_module(src_fmt).read_table(src)
+        columns = {name: _from_arrow(table.column(name))
+                   for name in table.column_names}
+    if dst_fmt == u'csv':
+        write_csv(dst, columns)
+    elif dst_fmt == u'npz':
+        write_columns(dst, columns)
+    else:
+        module = _arrow_module(dst_fmt)
+        import pyarrow
+        table = pyarrow.table(columns)
+        if dst_fmt == u'parquet':
+            module.write_table(table, dst)
+        else:
+            module.write_feather(table, dst)
+
+
+def _format(path):
+
+    fmt = os.path.splitext(path)[1][1:].lower()
+    if fmt not in FORMATS:
+        raise InvalidValue(
+            f'{path} should have one of the following extensions: {FORMATS}')
+    return fmt
+
+
+def _arrow_module(fmt):
+
+    try:
+        if fmt == u'parquet':
+            import pyarrow.parquet as module
+        else:
+            import pyarrow.feather as module
+    except ImportError:
+        raise MissingDependency(f'{fmt} files require pyarrow')
+    return module
+
+
+def _from_arrow(column):
+
+    array = column.to_numpy(zero_copy_only=False)
+    if array.dtype.kind == u'O':
+        return column_array([None if val is None else val for val in array])
+    if array.dtype.kind == u'b':
+        return array.astype(np.int64)
+    return array
+
+
+def _missing_array(length, dtype):
+
+    if dtype is str:
+        return np.full(length, MISSING, dtype=str)
+    return np.full(length, np.nan, dtype=dtype)
+
+
+def _convert_array(array, dtype):
+
+    if dtype is not str or array.dtype.kind == u'U':
+        return array.astype(dtype)
+    return np.array([_csv_str(val) for val in array.tolist()], dtype=str)
+
+
+def _csv_value(val):
+
+    if val == MISSING:
+        return None
+    try:
+        val = float(val)
+    except ValueError:
+        return val
+    try:
+        ival = int(val)
+    except (ValueError, ArithmeticError):
+        return val
+    return ival if ival == val else val
+
+
+def _csv_str(val):
+
+    if isinstance(val, float) and val != val:
+        return MISSING
+    return safe_decode(val)
+
+
+# Non PEP-8 alias for backwards compatibility
+columnar = Columnar
+
+
+if __name__ == u'__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description=u'Converts OpenSesame data files between the csv, npz, '
+        u'parquet, and feather formats')
+    parser.add_argument(u'src', help=u'The source file')
+    parser.add_argument(u'dst', help=u'The destination file')
+    args = parser.parse_args()
+    convert(args.src, args.dst)
@@ -61,6 +61,10 @@ class Csv(Log):
         if newline:
             self._log.write(u'\n')
         # Flush to avoid pending write operations
+        self.flush()
+
+    def flush(self):
+
         self._log.flush()
         os.fsync(self._log)
 
@@ -69,15 +73,45 @@ class Csv(Log):
         if var_list is None:
             var_list = self.all_vars()
         if not self._header_written:
-            l = [u'"%s"' % var.replace(u'"', u'\\"') for var in var_list]
-            self.write(u','.join(l))
+            self.write(self.format_row(var_list))
             self._header_written = True
-        l = []
-        for var in var_list:
-            val = self.experiment.var.get(var, _eval=False, default=u'NA')
-            val = safe_decode(val)
-            l.append(u'"%s"' % val.replace(u'"', u'\\"'))
-        self.write(u','.join(l))
+        self.write(self.format_row(self.row_values(var_list)))
+
+    def row_values(self, var_list):
+        r"""Gets the values of a list of variables as strings, using 'NA' for
+        variables that don't exist.
+
+        Parameters
+        ----------
+        var_list : list
+            A list of variable names.
+
+        Returns
+        -------
+        list
+        """
+        return [
+            safe_decode(
+                self.experiment.var.get(var, _eval=False, default=u'NA'))
+            for var in var_list
+        ]
+
+    @staticmethod
+    def format_row(values):
+        r"""Formats a list of strings as a line of quoted, comma-separated
+        values, without a trailing newline.
+
+        Parameters
+        ----------
+        values : list
+            A list of strings.
+
+        Returns
+        -------
+        str
+        """
+        return u','.join(
+            [u'"%s"' % val.replace(u'"', u'\\"') for val in values])
 
 
 # Non PEP-8 alias for backwards compatibility
@@ -66,6 +66,28 @@ class Log:
         """
         pass
 
+    def flush(self):
+        r"""Makes sure that everything that has been written to the log is
+        stored on disk. Depending on the back-end, this may block until all
+        pending data has been written.
+
+        Examples
+        --------
+        >>> log.flush()
+        """
+        pass
+
+    def end_block(self):
+        """
+        visible: False
+
+        desc:
+            Is called by loop items when they finish, which generally
+            corresponds to the end of a block of trials. Back-ends that buffer
+            data can use this as an opportunity to store it on disk.
+        """
+        pass
+
     def all_vars(self):
         """
         visible: False
@@ -22,6 +22,7 @@ from openexp._mouse.mouse import Mouse
 from openexp._coordinates.legacy import Legacy as LegacyCoordinates
 from libopensesame.exceptions import UserAborted
 from openexp.backend import configurable
+from openexp._events.legacy import event_pump
 import pygame
 
 
@@ -35,6 +36,11 @@ class Legacy(Mouse, LegacyCoordinates):
             u"name": u"Enable escape",
             u"description": u"Abort the experiment when the upper left and right corners are clicked",
             u"default": u"no",
+        },
+        u"mouse_event_wait": {
+            u"name": u"Wait for mouse events",
+            u"description": u"Sleep until a mouse event arrives, instead of continuously polling for mouse events",
+            u"default": u"yes",
         }
     }
 
@@ -71,63 +77,74 @@ class Legacy(Mouse, LegacyCoordinates):
             u'no',
             [u'yes', u'no']
         ) == u'yes'
+        event_wait = self.experiment.var.get(
+            u'mouse_event_wait',
+            u'yes',
+            [u'yes', u'no']
+        ) == u'yes'
+        pump = event_pump(self.experiment)
+        clock = self.experiment.clock
         pygame.mouse.set_visible(self.visible)
-        start_time = pygame.time.get_ticks()
-        time = start_time
+        start_time = clock.time()
         while True:
-            time = pygame.time.get_ticks()
-            # Process the input
-            for event in pygame.event.get():
-                if event.type == KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
-                        continue
-                    pygame.event.post(event)
-                if event.type == event_type:
-                    # Check escape sequence. If the top-left and top-right
-                    # corner are clicked successively within 2000ms, the
-                    # experiment is aborted
-                    if (
-                            enable_escape and event.pos[0] < 64
-                            and event.pos[1] < 64
-                    ):
-                        _time = pygame.time.get_ticks()
-                        while pygame.time.get_ticks() - _time < 2000:
-                            for event in pygame.event.get():
-                                if event.type == event_type:
-                                    if (
-                                            event.pos[0] > self.experiment.var.width-64
-                                            and event.pos[1] < 64
-                                    ):
-                                        raise UserAborted(
-                                            "The escape sequence was clicked/ tapped")
-                    if buttonlist is None or event.button in buttonlist:
-                        pygame.mouse.set_visible(self._cursor_shown)
-                        return event.button, self.from_xy(event.pos), time
-            if timeout is not None and time-start_time >= timeout:
+            remaining = None if timeout is None \
+                else start_time + timeout - clock.time()
+            event, time = pump.get([event_type], timeout=remaining,
+                                   wait=event_wait)
+            if event is None:
+                break
+            # Check escape sequence. If the top-left and top-right corner are
+            # clicked successively within 2000ms, the experiment is aborted
+            if enable_escape and event.pos[0] < 64 and event.pos[1] < 64:
+                self._check_escape_sequence(event_type)
+            if buttonlist is None or event.button in buttonlist:
+                pygame.mouse.set_visible(self._cursor_shown)
+                return event.button, self.from_xy(event.pos), time
+            if timeout is not None and time - start_time >= timeout:
                 break
         pygame.mouse.set_visible(self._cursor_shown)
         return None, None, time
 
+    def _check_escape_sequence(self, event_type):
+        r"""Raises UserAborted if the top-right corner is clicked within 2000
+        ms after the top-left corner has been clicked.
+        """
+        pump = event_pump(self.experiment)
+        clock = self.experiment.clock
+        _time = clock.time()
+        while True:
+            remaining = _time + 2000 - clock.time()
+            if remaining <= 0:
+                break
+            event, time = pump.get([event_type], timeout=remaining)
+            if (
+                    event is not None
+                    and event.pos[0] > self.experiment.var.width-64
+                    and event.pos[1] < 64
+            ):
+                raise UserAborted("The escape sequence was clicked/ tapped")
+
     def get_pos(self):
 
-        pygame.event.get()
-        return self.from_xy(pygame.mouse.get_pos()), self.experiment.time()
+        # Pumping the events updates the mouse state, without discarding
+        # events that other devices may need
+        event_pump(self.experiment).pump()
+        return self.from_xy(pygame.mouse.get_pos()), \
+            self.experiment.clock.time()
 
     def get_pressed(self):
 
-        pygame.event.get()
+        event_pump(self.experiment).pump()
         return pygame.mouse.get_pressed()
 
     def flush(self):
 
+        pump = event_pump(self.experiment)
+        pump.handle_escape()
         buttonclicked = False
-        for event in pygame.event.get():
-            if event.type == KEYDOWN and event.key == pygame.K_ESCAPE:
-                self.experiment.pause()
+        for event, time in pump.get_all([MOUSEBUTTONDOWN, MOUSEBUTTONUP]):
             if event.type == MOUSEBUTTONDOWN:
                 buttonclicked = True
-        pygame.event.pump()
         return buttonclicked
 
 
@@ -20,6 +20,7 @@ from libopensesame.py3compat import *
 from pygame.locals import *
 from openexp._mouse.mouse import Mouse
 from openexp._mouse.legacy import Legacy
+from openexp._events.legacy import event_pump
 from openexp.backend import configurable
 import pygame
 from expyriment import stimuli
@@ -44,22 +45,29 @@ class Xpyriment(XpyrimentCoordinates, Legacy):
 
         buttonlist = self.buttonlist
         timeout = self.timeout
+        event_wait = self.experiment.var.get(
+            u'mouse_event_wait',
+            u'yes',
+            [u'yes', u'no']
+        ) == u'yes'
+        # Clicks are collected through the event pump that is shared with
+        # the legacy keyboard, so that clicks that are taken from the PyGame
+        # queue by other devices are not lost, and keypresses are left for the
+        # keyboard
+        pump = event_pump(self.experiment)
+        clock = self.experiment.clock
         pygame.mouse.set_visible(self.visible)
-        start_time = pygame.time.get_ticks()
-        time = start_time
+        start_time = clock.time()
         while True:
-            time = pygame.time.get_ticks()
-            # Process the input
-            for event in pygame.event.get():
-                if event.type == KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
-                        continue
-                    pygame.event.post(event)
-                if event.type == MOUSEBUTTONDOWN:
-                    if buttonlist is None or event.button in buttonlist:
-                        pygame.mouse.set_visible(self._cursor_shown)
-                        return event.button, self.from_xy(event.pos), time
+            remaining = None if timeout is None \
+                else start_time + timeout - clock.time()
+            event, time = pump.get([MOUSEBUTTONDOWN], timeout=remaining,
+                                   wait=event_wait)
+            if event is None:
+                break
+            if buttonlist is None or event.button in buttonlist:
+                pygame.mouse.set_visible(self._cursor_shown)
+                return event.button, self.from_xy(event.pos), time
             if timeout is not None and time - start_time >= timeout:
                 break
         pygame.mouse.set_visible(self._cursor_shown)
@@ -26,6 +26,7 @@ from libopensesame.oslogging import oslogger
 from libopensesame import misc
 from openexp.keyboard import Keyboard
 from openexp.backend import configurable
+from openexp._canvas.stimulus_cache import stimulus_cache, file_key
 import os.path
 try:
     import numpy
@@ -72,7 +73,17 @@ class Legacy(Sampler):
                     raise SoundFileDoesNotExist(src)
                 if os.path.splitext(src)[1].lower() not in (".ogg", ".wav"):
                     raise UnsupportedSoundFileFormat(src)
-            self.sound = mixer.Sound(src)
+            if isinstance(src, str) and numpy is not None:
+                # Decoded sound files are kept in the stimulus cache
+                key = file_key(u'sound', src, mixer.get_init())
+                self._source = stimulus_cache.get(key)
+                if self._source is None:
+                    self._source = mixer.Sound(src)
+                    stimulus_cache.put(key, self._source,
+                                       sound_nbytes(self._source))
+            else:
+                self._source = mixer.Sound(src)
+            self.sound = self._source
         Sampler.__init__(self, experiment, src, **playback_args)
         self.keyboard = Keyboard(experiment)
 
@@ -82,55 +93,60 @@ class Legacy(Sampler):
             cfg[u'duration'] = 0
         if u'fade_in' in cfg and cfg[u'fade_in'] is None:
             cfg[u'fade_in'] = 0
-        Sampler.set_config(self, **cfg)
-        if u'volume' in cfg:
-            self.sound.set_volume(cfg[u'volume'])
         if u'pitch' in cfg:
-            self.adjust_pitch(cfg[u'pitch'])
+            check_pitch(cfg[u'pitch'])
         if u'pan' in cfg:
-            self.adjust_pan(cfg[u'pan'])
+            check_pan(cfg[u'pan'])
+        Sampler.set_config(self, **cfg)
+        if u'volume' in cfg or u'pitch' in cfg or u'pan' in cfg:
+            self._prepare_sound()
+
+    def _prepare_sound(self):
+        r"""Creates the sound for the current pitch, pan, and volume from the
+        source sound. Prepared sounds are kept in the stimulus cache, so that
+        samplers that play the same sound with the same settings share a
+        single buffer.
+        """
+        pitch, pan, volume = self.pitch, self.pan, self.volume
+        # On Android, numpy does not exist and pitch and pan are not supported
+        if numpy is None or (pitch == 1 and pan == 0 and volume == 1):
+            self.sound = self._source
+            self.sound.set_volume(volume)
+            return
+        # The key includes the source sound object itself, rather than its
+        # path, so that sounds that are not loaded from a file can also be
+        # cached.
+        key = u'sound', self._source, pitch, pan, volume
+        self.sound = stimulus_cache.get(key)
+        if self.sound is not None:
+            return
+        buf = pygame.sndarray.array(self._source)
+        buf = pan_buffer(pitch_buffer(buf, pitch), pan)
+        self.sound = pygame.sndarray.make_sound(buf)
+        self.sound.set_volume(volume)
+        stimulus_cache.put(key, self.sound, buf.nbytes)
 
     def adjust_pitch(self, p):
 
         # On Android, numpy does not exist and this is not supported
         if numpy is None:
             return
-        if type(p) not in (int, float) or p <= 0:
-            raise InvalidValue(f'pitch should be a positive number, not {p}')
+        check_pitch(p)
         if p == 1:
             return
-        buf = pygame.sndarray.array(self.sound)
-        _buf = []
-        for i in range(int(float(len(buf)) / p)):
-            _buf.append(buf[int(float(i) * p)])
         self.sound = pygame.sndarray.make_sound(
-            numpy.array(_buf, dtype=u"int16"))
+            pitch_buffer(pygame.sndarray.array(self.sound), p))
 
     def adjust_pan(self, p):
 
         # On Android, numpy does not exist and this is not supported
         if numpy is None:
             return
-        if type(p) not in (int, float) and p not in (u"left", u"right"):
-            raise InvalidValue(
-                f'pan should be a number, "left" or "right", not {p}')
+        check_pan(p)
         if p == 0:
             return
-        buf = pygame.sndarray.array(self.sound)
-        for i in range(len(buf)):
-            l = buf[i][0]
-            r = buf[i][1]
-            if p == "left":
-                r = 0
-            elif p == "right":
-                l = 0
-            elif p < 0:
-                r = int(float(r) / abs(p))
-            else:
-                l = int(float(l) / p)
-            buf[i][0] = l
-            buf[i][1] = r
-        self.sound = pygame.sndarray.make_sound(numpy.array(buf))
+        self.sound = pygame.sndarray.make_sound(
+            pan_buffer(pygame.sndarray.array(self.sound), p))
 
     @configurable
     def play(self, **playback_args):
@@ -187,5 +203,96 @@ class Legacy(Sampler):
         mixer.quit()
 
 
+def check_pitch(p):
+    r"""Raises an InvalidValue if p is not a valid pitch."""
+    if type(p) not in (int, float) or p <= 0:
+        raise InvalidValue(f'pitch should be a positive number, not {p}')
+
+
+def check_pan(p):
+    r"""Raises an InvalidValue if p is not a valid pan."""
+    if type(p) not in (int, float) and p not in (u"left", u"right"):
+        raise InvalidValue(
+            f'pan should be a number, "left" or "right", not {p}')
+
+
+def pitch_buffer(buf, p):
+    r"""Changes the pitch (and speed) of a sound buffer by resampling it with
+    linear interpolation.
+
+    Parameters
+    ----------
+    buf : ndarray
+        A sound buffer with one row per frame, as returned by
+        pygame.sndarray.array().
+    p : int, float
+        The pitch, where values > 1 indicate a higher pitch.
+
+    Returns
+    -------
+    ndarray
+        A new sound buffer of the same type.
+    """
+    if p == 1:
+        return buf
+    n = len(buf)
+    t = numpy.arange(int(n / p)) * float(p)
+    samples = numpy.arange(n)
+    if buf.ndim == 1:
+        resampled = numpy.interp(t, samples, buf)
+    else:
+        resampled = numpy.stack(
+            [numpy.interp(t, samples, buf[:, i]) for i in range(buf.shape[1])],
+            axis=1
+        )
+    return _to_dtype(numpy.round(resampled), buf.dtype)
+
+
+def pan_buffer(buf, p):
+    r"""Changes the panning of a stereo sound buffer by attenuating the left
+    or right channel.
+
+    Parameters
+    ----------
+    buf : ndarray
+        A sound buffer with one row per frame and one column per channel, as
+        returned by pygame.sndarray.array().
+    p : int, float, str
+        'left' or 'right' to silence the other channel, negative values to
+        divide the right channel by -p, or positive values to divide the left
+        channel by p.
+
+    Returns
+    -------
+    ndarray
+        A new sound buffer of the same type.
+    """
+    if p == 0 or buf.ndim == 1 or buf.shape[1] < 2:
+        return buf
+    gain = numpy.ones(buf.shape[1])
+    if p == u'left':
+        gain[1] = 0
+    elif p == u'right':
+        gain[0] = 0
+    elif p < 0:
+        gain[1] = 1 / abs(p)
+    else:
+        gain[0] = 1 / p
+    return _to_dtype(numpy.trunc(buf * gain), buf.dtype)
+
+
+def sound_nbytes(sound):
+    r"""Gives the size of a PyGame sound in bytes."""
+    return pygame.sndarray.samples(sound).nbytes
+
+
+def _to_dtype(buf, dtype):
+
+    if numpy.issubdtype(dtype, numpy.integer):
+        info = numpy.iinfo(dtype)
+        buf = numpy.clip(buf, info.min, info.max)
+    return numpy.ascontiguousarray(buf.astype(dtype))
+
+
 # Non PEP-8 alias for backwards compatibility
 legacy = Legacy
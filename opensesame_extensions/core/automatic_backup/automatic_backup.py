@@ -91,7 +91,10 @@ class AutomaticBackup(BaseExtension):
                                                                         u'_'))
             try:
                 self.main_window.get_ready()
-                self.experiment.save(path, overwrite=True, update_path=False)
+                self.experiment.save(
+                    path, overwrite=True, update_path=False,
+                    compresslevel=cfg.osexp_compress_level,
+                    reuse_pool_files=cfg.osexp_reuse_pool_files)
                 oslogger.debug(u"saving backup as %s" % path)
             except Exception as e:
                 oslogger.warning(f'failed to save backup: {e}')
@@ -86,8 +86,24 @@ class VariableInspector(BaseExtension):
         self.refresh()
 
     def event_change_item(self, name):
+        self.dock_widget.widget().invalidate_var_info()
         self.refresh()
 
+    # The following events change the variables that are defined by items,
+    # which are collected again on the next refresh
+
+    def event_new_item(self, name, _type):
+        self.dock_widget.widget().invalidate_var_info()
+
+    def event_delete_item(self, name):
+        self.dock_widget.widget().invalidate_var_info()
+
+    def event_rename_item(self, from_name, to_name):
+        self.dock_widget.widget().invalidate_var_info()
+
+    def event_change_experiment(self):
+        self.dock_widget.widget().invalidate_var_info()
+
     def event_pause_experiment(self):
         self.refresh()
 
@@ -97,4 +113,5 @@ class VariableInspector(BaseExtension):
 
     def event_open_experiment(self, path):
         self.dock_widget.widget().set_workspace_globals({})
+        self.dock_widget.widget().invalidate_var_info()
         self.refresh()
@@ -0,0 +1,195 @@
+# -*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+from bisect import bisect_left
+from qtpy import QtCore, QtGui
+from libqtopensesame.misc.translate import translation_context
+_ = translation_context(u'variable_inspector', category=u'extension')
+
+# If more rows than this are added or removed at once, the model is reset,
+# which is faster than inserting or removing the rows one at a time
+MAX_INCREMENTAL_CHANGES = 100
+
+
+def cell_text(value):
+    r"""Converts a variable value or a list of sources to the text that is
+    shown in a cell.
+
+    Parameters
+    ----------
+    value : any
+
+    Returns
+    -------
+    tuple
+        A (text, alignment) tuple.
+    """
+    if isinstance(value, str):
+        return value, QtCore.Qt.AlignLeft
+    try:
+        len(value)
+    except TypeError:
+        if value is None:
+            return u'', QtCore.Qt.AlignLeft
+        if isinstance(value, (int, float)):
+            return str(value), QtCore.Qt.AlignRight
+        return safe_decode(value, errors=u'ignore'), QtCore.Qt.AlignLeft
+    return u','.join([safe_decode(s) for s in value]), QtCore.Qt.AlignLeft
+
+
+class VariableInspectorModel(QtCore.QAbstractTableModel):
+
+    r"""A table model of variables, as returned by var_store.inspect(). Rows
+    are kept in alphabetical order and are updated incrementally, so that
+    only the rows that changed are redrawn.
+    """
+    def __init__(self, parent=None):
+
+        super().__init__(parent)
+        self._names = []
+        self._rows = {}
+        self._bold_font = QtGui.QFont()
+        self._bold_font.setBold(True)
+        self._headers = _(u'Variable'), _(u'Value'), _(u'Source(s)')
+
+    def set_variables(self, variables):
+        r"""Updates the model with new variables.
+
+        Parameters
+        ----------
+        variables : dict
+            A dict as returned by var_store.inspect().
+        """
+        rows = {}
+        for name, info in variables.items():
+            value, alignment = cell_text(info[u'value'])
+            rows[name] = (
+                name, value, cell_text(info[u'source'])[0], alignment,
+                info[u'alive']
+            )
+        removed = [name for name in self._names if name not in rows]
+        added = [name for name in rows if name not in self._rows]
+        if len(removed) + len(added) > MAX_INCREMENTAL_CHANGES:
+            self.beginResetModel()
+            self._names = sorted(rows)
+            self._rows = rows
+            self.endResetModel()
+            return
+        root = QtCore.QModelIndex()
+        for name in removed:
+            i = bisect_left(self._names, name)
+            self.beginRemoveRows(root, i, i)
+            del self._names[i]
+            del self._rows[name]
+            self.endRemoveRows()
+        for name in sorted(added):
+            i = bisect_left(self._names, name)
+            self.beginInsertRows(root, i, i)
+            self._names.insert(i, name)
+            self._rows[name] = rows[name]
+            self.endInsertRows()
+        # Consecutive rows that changed are announced together
+        first = None
+        for i, name in enumerate(self._names + [None]):
+            if name is not None and self._rows[name] != rows[name]:
+                self._rows[name] = rows[name]
+                if first is None:
+                    first = i
+            elif first is not None:
+                self.dataChanged.emit(self.index(first, 0),
+                                      self.index(i - 1, 2))
+                first = None
+
+    def row_text(self, row):
+        r"""Gives the texts of a row, which are used for filtering.
+
+        Parameters
+        ----------
+        row : int
+
+        Returns
+        -------
+        tuple
+            A (name, value, sources) tuple.
+        """
+        return self._rows[self._names[row]][:3]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+
+        return 0 if parent.isValid() else len(self._names)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+
+        return 0 if parent.isValid() else 3
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+
+        if not index.isValid():
+            return None
+        row = self._rows[self._names[index.row()]]
+        if role == QtCore.Qt.DisplayRole:
+            return row[index.column()]
+        if role == QtCore.Qt.TextAlignmentRole:
+            alignment = (row[3] if index.column() == 1
+                         else QtCore.Qt.AlignLeft) | QtCore.Qt.AlignVCenter
+            # PyQt6 flags are enums, PyQt5 flags can be converted directly
+            return int(getattr(alignment, u'value', alignment))
+        if role == QtCore.Qt.FontRole and row[4]:
+            return self._bold_font
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+
+        if orientation == QtCore.Qt.Horizontal \
+                and role == QtCore.Qt.DisplayRole:
+            return self._headers[section]
+        return None
+
+
+class VariableFilterProxyModel(QtCore.QSortFilterProxyModel):
+
+    r"""Filters and sorts the variable model. A filter consists of one or
+    more queries separated by `|`, and a variable is shown if any query occurs
+    in its name, value, or sources. Filters of a single character are
+    ignored.
+    """
+    def __init__(self, parent=None):
+
+        super().__init__(parent)
+        self._queries = None
+
+    def set_filter(self, filt):
+        r"""Sets the filter text.
+
+        Parameters
+        ----------
+        filt : str
+        """
+        self._queries = [q.strip() for q in filt.split(u'|')] \
+            if len(filt) > 1 else None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+
+        if self._queries is None:
+            return True
+        name, value, sources = self.sourceModel().row_text(source_row)
+        sources = sources.replace(u',', u' ')
+        return any(q in name or q in value or q in sources
+                   for q in self._queries)
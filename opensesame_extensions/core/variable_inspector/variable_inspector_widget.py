@@ -17,7 +17,9 @@ You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
-from .variable_inspector_cell import VariableInspectorCell
+from .variable_inspector_model import VariableInspectorModel, \
+    VariableFilterProxyModel
+from qtpy import QtCore
 from libqtopensesame.widgets.base_widget import BaseWidget
 from libqtopensesame.misc import drag_and_drop
 from libqtopensesame.misc.translate import translation_context
@@ -43,11 +45,17 @@ class VariableInspectorWidget(BaseWidget):
             main_window,
             ui=u'extensions.variable_inspector.variable_inspector')
         self.ext = ext
-        self.ui.edit_variable_filter.textChanged.connect(self.refresh)
+        self._model = VariableInspectorModel(self)
+        self._proxy_model = VariableFilterProxyModel(self)
+        self._proxy_model.setSourceModel(self._model)
+        self.ui.table_variables.setModel(self._proxy_model)
+        self.ui.table_variables.sortByColumn(0, QtCore.Qt.AscendingOrder)
+        self.ui.edit_variable_filter.textChanged.connect(self._apply_filter)
         self.ui.button_help_variables.clicked.connect(self.ext.open_help)
         self.ui.button_reset.clicked.connect(self._reset)
         self.ui.table_variables.mousePressEvent = self.start_drag
         self._workspace_globals = {}
+        self._var_info = None
         self.refresh()
 
     def focus(self):
@@ -59,6 +67,23 @@ class VariableInspectorWidget(BaseWidget):
         self.set_workspace_globals({})
         self.refresh()
 
+    def _apply_filter(self, filt):
+        r"""Filters the table.
+
+        Parameters
+        ----------
+        filt : str
+            The filter text.
+        """
+        self._proxy_model.set_filter(str(filt))
+
+    def invalidate_var_info(self):
+        r"""Indicates that the variables that are defined by the items may
+        have changed, so that they need to be collected again on the next
+        refresh.
+        """
+        self._var_info = None
+
     def var(self):
         """Returns a (var_store, alive) tuple, where alive indicates whether
         the var_store is from an active or finished experiment, or from an 
@@ -88,11 +113,10 @@ class VariableInspectorWidget(BaseWidget):
         ----------
         e : QMousePressEvent
         """
-        item = self.ui.table_variables.itemAt(e.pos())
-        if item is None:
+        index = self.ui.table_variables.indexAt(e.pos())
+        if not index.isValid():
             return
-        row = self.ui.table_variables.row(item)
-        var = self.ui.table_variables.item(row, 0).text()
+        var = index.sibling(index.row(), 0).data()
         drag_and_drop.send(
             self.ui.table_variables,
             {
@@ -102,12 +126,7 @@ class VariableInspectorWidget(BaseWidget):
         )
 
     def refresh(self):
-        r"""Refreshes the table."""
-        # Remember the view position
-        scrollpos = self.ui.table_variables.verticalScrollBar().sliderPosition()
-        col = self.ui.table_variables.currentColumn()
-        row = self.ui.table_variables.currentRow()
-        filt = str(self.ui.edit_variable_filter.text())
+        r"""Refreshes the table. Only rows that changed are updated."""
         var_store, alive = self.var()
         self.ui.label_no_heartbeat.setVisible(
             not self.main_window.runner_cls.has_heartbeat())
@@ -118,32 +137,13 @@ class VariableInspectorWidget(BaseWidget):
             self.ui.widget_reset_message.show()
         else:
             self.ui.widget_reset_message.hide()
-        # Filter the variables if necessary
-        if len(filt) > 1:
-            d = {
-                var: info
-                for var, info in var_store.inspect().items()
-                if any(
-                    q.strip() in var or
-                    q.strip() in safe_decode(info[u'value'],
-                                             errors=u'ignore') or
-                    q.strip() in u' '.join(info[u'source'])
-                    for q in filt.split(u'|')
-                )
-            }
-        else:
-            d = var_store.inspect()
-        # Populate the table
-        self.ui.table_variables.setRowCount(len(d))
-        for i, var in enumerate(sorted(d.keys())):
-            info = d[var]
-            self.ui.table_variables.setItem(
-                i, 0, VariableInspectorCell(var, info))
-            self.ui.table_variables.setItem(
-                i, 1, VariableInspectorCell(info['value'], info))
-            self.ui.table_variables.setItem(
-                i, 2, VariableInspectorCell(info['source'], info))
-        # Restore the view position
-        self.ui.table_variables.setCurrentCell(row, col)
-        self.ui.table_variables.verticalScrollBar().setSliderPosition(
-            scrollpos)
+        if alive:
+            # The variables of a running experiment are described by the
+            # experiment process
+            self._model.set_variables(var_store.inspect())
+            return
+        # The variables that are defined by the items of the GUI experiment
+        # only change when items change
+        if self._var_info is None:
+            self._var_info = var_store.var_info_index()
+        self._model.set_variables(var_store.inspect(var_info=self._var_info))
@@ -26,6 +26,8 @@ class BaseTask:
     ALIVE = 0
     DEAD = 1
     ABORT = 2
+    # The name is used for the step-duration variables
+    name = u'task'
 
     def __init__(self, coroutines, start_time, end_time, abort_on_end=False):
         r"""Constructor.
@@ -50,6 +52,31 @@ class BaseTask:
         self.end_time = end_time
         self.coroutines = coroutines
         self._abort_on_end = abort_on_end
+        self.steps = 0
+        self.total_step_duration = 0
+        self.max_step_duration = 0
+
+    @property
+    def mean_step_duration(self):
+        r"""The mean duration of a step in milliseconds, or 0 if the task has
+        not been stepped.
+        """
+        if not self.steps:
+            return 0
+        return self.total_step_duration / self.steps
+
+    def record_step(self, duration):
+        r"""Records the duration of a step.
+
+        Parameters
+        ----------
+        duration : float
+            The duration of the step in milliseconds.
+        """
+        self.steps += 1
+        self.total_step_duration += duration
+        if duration > self.max_step_duration:
+            self.max_step_duration = duration
 
     def started(self, dt):
         """
@@ -17,6 +17,9 @@ You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
+import bisect
+import heapq
+import itertools
 from libopensesame.item import Item
 from . import ItemTask, InlineTask
 
@@ -110,10 +113,16 @@ class Coroutines(Item):
 
     def run(self):
         """See item."""
-        # Launch all coroutines
-        for task in self._schedule:
+        # Launch all coroutines. Tasks that have not started yet are kept in a
+        # heap by start time. Active tasks are kept in a list that is sorted by
+        # end time, so that the first task is always the first one to end.
+        # Ties are broken by the order in the schedule for pending tasks, and
+        # by the order of activation for active tasks.
+        pending = []
+        for order, task in enumerate(self._schedule):
             task.launch()
-        self._schedule.sort(key=lambda task: task.start_time)
+            heapq.heappush(pending, (task.start_time, order, task))
+        activation = itertools.count()
         dt = 0
         active = []
         t0 = self.clock.time()
@@ -121,20 +130,35 @@ class Coroutines(Item):
         running = True
         while running and dt < self.var.duration:
             # Activate coroutines by start time
-            while self._schedule and self._schedule[0].started(dt):
-                active.append(self._schedule.pop(0))
-                active.sort(key=lambda task: task.end_time)
+            while pending and pending[0][2].started(dt):
+                start_time, order, task = heapq.heappop(pending)
+                bisect.insort(active, (task.end_time, next(activation), task))
+            # If no coroutines are active, there is nothing to do until the
+            # next coroutine starts, or until the coroutines end.
+            if not active:
+                deadline = self.var.duration
+                if pending:
+                    deadline = min(deadline, pending[0][0])
+                if deadline > dt:
+                    self._sleep_until(t0 + deadline)
+                    dt = self.clock.time() - t0
+                    continue
             for fnc in self.pre_cycle_functions:
                 fnc()
             # Run all active coroutines. If a task returns alive, it should be
             # kept as an active task; if it returns DEAD, it should be removed
             # from the active tasks; if it returns ABORT, the whole coroutines
-            # should be aborted.
+            # should be aborted. The time that each step takes is recorded.
             _active = []
-            for task in active:
+            t_step = self.clock.time()
+            for entry in active:
+                task = entry[2]
                 status = task.step()
+                t = self.clock.time()
+                task.record_step(t - t_step)
+                t_step = t
                 if status == task.ALIVE:
-                    _active.append(task)
+                    _active.append(entry)
                     continue
                 if status == task.ABORT:
                     running = False
@@ -142,18 +166,26 @@ class Coroutines(Item):
             for fnc in self.post_cycle_functions:
                 fnc()
             # De-activate coroutines by end time
-            while active and active[0].stopped(dt):
-                active.pop(0)
+            stopped = 0
+            while stopped < len(active) and active[stopped][2].stopped(dt):
+                stopped += 1
+            del active[:stopped]
             dt = self.clock.time()-t0
             i += 1
         self.event('killed after %d ms' % (self.clock.time()-t0))
         # Kill pending coroutines
-        for task in active:
+        for end_time, activated, task in active:
             task.kill()
         self.event('trampoline took %d ms' % (self.clock.time()-t0))
         self.experiment.var.coroutines_cycles = i
         self.experiment.var.coroutines_duration = dt
-        self.experiment.var.coroutines_mean_cycle_duration = 1.*dt/i
+        self.experiment.var.coroutines_mean_cycle_duration = \
+            1.*dt/i if i else 0
+        for task in self._schedule:
+            for stat in (u'steps', u'mean_step_duration',
+                         u'max_step_duration'):
+                self.experiment.var.set(self._task_var(stat, task.name),
+                                        getattr(task, stat))
         self.event('%d cycles with an average duration of %.4f ms' %
                    (
                        self.experiment.var.coroutines_cycles,
@@ -161,10 +193,42 @@ class Coroutines(Item):
                    )
                    )
 
+    def _task_var(self, stat, name):
+        r"""Returns the name of the variable that holds a step statistic
+        (steps, mean_step_duration, or max_step_duration) of a task.
+        """
+        return u'coroutines_%s_%s' % (
+            stat, self.syntax.sanitize(name, strict=True, allow_vars=False))
+
+    def _sleep_until(self, t):
+        r"""Sleeps until a specific time. The clock is checked again after
+        each sleep, and the last fraction of a millisecond is spent polling
+        the clock, so that the sleep ends as close to the deadline as possible.
+
+        Parameters
+        ----------
+        t : float
+            The clock time at which the sleep should end.
+        """
+        while True:
+            remaining = t - self.clock.time()
+            if remaining <= 0:
+                return
+            self.clock.sleep(int(remaining))
+
     def var_info(self):
         l = []
         l.append((u"coroutines_cycles", u"[Determined at runtime]"))
         l.append((u"coroutines_duration", u"[Determined at runtime]"))
         l.append((u"coroutines_mean_cycle_duration",
                  u"[Determined at runtime]"))
+        names = [item_name for item_name, start_time, end_time, cond
+                 in self.schedule]
+        if self.var.function_name:
+            names.append(self.var.function_name)
+        for name in names:
+            for stat in (u'steps', u'mean_step_duration',
+                         u'max_step_duration'):
+                l.append((self._task_var(stat, name),
+                          u"[Determined at runtime]"))
         return l
@@ -38,6 +38,7 @@ class InlineTask(BaseTask):
         """
         super().__init__(coroutines, start_time, end_time)
         self.function_name = function_name
+        self.name = function_name
         self.python_workspace = python_workspace
 
     def launch(self):
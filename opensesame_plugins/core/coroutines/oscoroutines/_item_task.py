@@ -37,13 +37,14 @@ class ItemTask(BaseTask):
         if not hasattr(_item, u'coroutine'):
             raise OSException(f'{_item.item_type} not supported by coroutines')
         self._item = _item
+        self.name = _item.name
         super().__init__(coroutines, start_time, end_time, abort_on_end)
         self.coroutines.event(u'initialize %s' % _item.coroutine)
 
     def step(self):
         """See base_task."""
         item_stack_singleton.push(self._item.name, u'coroutines_step')
-        retval = base_task.step(self)
+        retval = BaseTask.step(self)
         item_stack_singleton.pop()
         return retval
 
@@ -23,8 +23,15 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 from libopensesame.py3compat import *
 import pygame
+from openexp._events.legacy import event_pump
 from .basejoystick import BaseJoystick
 
+MOTION_EVENTS = (
+    pygame.JOYAXISMOTION,
+    pygame.JOYBALLMOTION,
+    pygame.JOYHATMOTION
+)
+
 
 class Legacy(BaseJoystick):
 
@@ -35,9 +42,8 @@ class Legacy(BaseJoystick):
         self.experiment = experiment
         self.set_joybuttonlist(joybuttonlist)
         self.set_timeout(timeout)
-        pygame.event.set_blocked(pygame.JOYAXISMOTION)
-        pygame.event.set_blocked(pygame.JOYHATMOTION)
-        pygame.event.set_blocked(pygame.JOYBALLMOTION)
+        for event_type in MOTION_EVENTS:
+            pygame.event.set_blocked(event_type)
 
     def get_joybutton(self, joybuttonlist=None, timeout=None):
         """See _libjoystick.basejoystick"""
@@ -45,149 +51,126 @@ class Legacy(BaseJoystick):
             joybuttonlist = self._joybuttonlist
         if timeout is None:
             timeout = self.timeout
-        start_time = pygame.time.get_ticks()
-        time = start_time
-        while timeout is None or time - start_time <= timeout:
-            time = pygame.time.get_ticks()
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
-                if event.type == pygame.JOYBUTTONDOWN:
-                    if (
-                            joybuttonlist is None or
-                            event.button + 1 in joybuttonlist
-                    ):
-                        bpress = event.button + 1
-                        return bpress, time
-        return None, time
+        pump = event_pump(self.experiment)
+        start_time = self.experiment.clock.time()
+        while True:
+            event, time = pump.get([pygame.JOYBUTTONDOWN],
+                                   timeout=self._remaining(start_time,
+                                                           timeout))
+            if event is None:
+                return None, time
+            if joybuttonlist is None or event.button + 1 in joybuttonlist:
+                return event.button + 1, time
 
     def get_joyaxes(self, timeout=None):
         """See _libjoystick.basejoystick"""
-        pygame.event.set_allowed(pygame.JOYAXISMOTION)
-        if timeout is None:
-            timeout = self.timeout
-        pos = []
-        start_time = pygame.time.get_ticks()
-        time = start_time
-        while timeout is None or time - start_time < timeout:
-            time = pygame.time.get_ticks()
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
-                if event.type == pygame.JOYAXISMOTION:
-                    for axis in range(self.js.get_numaxes()):
-                        pos.append(self.js.get_axis(axis))
-                    pygame.event.set_blocked(pygame.JOYAXISMOTION)
-                    return pos, time
-        pygame.event.set_blocked(pygame.JOYAXISMOTION)
-        return None, time
+        event, time = self._get_motion(pygame.JOYAXISMOTION, timeout)
+        if event is None:
+            return None, time
+        return self._axes(), time
 
     def get_joyballs(self, timeout=None):
         """See _libjoystick.basejoystick"""
-        pygame.event.set_allowed(pygame.JOYBALLMOTION)
-        if timeout is None:
-            timeout = self.timeout
-        ballpos = []
-        start_time = pygame.time.get_ticks()
-        time = start_time
-        while timeout is None or time - start_time < timeout:
-            time = pygame.time.get_ticks()
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
-                if event.type == pygame.JOYBALLMOTION:
-                    for ball in range(self.js.get_numballs()):
-                        ballpos.append(self.js.get_ball(ball))
-                    pygame.event.set_blocked(pygame.JOYBALLMOTION)
-                    return ballpos, time
-        pygame.event.set_blocked(pygame.JOYBALLMOTION)
-        return None, time
+        event, time = self._get_motion(pygame.JOYBALLMOTION, timeout)
+        if event is None:
+            return None, time
+        return self._balls(), time
 
     def get_joyhats(self, timeout=None):
         """See _libjoystick.basejoystick"""
-        pygame.event.set_allowed(pygame.JOYHATMOTION)
-        if timeout is None:
-            timeout = self.timeout
-        hatpos = []
-        start_time = pygame.time.get_ticks()
-        time = start_time
-        while timeout is None or time - start_time < timeout:
-            time = pygame.time.get_ticks()
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
-                if event.type == pygame.JOYHATMOTION:
-                    for hat in range(self.js.get_numhats()):
-                        hatpos.append(self.js.get_hat(hat))
-                    pygame.event.set_blocked(pygame.JOYHATMOTION)
-                    return hatpos, time
-        pygame.event.set_blocked(pygame.JOYHATMOTION)
-        return None, time
+        event, time = self._get_motion(pygame.JOYHATMOTION, timeout)
+        if event is None:
+            return None, time
+        return self._hats(), time
 
     def get_joyinput(self, joybuttonlist=None, timeout=None):
         """See _libjoystick.basejoystick"""
-        pygame.event.set_allowed(pygame.JOYHATMOTION)
-        pygame.event.set_allowed(pygame.JOYAXISMOTION)
-        pygame.event.set_allowed(pygame.JOYBALLMOTION)
         if joybuttonlist is None or joybuttonlist == []:
             joybuttonlist = self._joybuttonlist
         if timeout is None:
             timeout = self.timeout
-        pos = []
-        ballpos = []
-        hatpos = []
-        eventtype = None
-        start_time = pygame.time.get_ticks()
-        time = start_time
-        while timeout is None or time - start_time <= timeout:
-            time = pygame.time.get_ticks()
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        self.experiment.pause()
+        pump = event_pump(self.experiment)
+        for event_type in MOTION_EVENTS:
+            pygame.event.set_allowed(event_type)
+        start_time = self.experiment.clock.time()
+        try:
+            while True:
+                event, time = pump.get(
+                    (pygame.JOYBUTTONDOWN,) + MOTION_EVENTS,
+                    timeout=self._remaining(start_time, timeout))
+                if event is None:
+                    return None, None, time
                 if event.type == pygame.JOYBUTTONDOWN:
                     if (
                             joybuttonlist is None or
                             event.button + 1 in joybuttonlist
                     ):
-                        eventtype = u'joybuttonpress'
-                        bpress = event.button + 1
-                        pygame.event.set_blocked(pygame.JOYHATMOTION)
-                        pygame.event.set_blocked(pygame.JOYAXISMOTION)
-                        pygame.event.set_blocked(pygame.JOYBALLMOTION)
-                        return eventtype, bpress, time
-                if event.type == pygame.JOYAXISMOTION:
-                    eventtype = u'joyaxismotion'
-                    for axis in range(self.js.get_numaxes()):
-                        pos.append(self.js.get_axis(axis))
-                    pygame.event.set_blocked(pygame.JOYHATMOTION)
-                    pygame.event.set_blocked(pygame.JOYAXISMOTION)
-                    pygame.event.set_blocked(pygame.JOYBALLMOTION)
-                    return eventtype, pos, time
-                if event.type == pygame.JOYBALLMOTION:
-                    eventtype = u'joyballmotion'
-                    for ball in range(self.js.get_numballs()):
-                        ballpos.append(self.js.get_ball(ball))
-                    pygame.event.set_blocked(pygame.JOYHATMOTION)
-                    pygame.event.set_blocked(pygame.JOYAXISMOTION)
-                    pygame.event.set_blocked(pygame.JOYBALLMOTION)
-                    return eventtype, ballpos, time
-                if event.type == pygame.JOYHATMOTION:
-                    eventtype = u'joyhatmotion'
-                    for hat in range(self.js.get_numhats()):
-                        hatpos.append(self.js.get_hat(hat))
-                    pygame.event.set_blocked(pygame.JOYHATMOTION)
-                    pygame.event.set_blocked(pygame.JOYAXISMOTION)
-                    pygame.event.set_blocked(pygame.JOYBALLMOTION)
-                    return eventtype, hatpos, time
-        pygame.event.set_blocked(pygame.JOYHATMOTION)
-        pygame.event.set_blocked(pygame.JOYAXISMOTION)
-        pygame.event.set_blocked(pygame.JOYBALLMOTION)
-        return eventtype, None, time
+                        return u'joybuttonpress', event.button + 1, time
+                elif event.type == pygame.JOYAXISMOTION:
+                    return u'joyaxismotion', self._axes(), time
+                elif event.type == pygame.JOYBALLMOTION:
+                    return u'joyballmotion', self._balls(), time
+                else:
+                    return u'joyhatmotion', self._hats(), time
+        finally:
+            self._block_motion(MOTION_EVENTS)
+
+    def _get_motion(self, event_type, timeout):
+        r"""Waits for a motion event of a specific type. Motion events are
+        only allowed while waiting for them, because they would otherwise
+        fill up the event queue.
+
+        Returns
+        -------
+        tuple
+            An (event, timestamp) tuple, where event is None if a timeout
+            occurred.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        pygame.event.set_allowed(event_type)
+        try:
+            return event_pump(self.experiment).get([event_type],
+                                                   timeout=timeout)
+        finally:
+            self._block_motion([event_type])
+
+    def _block_motion(self, event_types):
+        r"""Blocks motion events again after waiting for them, and discards
+        motion events that are still queued. A single movement results in
+        many motion events, and the remaining events would otherwise be
+        collected with their old timestamps by the next call.
+
+        Parameters
+        ----------
+        event_types : list
+            A list of PyGame motion-event types.
+        """
+        for event_type in event_types:
+            pygame.event.set_blocked(event_type)
+        event_pump(self.experiment).get_all(event_types)
+
+    def _remaining(self, start_time, timeout):
+        r"""Gives the time that is left until a timeout, or None if there is
+        no timeout.
+        """
+        if timeout is None:
+            return None
+        return start_time + timeout - self.experiment.clock.time()
+
+    def _axes(self):
+
+        return [self.js.get_axis(axis)
+                for axis in range(self.js.get_numaxes())]
+
+    def _balls(self):
+
+        return [self.js.get_ball(ball)
+                for ball in range(self.js.get_numballs())]
+
+    def _hats(self):
+
+        return [self.js.get_hat(hat) for hat in range(self.js.get_numhats())]
 
     def input_options(self):
         """See _libjoystick.basejoystick"""
@@ -201,15 +184,6 @@ class Legacy(BaseJoystick):
 
     def flush(self):
         """See _libjoystick.basejoystick"""
-        joyinput = False
-        for event in pygame.event.get():
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                self.experiment.pause()
-            if event.type in (
-                    pygame.JOYBUTTONDOWN,
-                    pygame.JOYAXISMOTION,
-                    pygame.JOYBALLMOTION,
-                    pygame.JOYHATMOTION
-            ):
-                joyinput = True
-        return joyinput
+        pump = event_pump(self.experiment)
+        pump.handle_escape()
+        return bool(pump.get_all((pygame.JOYBUTTONDOWN,) + MOTION_EVENTS))
@@ -19,9 +19,18 @@ along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 from libopensesame.py3compat import *
 from libopensesame.exceptions import DeviceError
 from libopensesame.oslogging import oslogger
+import numpy as np
 import serial
+import threading
 import os
 
+# The number of bytes that are kept in the ring buffer. The SR Box sends
+# about 800 bytes per second, so this corresponds to about 20 s of input.
+BUFFER_SIZE = 16384
+# The timeout for reads by the reader thread in seconds, which determines how
+# quickly the thread notices that the connection is closed
+READ_TIMEOUT = .05
+
 
 class LibSrbox:
 
@@ -57,6 +66,13 @@ class LibSrbox:
     print('Button 1 was pressed in %d ms!' % response_time)
     srbox.stop()
     ~~~
+    __Note:__
+
+    A background thread continuously reads the output of the SR Box, and
+    timestamps each byte when it arrives. Therefore, the timestamps that are
+    returned by [srbox.get_button_press] reflect when a button was pressed,
+    and not when the input was processed.
+
     [TOC]
     """
     # The PST sr box only supports five buttons, but some of the VU boxes use
@@ -149,6 +165,21 @@ class LibSrbox:
         # Turn off all lights
         if self._srbox is not None:
             self._srbox.write(b'\x60')
+        # Input is read by a background thread into a ring buffer of bytes and
+        # their arrival times. _count is the total number of bytes that have
+        # been received, and _cursor the number of bytes that have been
+        # consumed by get_button_press().
+        self._bytes = np.zeros(BUFFER_SIZE, dtype=np.uint8)
+        self._times = np.zeros(BUFFER_SIZE, dtype=np.float64)
+        self._count = 0
+        self._cursor = 0
+        self._start_time = None
+        self._error = None
+        self._closing = threading.Event()
+        self._condition = threading.Condition()
+        self._srbox.timeout = READ_TIMEOUT
+        self._thread = threading.Thread(target=self._reader, daemon=True)
+        self._thread.start()
 
     def send(self, ch):
         r"""Sends a single character to the SR Box. Send '\x60' to turn off all
@@ -169,9 +200,12 @@ class LibSrbox:
         """
         if self._started:
             return
-        # Write the start byte
+        # Write the start byte, and discard input that was received before
         self._srbox.flushOutput()
-        self._srbox.flushInput()
+        with self._condition:
+            self._srbox.flushInput()
+            self._cursor = self._count
+            self._start_time = self.experiment.clock.time()
         self._srbox.write(b'\xA0')
         self._started = True
 
@@ -208,62 +242,132 @@ class LibSrbox:
         -------
         tuple
             A button_list, timestamp tuple. button_list is None if no button
-            was pressed (i.e. a timeout occurred).
+            was pressed (i.e. a timeout occurred). The timestamp is the time
+            at which the button press was received.
         """
         if not self._started:
             raise DeviceError(
                 u'Please call srbox.start() before srbox.get_button_press()')
-        t0 = self.experiment.time()
-        # Create a list of buttonr, bytemask tuples.
-        bytemasks = []
+        t0 = self.experiment.clock.time()
+        deadline = None if timeout is None else t0 + timeout
+        # A bitmask of the allowed buttons. A button is pressed when its bit
+        # is set.
+        allowed = 0
         for buttonnr, bytemask in enumerate(self.BYTEMASKS):
             if allowed_buttons is None or buttonnr + 1 in allowed_buttons:
-                bytemasks.append((buttonnr + 1, bytemask))
+                allowed |= ~bytemask & 255
+        # The previous state. To check for state changes, we need an old and a
+        # new state. Therefore, the first byte only sets the state.
         inputbyte0 = None
-        while True:
-            # Get a valid character and convert it to a byte
-            inputchar = self._srbox.read(1)
-            if inputchar == b'':
-                continue
-            inputbyte1 = ord(inputchar)
-            # Check for a timeout
-            t1 = self.experiment.time()
-            if timeout is not None and t1 - t0 > timeout:
+        with self._condition:
+            while True:
+                if self._error is not None:
+                    raise DeviceError(
+                        f'Failed to read from SR Box: {self._error}')
+                inputbytes, times = self._consume()
+                # Bytes that were received before the SR Box was started, or
+                # after the timeout, are ignored
+                keep = times >= self._start_time
+                if deadline is not None:
+                    keep &= times <= deadline
+                positions = np.flatnonzero(keep)
+                kept = inputbytes[positions]
+                if require_state_change:
+                    # A state change is a button that is pressed now but not
+                    # before. Because there is only one state change at a
+                    # time, we can return the first one right away.
+                    previous = np.empty_like(kept)
+                    previous[1:] = kept[:-1]
+                    if len(kept):
+                        previous[0] = kept[0] if inputbyte0 is None \
+                            else inputbyte0
+                    pressed = kept & ~previous & allowed
+                else:
+                    # If no state change is required, all allowed buttons that
+                    # are pressed are returned.
+                    pressed = kept & allowed
+                hits = np.flatnonzero(pressed)
+                if len(hits):
+                    i = hits[0]
+                    # Leave the bytes after the button press for the next call
+                    self._cursor -= len(inputbytes) - positions[i] - 1
+                    button_list = [
+                        buttonnr + 1
+                        for buttonnr, bytemask in enumerate(self.BYTEMASKS)
+                        if pressed[i] | bytemask == 255
+                    ]
+                    if require_state_change:
+                        button_list = button_list[:1]
+                    return button_list, float(times[positions[i]])
+                if len(kept):
+                    inputbyte0 = kept[-1]
+                t1 = self.experiment.clock.time()
+                if deadline is not None and t1 >= deadline:
+                    return None, t1
+                self._condition.wait(
+                    None if deadline is None else (deadline - t1) / 1000)
+
+    def _consume(self):
+        r"""Takes all bytes that have not been consumed yet from the ring
+        buffer. Must be called while holding the condition.
+
+        Returns
+        -------
+        tuple
+            An (inputbytes, times) tuple of numpy arrays.
+        """
+        if self._cursor < self._count - BUFFER_SIZE:
+            oslogger.warning(
+                f'srbox buffer overflow, '
+                f'{self._count - BUFFER_SIZE - self._cursor} bytes lost')
+            self._cursor = self._count - BUFFER_SIZE
+        indices = np.arange(self._cursor, self._count) % BUFFER_SIZE
+        self._cursor = self._count
+        return self._bytes[indices], self._times[indices]
+
+    def _reader(self):
+        r"""Runs in the background and reads the SR Box output into the ring
+        buffer. All bytes that are waiting are read at once, and timestamped
+        by counting back from the time of the read, based on the time that it
+        takes to send a byte.
+        """
+        # A byte is sent as 10 bits, including start and stop bits
+        byte_duration = 10000 / self._srbox.baudrate
+        last_time = -np.inf
+        while not self._closing.is_set():
+            try:
+                data = self._srbox.read(1)
+                if not data:
+                    continue
+                waiting = self._srbox.in_waiting
+                if waiting:
+                    data += self._srbox.read(waiting)
+                t = self.experiment.clock.time()
+            except Exception as e:
+                if self._closing.is_set():
+                    break
+                oslogger.error(f'failed to read from srbox: {e}')
+                with self._condition:
+                    self._error = e
+                    self._condition.notify_all()
                 break
-            # To check for state changes, we need an old and a new state.
-            # Therefore, on the first loop we don't do anything.
-            if require_state_change and inputbyte0 is None:
-                inputbyte0 = inputbyte1
-                continue
-            # Ignore no responses
-            if not inputbyte1:
-                inputbyte0 = inputbyte1
-                continue
-            if require_state_change:
-                # If a state change is required, a button should be pressed now
-                # but not before. Because there is only one state change at a
-                # time, we can return right away.
-                for buttonnr, bytemask in bytemasks:
-                    if (
-                            inputbyte1 | bytemask == 255 and
-                            inputbyte0 | bytemask != 255
-                    ):
-                        return [buttonnr], t1
-            else:
-                # If no state change is required, only consider the last input
-                # and create a list of all buttons that are pressed.
-                button_list = []
-                for button_nr, bytemask in bytemasks:
-                    if inputbyte1 | bytemask == 255:
-                        button_list.append(button_nr)
-                if button_list:
-                    return button_list, t1
-            inputbyte0 = inputbyte1
-        return None, t1
+            data = np.frombuffer(data[-BUFFER_SIZE:], dtype=np.uint8)
+            n = len(data)
+            times = t - byte_duration * np.arange(n - 1, -1, -1)
+            times = np.maximum(times, last_time)
+            last_time = times[-1]
+            indices = np.arange(self._count, self._count + n) % BUFFER_SIZE
+            with self._condition:
+                self._bytes[indices] = data
+                self._times[indices] = times
+                self._count += n
+                self._condition.notify_all()
 
     def close(self):
         r"""Closes the connection to the srbox. This is done automatically by
         the SRBOX plugin when the experiment finishes.
         """
+        self._closing.set()
+        self._thread.join()
         self._srbox.close()
         self._started = False
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Compares the time that it takes to generate Gabor and noise patches with the
+vectorized (numpy) generators and with the pixelwise generators. Run this
+script from the root of the repository:
+
+    python -m tests.benchmark_canvas_patches
+"""
+import time
+from libopensesame.py3compat import *
+from openexp._canvas import canvas
+
+SIZES = 64, 128, 256, 512, 1024
+
+
+def timeit(fnc, *args):
+
+    canvas.canvas_cache.clear()
+    t0 = time.perf_counter()
+    fnc(*args)
+    return time.perf_counter() - t0
+
+
+def benchmark():
+
+    print(u'%-6s %-6s %12s %12s %8s' % (
+        u'patch', u'size', u'pixelwise', u'vectorized', u'speedup'))
+    for size in SIZES:
+        for name, vectorized, pixelwise, args in [
+            (
+                u'gabor',
+                canvas._gabor,
+                canvas._gabor_pixelwise,
+                (45, .05, u'g', size, size / 8, 0, u'white', u'black', u'avg')
+            ),
+            (
+                u'noise',
+                canvas._noise_patch,
+                canvas._noise_patch_pixelwise,
+                (u'g', size, size / 8, u'white', u'black', u'avg')
+            )
+        ]:
+            t_pixelwise = timeit(pixelwise, *args)
+            t_vectorized = timeit(vectorized, *args)
+            print(u'%-6s %-6d %10.1fms %10.1fms %7.1fx' % (
+                name, size, 1000 * t_pixelwise, 1000 * t_vectorized,
+                t_pixelwise / t_vectorized))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures the per-call cost of evaluating f-strings, literal texts, and texts
+with square-bracket references, with and without the caches of compiled
+f-strings and text templates. Run this
+script from the root of the repository:
+
+    python -m tests.benchmark_eval_fstring
+"""
+import timeit
+import warnings
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.base_python_workspace import compile_fstring
+
+N = 20000
+
+
+def benchmark():
+
+    warnings.simplefilter(u'ignore', DeprecationWarning)
+    exp = experiment()
+    exp.var.width = 1024
+    exp.var.height = 768
+    syntax = exp.syntax
+    workspace = exp.python_workspace
+
+    def uncached_fstring():
+        compile_fstring.cache_clear()
+        workspace.eval_fstring(u'Resolution: {width} x {height} px')
+
+    def cached_fstring():
+        workspace.eval_fstring(u'Resolution: {width} x {height} px')
+
+    def uncached_literal():
+        syntax._templates.clear()
+        syntax.eval_text(u'Press the spacebar to continue')
+
+    def cached_literal():
+        syntax.eval_text(u'Press the spacebar to continue')
+
+    def uncached_template():
+        syntax._templates.clear()
+        syntax.eval_text(template)
+
+    def cached_template():
+        syntax.eval_text(template)
+
+    # A text with many square-bracket references, which used to be evaluated
+    # by repeatedly searching and replacing
+    template = u' '.join([u'[width] x [height] ([=1+1])'] * 20)
+
+    print(u'%-30s %12s %12s' % (u'operation', u'uncached', u'cached'))
+    for name, uncached, cached in [
+        (u'PythonWorkspace.eval_fstring', uncached_fstring, cached_fstring),
+        (u'Syntax.eval_text (literal)', uncached_literal, cached_literal),
+        (u'Syntax.eval_text (template)', uncached_template, cached_template)
+    ]:
+        t_uncached = timeit.timeit(uncached, number=N) / N
+        t_cached = timeit.timeit(cached, number=N) / N
+        print(u'%-30s %10.2fµs %10.2fµs' % (name, 1e6 * t_uncached,
+                                            1e6 * t_cached))
+
+
+if __name__ == '__main__':
+    benchmark()
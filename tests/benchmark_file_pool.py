@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures the cost of listing the file pool, determining its size, and counting
+the included files for a large file pool, the first time (when the pool folder
+is indexed) and afterwards (when the index is reused). Run this script from the
+root of the repository:
+
+    python -m tests.benchmark_file_pool
+"""
+import os
+import shutil
+import tempfile
+import time
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+
+N_FILES = 20000
+N = 10
+
+
+def benchmark():
+
+    tmp = tempfile.mkdtemp()
+    pool = experiment(experiment_path=tmp).pool
+    folder = pool.folder()
+    for i in range(N_FILES):
+        with open(os.path.join(folder, u'stim%05d.png' % i), u'wb') as fd:
+            fd.write(b'x' * (i % 1000))
+    # Backdate the folder, so that the index is not considered too recent to
+    # be trusted
+    mtime_ns = os.stat(folder).st_mtime_ns - 10 ** 10
+    os.utime(folder, ns=(mtime_ns, mtime_ns))
+    operations = [
+        (u'files()', pool.files),
+        (u'size()', pool.size),
+        (u'count_included()', pool.count_included),
+        (u'iter()', lambda: list(pool))
+    ]
+    print(u'%d files' % N_FILES)
+    try:
+        for label, fnc in operations:
+            pool._invalidate_index()
+            t0 = time.perf_counter()
+            fnc()
+            t_first = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for i in range(N):
+                fnc()
+            t_indexed = (time.perf_counter() - t0) / N
+            print(u'%-30s %10.2fms %10.2fms' % (label, 1000 * t_first,
+                                                1000 * t_indexed))
+    finally:
+        pool.clean_up()
+        shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    benchmark()
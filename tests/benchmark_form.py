@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures the time from a key press or click until the display has been updated
+for large forms with the legacy back-end, both when the full canvas is shown
+after each interaction and when only changed widgets are redrawn. Run this
+script from the root of the repository:
+
+    SDL_VIDEODRIVER=dummy python -m tests.benchmark_form
+"""
+import os
+import time
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.widgets._form import Form
+from libopensesame.widgets._text_input import TextInput
+from libopensesame.widgets._rating_scale import RatingScale
+from libopensesame.widgets._checkbox import Checkbox
+
+N = 50
+BACKENDS = u'canvas', u'keyboard', u'mouse', u'sampler', u'clock', u'color'
+
+
+def create_experiment():
+
+    exp = experiment(string=os.path.join(os.path.dirname(__file__), u'data',
+                                         u'scriptfile.osexp'))
+    for backend in BACKENDS:
+        exp.var.set(backend + u'_backend', u'legacy')
+    exp.init_clock()
+    exp.init_display()
+    return exp
+
+
+def rating_scale_form(exp, scales):
+    r"""A form with a text input on top of a list of rating scales. The
+    interaction is typing in the text input.
+    """
+    form = Form(exp, cols=1, rows=scales + 1, spacing=4,
+                margins=(10, 10, 10, 10))
+    text_input = TextInput(form)
+    form.set_widget(text_input, (0, 0))
+    for row in range(scales):
+        form.set_widget(RatingScale(form, nodes=[u'1', u'2', u'3', u'4',
+                                                 u'5', u'6', u'7']),
+                        (0, row + 1))
+    return form, text_input, {u'type': u'key', u'key': u'a'}
+
+
+def multiple_choice_form(exp, options):
+    r"""A form with a group of checkboxes. The interaction is clicking on a
+    checkbox, which unchecks the previously checked checkbox.
+    """
+    form = Form(exp, cols=2, rows=options // 2, spacing=4,
+                margins=(10, 10, 10, 10))
+    checkboxes = [Checkbox(form, text=u'Option %d' % i, group=u'group')
+                  for i in range(options)]
+    for i, checkbox in enumerate(checkboxes):
+        form.set_widget(checkbox, i)
+    return form, checkboxes, {u'type': u'click', u'pos': (0, 0)}
+
+
+def benchmark_interaction(form, widgets, msg, incremental):
+
+    if not isinstance(widgets, list):
+        widgets = [widgets]
+    coroutines = [widget.coroutine() for widget in widgets]
+    for coroutine in coroutines:
+        coroutine.send(None)
+    form.canvas.show()
+    for widget in form.widgets:
+        if widget is not None:
+            widget._rendered_state = widget._render_state()
+    form.canvas.auto_prepare = not incremental
+    t0 = time.perf_counter()
+    for i in range(N):
+        coroutines[i % len(coroutines)].send(msg)
+        if incremental:
+            form._show_changed_widgets()
+        else:
+            form.canvas.show()
+    t1 = time.perf_counter()
+    form.canvas.auto_prepare = True
+    return (t1 - t0) / N
+
+
+def benchmark():
+
+    exp = create_experiment()
+    for name, create, size in [
+        (u'rating scales', rating_scale_form, 10),
+        (u'rating scales', rating_scale_form, 20),
+        (u'multiple choice', multiple_choice_form, 20),
+        (u'multiple choice', multiple_choice_form, 60),
+    ]:
+        for incremental in (False, True):
+            form, widgets, msg = create(exp, size)
+            t = benchmark_interaction(form, widgets, msg, incremental)
+            print(u'%-30s %10.2fµs' % (
+                u'%s (%d, %s)' % (name, size,
+                                  u'changed' if incremental else u'full'),
+                1e6 * t))
+
+
+if __name__ == '__main__':
+    benchmark()
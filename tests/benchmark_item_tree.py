@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures how long hierarchy queries take in the GUI after a structural change,
+on generated experiments in which loops and sequences are nested deeply. The
+old queries rebuilt recursive lists of children for every item, whereas the
+QtItemStore maintains an index of parents and children. Run this script from
+the root of the repository:
+
+    python -m tests.benchmark_item_tree
+"""
+import timeit
+import warnings
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libqtopensesame.misc.qtitem_store import QtItemStore
+
+N = 10
+
+
+class Node:
+
+    r"""A minimal structure item, which only knows its direct children."""
+    def __init__(self, store, children):
+
+        self.store = store
+        self.items = children
+
+    def direct_children(self):
+
+        return [item for item in self.items if item in self.store]
+
+
+def generate(store, depth, leaves):
+    r"""Generates a chain of sequences, each of which contains a loop that
+    runs the next sequence, and a number of leaf items. An unused sequence
+    re-uses the leaves of the deepest sequence.
+    """
+    items = store.__items__
+    for level in range(depth):
+        children = [u'loop_%d' % level] + [u'leaf_%d_%d' % (level, i)
+                                          for i in range(leaves)]
+        items[u'sequence_%d' % level] = Node(store, children)
+        items[u'loop_%d' % level] = Node(store, [u'sequence_%d' % (level + 1)])
+        for i in range(leaves):
+            items[u'leaf_%d_%d' % (level, i)] = Node(store, [])
+    items[u'sequence_%d' % depth] = Node(store, [])
+    items[u'unused_sequence'] = Node(
+        store, [u'leaf_%d_%d' % (depth - 1, i) for i in range(leaves)])
+    store.experiment.var.start = u'sequence_0'
+
+
+def old_children(store, name):
+
+    children = []
+    for child in store[name].direct_children():
+        children += [child] + old_children(store, child)
+    return children
+
+
+def old_parents(store, name):
+
+    return [name] + [item for item in store
+                     if name in old_children(store, item)]
+
+
+def old_unused(store):
+
+    start = store.experiment.var.start
+    used = [start] + old_children(store, start)
+    return [item for item in store if item not in used]
+
+
+def benchmark():
+
+    warnings.simplefilter(u'ignore', DeprecationWarning)
+    print(u'%-30s %12s %12s' % (u'operation', u'old', u'indexed'))
+    for depth, leaves in ((10, 10), (50, 5), (100, 2)):
+        store = QtItemStore(experiment())
+        generate(store, depth, leaves)
+        leaf = u'leaf_%d_0' % (depth - 1)
+
+        def changed():
+            # A child is inserted into the deepest sequence
+            store[u'sequence_%d' % depth].items.append(leaf)
+            store.mark_changed(u'sequence_%d' % depth)
+            store[u'sequence_%d' % depth].items.pop()
+            store.mark_changed(u'sequence_%d' % depth)
+
+        queries = (
+            (u'parents', lambda: old_parents(store, leaf),
+             lambda: [leaf] + store.ancestors(leaf)),
+            (u'is_child_item', lambda: leaf in old_children(store,
+                                                            u'sequence_0'),
+             lambda: store.is_descendant(leaf, u'sequence_0')),
+            (u'unused', lambda: old_unused(store),
+             lambda: store.unused()),
+        )
+        label = u'%d items, depth %d' % (len(store), 2 * depth)
+        print(label)
+        for name, old, new in queries:
+            # Both give the same items, but not necessarily in the same order
+            if name == u'is_child_item':
+                assert old() == new()
+            else:
+                assert sorted(old()) == sorted(new())
+
+            def indexed():
+                changed()
+                new()
+
+            t_old = timeit.timeit(old, number=N) / N
+            t_new = timeit.timeit(indexed, number=N) / N
+            print(u'%-30s %10.2fms %10.2fms' % (u'  ' + name, 1000 * t_old,
+                                                1000 * t_new))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures how long it takes to split lines and to parse large, generated
+experiment scripts with many loop rows and sketchpad elements. Run this script
+from the root of the repository:
+
+    python -m tests.benchmark_parse_script
+"""
+import shlex
+import time
+import timeit
+import warnings
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.syntax import split_line
+
+HEADER = u'''---
+API: 3
+OpenSesame: 4.0.0a1
+Platform: posix
+---
+set canvas_backend legacy
+set start experiment
+
+define sequence experiment
+\trun block_loop always
+'''
+
+
+def generate_script(rows, sketchpads, elements):
+    r"""Generates an experiment with a loop table of `rows` rows, and
+    `sketchpads` sketchpads with `elements` elements each.
+    """
+    lines = [HEADER, u'define loop block_loop',
+             u'\tset source table', u'\tset repeat 1',
+             u'\tset order random', u'\tset item trial_sequence']
+    for row in range(rows):
+        lines += [
+            u'\tsetcycle %d cue_side %s' % (row, u'left' if row % 2 else
+                                             u'right'),
+            u'\tsetcycle %d soa %d' % (row, 100 * (row % 5)),
+            u'\tsetcycle %d label "Trial \\"%d\\" of block"' % (row, row),
+        ]
+    lines += [u'\trun trial_sequence', u'',
+              u'define sequence trial_sequence']
+    lines += [u'\trun sketchpad_%d always' % i for i in range(sketchpads)]
+    for i in range(sketchpads):
+        lines += [u'', u'define sketchpad sketchpad_%d' % i,
+                  u'\tset duration 0']
+        for j in range(elements):
+            lines.append(
+                u'\tdraw textline center=1 color="#FFFFFF" font_bold=no '
+                u'font_family=mono font_italic=no font_size=18 html=yes '
+                u'show_if=True text="Element %d of sketchpad %d" x=%d '
+                u'y=%d z_index=0' % (j, i, j, -j))
+    return u'\n'.join(lines) + u'\n'
+
+
+def benchmark():
+
+    warnings.simplefilter(u'ignore')
+    line = (u'draw textline center=1 color="#FFFFFF" font_size=18 '
+            u'text="Element \\"1\\" of sketchpad" x=0 y=0 z_index=0')
+    n = 20000
+    t_shlex = timeit.timeit(lambda: shlex.split(line), number=n) / n
+    t_split = timeit.timeit(lambda: split_line(line), number=n) / n
+    print(u'%-30s %10.2fµs' % (u'shlex.split()', 1e6 * t_shlex))
+    print(u'%-30s %10.2fµs' % (u'split_line()', 1e6 * t_split))
+    for rows, sketchpads, elements in [(1000, 10, 50), (10000, 50, 100)]:
+        script = generate_script(rows, sketchpads, elements)
+        t0 = time.perf_counter()
+        exp = experiment(string=script)
+        t1 = time.perf_counter()
+        assert len(exp.items[u'block_loop'].dm) == rows
+        print(u'%-30s %10.2fs (%d lines)' % (
+            u'%d rows, %d elements' % (rows, sketchpads * elements),
+            t1 - t0, script.count(u'\n')))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures the per-call cost of reading variables through VarStore.get(), with
+and without the cache of resolved values, from the experiment and from an item
+whose variable store has the experiment as parent, as is the case for all items
+in an experiment. Run this script from the root of the repository:
+
+    python -m tests.benchmark_var_store
+"""
+import timeit
+import warnings
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+
+N = 100000
+
+
+def benchmark():
+
+    warnings.simplefilter(u'ignore', DeprecationWarning)
+    exp = experiment()
+    exp.var.width = 1024
+    exp.var.instruction = u'Press the spacebar to continue'
+    exp.var.label = u'[width] px'
+    item_var = exp.items.new(u'sketchpad', u'my_sketchpad').var
+    stores = [(u'experiment', exp.var), (u'item', item_var)]
+
+    def uncached(var, name):
+        def fnc():
+            var.__cache__.clear()
+            var.get(name)
+        return fnc
+
+    def cached(var, name):
+        def fnc():
+            var.get(name)
+        return fnc
+
+    print(u'%-30s %12s %12s' % (u'operation', u'uncached', u'cached'))
+    for store, var in stores:
+        for name in (u'width', u'instruction', u'label'):
+            t_uncached = timeit.timeit(uncached(var, name), number=N) / N
+            t_cached = timeit.timeit(cached(var, name), number=N) / N
+            print(u'%-30s %10.2fµs %10.2fµs' % (u'%s: %s' % (store, name),
+                                                1e6 * t_uncached,
+                                                1e6 * t_cached))
+    # Reading all variables one at a time or from a snapshot
+    names = exp.var.vars() + item_var.vars()
+
+    def get_each():
+        for name in names:
+            item_var.get(name)
+
+    def from_snapshot():
+        snapshot = item_var.snapshot()
+        for name in names:
+            snapshot[name]
+
+    n = N // 100
+    t_each = timeit.timeit(get_each, number=n) / n
+    t_snapshot = timeit.timeit(from_snapshot, number=n) / n
+    print(u'%-30s %10.2fµs' % (u'item: %d x get()' % len(names),
+                               1e6 * t_each))
+    print(u'%-30s %10.2fµs' % (u'item: snapshot()', 1e6 * t_snapshot))
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+
+Measures how long it takes to generate random, circular, and grid
+arrangements of up to 10,000 points. The original xy_random(), which checks
+each new point against all accepted points, is only measured for up to 1,000
+points, because it takes minutes beyond that. Run this script from the root of
+the repository:
+
+    python -m tests.benchmark_xy
+"""
+import random
+import time
+from libopensesame.py3compat import *
+from libopensesame.python_workspace_api import xy_circle, xy_grid, xy_random
+from tests.test_xy import reference_xy_random
+
+
+def timed(fnc, *args, **kwargs):
+
+    t0 = time.perf_counter()
+    fnc(*args, **kwargs)
+    return time.perf_counter() - t0
+
+
+def benchmark():
+
+    # The field grows with n, so that the density of the points stays the same
+    for n in (100, 1000, 10000):
+        size = 10 * n ** .5 * 2
+        random.seed(0)
+        t_new = timed(xy_random, n, size, size, min_dist=10)
+        print(u'%-30s %10.2fms' % (u'xy_random(%d)' % n, 1e3 * t_new))
+        if n <= 1000:
+            random.seed(0)
+            t_ref = timed(reference_xy_random, n, size, size, min_dist=10)
+            print(u'%-30s %10.2fms' % (u'original xy_random(%d)' % n,
+                                       1e3 * t_ref))
+    for as_array in (False, True):
+        print(u'%-30s %10.2fms' % (
+            u'xy_circle(10000, as_array=%s)' % as_array,
+            1e3 * timed(xy_circle, 10000, 100, as_array=as_array)))
+        print(u'%-30s %10.2fms' % (
+            u'xy_grid(100, as_array=%s)' % as_array,
+            1e3 * timed(xy_grid, 100, 10, as_array=as_array)))
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import tempfile
+import unittest
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.exceptions import InvalidValue, LogWriteError
+from openexp._log.csv import Csv
+from openexp._log.buffered_csv import BufferedCsv
+
+
+class check_buffered_log(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the buffered_csv log back-end writes the same data as
+        the csv back-end for all durability policies, whether rows are
+        recovered when writing fails, and whether writing to a closed log
+        raises an error instead of blocking or losing rows.
+    """
+    def write_rows(self, log, exp):
+
+        for i in range(25):
+            exp.var.trial = i
+            exp.var.response = u'say "%d"' % i
+            log.write_vars([u'trial', u'response', u'missing'])
+            if i == 10:
+                log.write(u'# a message')
+                log.end_block()
+
+    def runTest(self):
+
+        """
+        desc:
+            Writes rows with both back-ends and compares the files.
+        """
+        folder = tempfile.mkdtemp()
+        exp = experiment()
+        exp.var.log_flush_rows = 4
+        ref_path = os.path.join(folder, u'ref.csv')
+        log = Csv(exp, ref_path)
+        self.write_rows(log, exp)
+        log.close()
+        with safe_open(ref_path) as fd:
+            ref = fd.read()
+        for durability in (u'row', u'batch', u'block', u'exit'):
+            print(u'Checking %s' % durability)
+            exp.var.log_durability = durability
+            path = os.path.join(folder, u'%s.csv' % durability)
+            log = BufferedCsv(exp, path)
+            self.write_rows(log, exp)
+            log.flush()
+            with safe_open(path) as fd:
+                self.assertEqual(fd.read(), ref)
+            log.close()
+        # Simulate a failing disk by closing the file underneath the writer
+        # thread. The error should be reported and no row should be lost.
+        exp.var.log_durability = u'batch'
+        path = os.path.join(folder, u'failing.csv')
+        log = BufferedCsv(exp, path)
+        log.write_vars([u'trial'])
+        log.flush()
+        log._log.close()
+        exp.var.trial = u'lost'
+        log.write_vars([u'trial'])
+        with self.assertRaises(LogWriteError):
+            log.flush()
+        with self.assertRaises(LogWriteError):
+            log.write_vars([u'trial'])
+        log.close()
+        with safe_open(path + u'.recovered') as fd:
+            self.assertEqual(fd.read(), u'"lost"\n')
+        # Writing to a closed log fails, also when the log was closed because
+        # it could not be reopened with invalid settings
+        exp.var.log_durability = u'block'
+        log = BufferedCsv(exp, os.path.join(folder, u'closed.csv'))
+        for i in range(2):
+            log.close()
+            with self.assertRaises(LogWriteError):
+                log.write(u'# a message')
+            with self.assertRaises(LogWriteError):
+                log.write_vars([u'trial'])
+            with self.assertRaises(LogWriteError):
+                log.flush()
+            log.end_block()
+            exp.var.log_durability = u'invalid'
+            with self.assertRaises(InvalidValue):
+                log.open(os.path.join(folder, u'closed.csv'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+import numpy as np
+from libopensesame.py3compat import *
+from openexp._canvas import canvas
+
+
+class check_canvas_patches(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the vectorized Gabor and noise-patch generators produce
+        the same images as the pixelwise generators. Because numpy and the
+        math module may round the last bit of transcendental functions
+        differently, individual channels are allowed to differ by one.
+    """
+    def assertSameImage(self, im1, im2):
+
+        a1 = np.asarray(im1, dtype=int)
+        a2 = np.asarray(im2, dtype=int)
+        self.assertEqual(a1.shape, a2.shape)
+        self.assertLessEqual(np.abs(a1 - a2).max(), 1)
+
+    def runTest(self):
+
+        """
+        desc:
+            Compares both generators for all envelopes and background modes.
+        """
+        for env in (u'gaussian', u'linear', u'circular', u'rectangular'):
+            for bgmode in (u'avg', u'col2'):
+                print(u'Checking %s (%s)' % (env, bgmode))
+                for orient, freq, size in [
+                    (0, .05, 32),
+                    (45, .1, 48),
+                    (-112.5, .033, 51)
+                ]:
+                    canvas.canvas_cache.clear()
+                    self.assertSameImage(
+                        canvas._gabor(orient, freq, env, size, 8, .25,
+                                      u'red', u'#203040', bgmode),
+                        canvas._gabor_pixelwise(
+                            orient, freq, canvas._match_env(env), size, 8,
+                            .25, u'red', u'#203040', bgmode)
+                    )
+                canvas.canvas_cache.clear()
+                random.seed(0)
+                im1 = canvas._noise_patch(env, 40, 8, u'white', u'blue',
+                                          bgmode)
+                random.seed(0)
+                im2 = canvas._noise_patch_pixelwise(
+                    canvas._match_env(env), 40, 8, u'white', u'blue', bgmode)
+                self.assertSameImage(im1, im2)
+        canvas.canvas_cache.clear()
+        self.assertRaises(ValueError, canvas._gabor, 0, .05, bgmode=u'x')
+        self.assertRaises(ValueError, canvas._noise_patch, bgmode=u'x')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import tempfile
+import unittest
+import numpy as np
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from openexp._log.columnar import Columnar, read_columns, read_csv, \
+    convert, append_chunk
+
+
+class check_columnar_log(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the columnar log back-end writes typed columns that
+        match the CSV file, also when columns change between chunks, whether
+        chunks are read back in order, and whether files are converted
+        without loss.
+    """
+    def assertColumnsEqual(self, a, b):
+
+        self.assertEqual(list(a), list(b))
+        for name in a:
+            self.assertEqual(a[name].dtype.kind, b[name].dtype.kind, name)
+            np.testing.assert_array_equal(a[name], b[name])
+
+    def runTest(self):
+
+        """
+        desc:
+            Writes rows, reads them back in all formats, and compares them.
+        """
+        folder = tempfile.mkdtemp()
+        exp = experiment()
+        exp.var.log_chunk_rows = 4
+        path = os.path.join(folder, u'subject-0.csv')
+        log = Columnar(exp, path)
+        for i in range(10):
+            exp.var.set(u'trial', i)
+            exp.var.set(u'rt', 500 + i / 4)
+            exp.var.set(u'response', u'say "%d"' % i if i % 3 else 1)
+            # A variable that only exists in later rows, so that its type
+            # differs between chunks
+            if i >= 6:
+                exp.var.set(u'late', i)
+            log.write_vars([u'trial', u'rt', u'response', u'late'])
+        log.close()
+        npz_path = os.path.join(folder, u'subject-0.npz')
+        self.assertIn(npz_path, exp.data_files)
+        columns = read_columns(npz_path)
+        self.assertEqual(columns[u'trial'].dtype, np.int64)
+        np.testing.assert_array_equal(columns[u'trial'], np.arange(10))
+        self.assertEqual(columns[u'rt'].dtype, np.float64)
+        self.assertEqual(columns[u'rt'][1], 500.25)
+        self.assertEqual(columns[u'response'].dtype.kind, u'U')
+        self.assertEqual(columns[u'response'][0], u'1')
+        self.assertEqual(columns[u'response'][1], u'say "1"')
+        self.assertEqual(columns[u'late'].dtype, np.float64)
+        self.assertTrue(np.isnan(columns[u'late'][:6]).all())
+        np.testing.assert_array_equal(columns[u'late'][6:], np.arange(6, 10))
+        # The CSV file contains the same data as the npz file
+        from_csv = read_csv(path)
+        self.assertEqual(list(from_csv), list(columns))
+        for name in from_csv:
+            np.testing.assert_array_equal(from_csv[name], columns[name])
+        # Round trips through the converter
+        csv_path = os.path.join(folder, u'converted.csv')
+        npz_path2 = os.path.join(folder, u'converted.npz')
+        convert(npz_path, csv_path)
+        convert(csv_path, npz_path2)
+        self.assertColumnsEqual(read_columns(npz_path2), columns)
+        # Chunks are ordered by number, also when the number has more digits
+        # than the zero-padded chunk names
+        order_path = os.path.join(folder, u'order.npz')
+        for nr in (99999, 100000):
+            append_chunk(order_path, nr, {u'nr': np.array([nr])})
+        np.testing.assert_array_equal(read_columns(order_path)[u'nr'],
+                                      [99999, 100000])
+        try:
+            import pyarrow
+        except ImportError:
+            return
+        for ext in (u'parquet', u'feather'):
+            arrow_path = os.path.join(folder, u'converted.' + ext)
+            convert(npz_path, arrow_path)
+            convert(arrow_path, npz_path2)
+            self.assertColumnsEqual(read_columns(npz_path2), columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+
+SCRIPT = u'''
+set canvas_backend legacy
+set clock_backend legacy
+set start co
+
+define coroutines co
+	set duration 300
+	set function_name gen
+	run late_tick end=250 runif=True start=200
+	run early_tick end=150 runif=True start=100
+
+define coroutines co_order
+	set duration 150
+	run b_tick end=100 runif=True start=50
+	run a_tick end=100 runif=True start=0
+
+define inline_script a_tick
+	___run__
+	step_order.append(u'a')
+	__end__
+
+define inline_script b_tick
+	___run__
+	step_order.append(u'b')
+	__end__
+
+define inline_script early_tick
+	___run__
+	early_ticks.append(clock.time())
+	__end__
+
+define inline_script late_tick
+	___run__
+	late_ticks.append(clock.time())
+	__end__
+'''
+
+
+class check_coroutines(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether coroutines are started and stopped on time, whether
+        the time before the first coroutine starts and between coroutines is
+        spent sleeping rather than cycling, whether step durations are
+        recorded, and whether coroutines that end at the same time are
+        stepped in the order in which they started.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        exp = experiment(string=SCRIPT)
+        exp.init_clock()
+        exp.python_workspace[u'clock'] = exp.clock
+        exp.python_workspace[u'early_ticks'] = []
+        exp.python_workspace[u'late_ticks'] = []
+        exp.python_workspace[u'gen_ticks'] = []
+        exp.python_workspace._exec(
+            u'def gen():\n'
+            u'    while True:\n'
+            u'        gen_ticks.append(clock.time())\n'
+            u'        yield\n'
+        )
+        # The generator function runs for the full duration, so only check
+        # the sleeping behavior without it
+        for function_name in u'', u'gen':
+            for ticks in u'early_ticks', u'late_ticks', u'gen_ticks':
+                del exp.python_workspace[ticks][:]
+            exp.items[u'co'].var.function_name = function_name
+            exp.items[u'co'].prepare()
+            t0 = exp.clock.time()
+            exp.items[u'co'].run()
+            self.assertGreaterEqual(exp.clock.time() - t0, 300)
+            early_ticks = exp.python_workspace[u'early_ticks']
+            late_ticks = exp.python_workspace[u'late_ticks']
+            # Tasks are stopped based on the time at the end of the previous
+            # cycle, so the last step may be slightly after the end time
+            self.assertGreaterEqual(early_ticks[0] - t0, 100)
+            self.assertLess(early_ticks[-1] - t0, 160)
+            self.assertGreaterEqual(late_ticks[0] - t0, 200)
+            self.assertLess(late_ticks[-1] - t0, 260)
+            # The stop signal resumes the inline script once more, which
+            # results in one more tick than there are steps
+            self.assertEqual(exp.var.coroutines_steps_early_tick + 1,
+                             len(early_ticks))
+            self.assertLessEqual(
+                exp.var.coroutines_mean_step_duration_early_tick,
+                exp.var.coroutines_max_step_duration_early_tick)
+            if function_name:
+                # The generator function also ticks when it is launched and
+                # when it is killed
+                self.assertEqual(exp.var.coroutines_steps_gen + 2,
+                                 len(exp.python_workspace[u'gen_ticks']))
+            else:
+                # Between coroutines, the scheduler sleeps, so there are no
+                # cycles other than the ones in which the ticks are stepped
+                self.assertEqual(exp.var.coroutines_cycles,
+                                 exp.var.coroutines_steps_early_tick +
+                                 exp.var.coroutines_steps_late_tick)
+        # b_tick comes first in the schedule, but a_tick starts first, and
+        # both end at the same time, so a_tick is stepped first in every cycle
+        exp.python_workspace[u'step_order'] = step_order = []
+        co_order = exp.items[u'co_order']
+        co_order.prepare()
+        co_order.pre_cycle_functions.append(lambda: step_order.append(u'|'))
+        co_order.run()
+        cycles = u''.join(step_order).split(u'|')
+        self.assertIn(u'ab', cycles)
+        self.assertNotIn(u'ba', cycles)
+
+
+if __name__ == '__main__':
+    unittest.main()
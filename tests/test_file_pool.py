@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from libopensesame.py3compat import *
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+from libopensesame.experiment import experiment
+from libopensesame.osexpfile import osexpreader
+
+SCRIPT = u'''set title "Pool test"
+define sequence experiment
+'''
+
+
+class check_file_pool(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the file pool of experiment archives is extracted
+        correctly in the background, and saved correctly when pool files are
+        reused from previously saved archives.
+    """
+    def add(self, tar, name, data):
+
+        tarinfo = tarfile.TarInfo(name)
+        tarinfo.size = len(data)
+        tar.addfile(tarinfo, io.BytesIO(data))
+
+    def write_archive(self, path, mode, files, script_first=True):
+
+        with tarfile.open(path, mode) as tar:
+            if script_first:
+                self.add(tar, u'script.opensesame', safe_encode(SCRIPT))
+            for name, data in files.items():
+                self.add(tar, u'pool/' + self.exp.syntax.to_ascii(name), data)
+            if not script_first:
+                self.add(tar, u'script.opensesame', safe_encode(SCRIPT))
+
+    def checkArchive(self, mode, fmt, script_first=True):
+
+        files = {u'f%d.bin' % i: os.urandom(1000 * i) for i in range(20)}
+        files[u'tést.txt'] = b'unicode'
+        path = os.path.join(self.tmp, u'test.osexp')
+        self.write_archive(path, mode, files, script_first)
+        e = experiment(string=path)
+        self.assertEqual(e.var.title, u'Pool test')
+        self.assertEqual(osexpreader(e, path).format, fmt)
+        # Files are available as soon as they are accessed
+        for name in reversed(sorted(files)):
+            with open(e.pool[name], u'rb') as fd:
+                self.assertEqual(fd.read(), files[name])
+        self.assertNotIn(u'missing.txt', e.pool)
+        self.assertEqual(e.pool.files(), sorted(files))
+        self.assertEqual(sorted(os.listdir(e.pool.folder())), sorted(files))
+        e.pool.clean_up()
+
+    def checkSave(self, compresslevel):
+
+        path = os.path.join(self.tmp, u'test.osexp')
+        self.write_archive(path, u'w:gz', {})
+        e = experiment(string=path)
+        # Long names result in headers that are larger than a single block
+        files = {u'a.txt': b'a' * 100000, u'b.png': os.urandom(1000),
+                 u'tést.txt': b'unicode', u'%s.txt' % (u'long' * 50): b'long'}
+        for name, data in files.items():
+            with open(os.path.join(e.pool.folder(), name), u'wb') as fd:
+                fd.write(data)
+        # Save repeatedly, so that unchanged files are reused from the
+        # previous archive, and change a file in between
+        for i, target in enumerate([u'a.osexp', u'b.osexp', u'a.osexp']):
+            if i == 2:
+                files[u'a.txt'] = b'changed'
+                with open(e.pool[u'a.txt'], u'wb') as fd:
+                    fd.write(files[u'a.txt'])
+            target = os.path.join(self.tmp, target)
+            e.save(target, overwrite=True, compresslevel=compresslevel)
+            with tarfile.open(target) as tar:
+                self.assertEqual(tar.getnames()[0], u'script.opensesame')
+            # The archive is padded to a full record, also when pool files
+            # are reused
+            with gzip.open(target) as fd:
+                self.assertEqual(len(fd.read()) % tarfile.RECORDSIZE, 0)
+            r = experiment(string=target)
+            self.assertEqual(r.var.title, u'Pool test')
+            for name, data in files.items():
+                with open(r.pool[name], u'rb') as fd:
+                    self.assertEqual(fd.read(), data)
+            r.pool.clean_up()
+        e.pool.clean_up()
+
+    def checkIndex(self):
+
+        pool = experiment(experiment_path=self.tmp).pool
+        src = os.path.join(self.tmp, u'src.bin')
+        with open(src, u'wb') as fd:
+            fd.write(b'x' * 100)
+        self.assertEqual(pool.files(), [])
+        self.assertEqual(pool.size(), 0)
+        self.assertEqual(pool.count_included(), 0)
+        # Changes through the pool are reflected immediately
+        pool.add(src, u'a.bin')
+        pool.add(src, u'b.bin')
+        self.assertEqual(pool.files(), [u'a.bin', u'b.bin'])
+        self.assertEqual(pool.size(), 200)
+        pool.rename(u'b.bin', u'c.bin')
+        self.assertEqual(pool.files(), [u'a.bin', u'c.bin'])
+        del pool[u'a.bin']
+        self.assertEqual(pool.files(), [u'c.bin'])
+        self.assertEqual(pool.size(), 100)
+        # Overwriting a file through the pool updates its size
+        with open(src, u'wb') as fd:
+            fd.write(b'x' * 10)
+        pool.add(src, u'c.bin')
+        self.assertEqual(pool.size(), 10)
+        # Files and subfolders that are created outside of the pool are picked
+        # up as well, but subfolders are only counted as included entries
+        with open(os.path.join(pool.folder(), u'd.bin'), u'wb') as fd:
+            fd.write(b'x' * 5)
+        os.mkdir(os.path.join(pool.folder(), u'subfolder'))
+        self.assertEqual(pool.files(), [u'c.bin', u'd.bin'])
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.size(), 15)
+        self.assertEqual(pool.count_included(), 3)
+        # A folder that was last modified long before it was indexed is not
+        # listed again
+        folder = pool.folder()
+        mtime_ns = os.stat(folder).st_mtime_ns - 10 ** 10
+        os.utime(folder, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(pool.files(), [u'c.bin', u'd.bin'])
+        self.assertIs(pool._folder_index(folder), pool._folder_index(folder))
+        pool.clean_up()
+
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        self.tmp = tempfile.mkdtemp()
+        self.exp = experiment()
+        try:
+            self.checkArchive(u'w:gz', u'targz')
+            self.checkArchive(u'w', u'tar')
+            self.checkArchive(u'w:gz', u'targz', script_first=False)
+            path = os.path.join(self.tmp, u'empty.osexp')
+            self.write_archive(path, u'w:gz', {})
+            self.assertEqual(experiment(string=path).pool.files(), [])
+            self.checkSave(compresslevel=6)
+            self.checkSave(compresslevel=0)
+            self.checkIndex()
+        finally:
+            self.exp.pool.clean_up()
+            shutil.rmtree(self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
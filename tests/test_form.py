@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import unittest
+import pygame
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.widgets._form import Form
+from libopensesame.widgets._text_input import TextInput
+from libopensesame.widgets._rating_scale import RatingScale
+from libopensesame.widgets._checkbox import Checkbox
+
+BACKENDS = u'canvas', u'keyboard', u'mouse', u'sampler', u'clock', u'color'
+
+
+class check_form(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether forms that only redraw changed widgets show the same
+        thing as forms that redraw the full canvas, and whether forms respond
+        to key presses.
+    """
+    def create_form(self):
+
+        form = Form(self.exp, cols=2, rows=4)
+        text_input = TextInput(form, return_accepts=True, var=u'text')
+        form.set_widget(text_input, (0, 0), colspan=2)
+        form.set_widget(RatingScale(form, nodes=[u'a', u'b', u'c']), (0, 1),
+                        colspan=2)
+        checkboxes = [Checkbox(form, text=u'Option %d' % i, group=u'group')
+                      for i in range(4)]
+        for i, checkbox in enumerate(checkboxes):
+            form.set_widget(checkbox, 4 + i)
+        return form, text_input, checkboxes
+
+    def checkIncremental(self):
+
+        form, text_input, checkboxes = self.create_form()
+        coroutines = {w: w.coroutine() for w in form.widgets
+                      if w is not None}
+        for coroutine in coroutines.values():
+            coroutine.send(None)
+        form.canvas.show()
+        for widget in coroutines:
+            widget._rendered_state = widget._render_state()
+        form.canvas.auto_prepare = False
+        self.assertIsNone(form._show_changed_widgets())
+        text_input.focus = True
+        for key in u'abc':
+            coroutines[text_input].send({u'type': u'key', u'key': key})
+            self.assertIsNotNone(form._show_changed_widgets())
+        text_input.focus = False
+        for checkbox in checkboxes[::-1]:
+            coroutines[checkbox].send({u'type': u'click', u'pos': (0, 0)})
+            form._show_changed_widgets()
+        self.assertTrue(checkboxes[0].checked)
+        incremental = pygame.image.tostring(form.canvas.surface, u'RGB')
+        form.canvas.auto_prepare = True
+        form.canvas.prepare()
+        full = pygame.image.tostring(form.canvas.surface, u'RGB')
+        self.assertEqual(incremental, full)
+        self.assertEqual(
+            pygame.image.tostring(self.exp.surface, u'RGB'), full)
+
+    def checkExec(self):
+
+        form, text_input, checkboxes = self.create_form()
+        text_input.text = u'hi'
+        # Key presses that are in the queue at the same time are combined into
+        # a single key name, so we only post a single key press
+        pygame.event.post(pygame.event.Event(
+            pygame.KEYDOWN, key=pygame.K_RETURN, unicode=u'\r', mod=0,
+            scancode=0))
+        self.assertEqual(form._exec(focus_widget=text_input), u'hi')
+        self.assertEqual(self.exp.var.text, u'hi')
+        self.assertTrue(form.canvas.auto_prepare)
+        # A form without focus times out while waiting for clicks
+        form, text_input, checkboxes = self.create_form()
+        form.timeout = 50
+        t0 = self.exp.clock.time()
+        self.assertIsNone(form._exec())
+        self.assertLess(self.exp.clock.time() - t0, 1000)
+
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        os.environ.setdefault(u'SDL_VIDEODRIVER', u'dummy')
+        self.exp = experiment(string=os.path.join(
+            os.path.dirname(__file__), u'data', u'scriptfile.osexp'))
+        for backend in BACKENDS:
+            self.exp.var.set(backend + u'_backend', u'legacy')
+        self.exp.init_clock()
+        self.exp.init_display()
+        try:
+            self.checkIncremental()
+            self.checkExec()
+        finally:
+            self.exp.end()
+
+
+if __name__ == '__main__':
+    unittest.main()
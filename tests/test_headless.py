@@ -35,7 +35,7 @@ class check_headless(unittest.TestCase):
             Walks through the test.
         """
         from qtpy.QtWidgets import QApplication
-        app = QApplication([])
+        app = QApplication.instance() or QApplication([])
         experiment_path = os.path.join(os.path.dirname(__file__), u'data')
         for experiment_file in [
                 u'sketchpad_test.osexp',
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libqtopensesame.misc.qtitem_store import QtItemStore
+
+
+class Node:
+
+    def __init__(self, store, children=()):
+
+        self.store = store
+        self.items = list(children)
+
+    def direct_children(self):
+
+        return [item for item in self.items if item in self.store]
+
+
+class check_item_hierarchy(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the hierarchy index of the GUI item store gives the
+        same descendants, ancestors, and unused items as the item definitions,
+        also after items have changed.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        store = QtItemStore(experiment())
+        store.experiment.var.start = u'main'
+        store.__items__.update({
+            u'main': Node(store, [u'block', u'missing', u'trial']),
+            u'block': Node(store, [u'trial']),
+            u'trial': Node(store, [u'stim', u'resp']),
+            u'stim': Node(store),
+            u'resp': Node(store),
+            u'orphan': Node(store, [u'resp']),
+        })
+        self.assertEqual(store.descendants(u'main'), [
+            u'block', u'trial', u'stim', u'resp', u'trial', u'stim', u'resp'])
+        self.assertEqual(sorted(store.ancestors(u'resp')),
+                         [u'block', u'main', u'orphan', u'trial'])
+        self.assertTrue(store.is_descendant(u'stim', u'main'))
+        self.assertFalse(store.is_descendant(u'main', u'stim'))
+        self.assertEqual(store.unused(), [u'orphan'])
+        self.assertTrue(store.in_unused_tree(u'resp'))
+        self.assertFalse(store.in_unused_tree(u'stim'))
+        # Only the changed item is indexed again
+        store[u'trial'].items.remove(u'resp')
+        store.mark_changed(u'trial')
+        self.assertEqual(store.descendants(u'main'),
+                         [u'block', u'trial', u'stim', u'trial', u'stim'])
+        self.assertEqual(store.ancestors(u'resp'), [u'orphan'])
+        self.assertFalse(store.is_descendant(u'resp', u'main'))
+        # A new item can resolve a child that didn't exist before
+        store.__items__[u'missing'] = Node(store)
+        store.clear_cache()
+        self.assertIn(u'missing', store.descendants(u'main'))
+        self.assertEqual(sorted(store.unused()), [u'orphan', u'resp'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import unittest
+import pygame
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from openexp._keyboard.legacy import Legacy as LegacyKeyboard
+from openexp._mouse.legacy import Legacy as LegacyMouse
+from opensesame_plugins.core.joystick._libjoystick.legacy import \
+    Legacy as LegacyJoystick
+
+
+class FakeJoystick:
+
+    """
+    desc:
+        Stands in for a PyGame joystick, because the dummy video driver
+        doesn't provide any.
+    """
+    def __init__(self, device):
+
+        self.axes = [0., 0.]
+
+    def init(self):
+
+        pass
+
+    def get_numaxes(self):
+
+        return len(self.axes)
+
+    def get_axis(self, axis):
+
+        return self.axes[axis]
+
+
+class check_legacy_events(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the legacy keyboard and mouse back-ends collect events
+        and time out in both the waiting and the polling mode, and whether
+        events of other types are left in the event queue. Also checks whether
+        the legacy joystick back-end discards the remaining motion events
+        after a motion response.
+    """
+    def post_key(self, key=pygame.K_a, unicode=u'a'):
+
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key,
+                                             unicode=unicode, mod=0,
+                                             scancode=0))
+
+    def post_click(self, button=1):
+
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN,
+                                             button=button, pos=(100, 100)))
+
+    def post_axis_motion(self, n):
+
+        for i in range(n):
+            pygame.event.post(pygame.event.Event(pygame.JOYAXISMOTION,
+                                                 joy=0, instance_id=0,
+                                                 axis=0, value=i / n))
+
+    def check_joystick(self, exp):
+
+        joystick_class = pygame.joystick.Joystick
+        pygame.joystick.Joystick = FakeJoystick
+        try:
+            js = LegacyJoystick(exp, timeout=50)
+        finally:
+            pygame.joystick.Joystick = joystick_class
+        pygame.event.clear()
+        # A single movement results in a burst of motion events, which arrive
+        # while motion events are allowed. Only the first one is a response.
+        for collect in (js.get_joyaxes, js.get_joyinput):
+            pygame.event.set_allowed(pygame.JOYAXISMOTION)
+            self.post_axis_motion(10)
+            response = collect()
+            self.assertEqual(response[-2], [0., 0.])
+            t0 = exp.clock.time()
+            response = js.get_joyaxes()
+            self.assertIsNone(response[0])
+            self.assertGreaterEqual(response[1] - t0, 50)
+        # Motion events are blocked outside of motion responses
+        self.post_axis_motion(10)
+        t0 = exp.clock.time()
+        response = js.get_joyinput()
+        self.assertIsNone(response[0])
+        self.assertGreaterEqual(response[2] - t0, 50)
+
+    def runTest(self):
+
+        """
+        desc:
+            Collects keypresses and clicks with both modes.
+        """
+        os.environ.setdefault(u'SDL_VIDEODRIVER', u'dummy')
+        exp = experiment()
+        exp.init_clock()
+        pygame.display.init()
+        pygame.display.set_mode((200, 200))
+        exp.var.width = exp.var.height = 200
+        for wait in (u'yes', u'no'):
+            exp.var.keyboard_event_wait = exp.var.mouse_event_wait = wait
+            kb = LegacyKeyboard(exp, timeout=50, keylist=[u'a'])
+            mouse = LegacyMouse(exp, timeout=50)
+            pygame.event.clear()
+            # Time out
+            t0 = exp.clock.time()
+            key, t1 = kb.get_key()
+            self.assertIsNone(key)
+            self.assertGreaterEqual(t1 - t0, 50)
+            # A click doesn't end the keyboard response, but remains in the
+            # queue for the mouse
+            self.post_click()
+            self.post_key()
+            key, t1 = kb.get_key()
+            self.assertEqual(key, u'a')
+            self.assertLess(t1 - t0, 1000)
+            button, pos, t2 = mouse.get_click()
+            self.assertEqual(button, 1)
+            self.assertEqual(pos, (0, 0))
+            self.assertGreaterEqual(t2, t1)
+            # A keypress doesn't end the mouse response, but remains in the
+            # queue for the keyboard
+            self.post_key()
+            button, pos, t3 = mouse.get_click()
+            self.assertIsNone(button)
+            self.assertGreaterEqual(t3 - t2, 50)
+            key, t4 = kb.get_key()
+            self.assertEqual(key, u'a')
+            # Events are timestamped when they are first taken from the PyGame
+            # queue, and flushing one device doesn't discard events of
+            # another device
+            self.post_click()
+            key, t5 = kb.get_key()
+            self.assertIsNone(key)
+            self.post_key()
+            self.assertTrue(kb.flush())
+            self.assertFalse(kb.flush())
+            button, pos, t6 = mouse.get_click()
+            self.assertEqual(button, 1)
+            self.assertLess(t6, t5)
+        self.check_joystick(exp)
+        pygame.display.quit()
+
+
+if __name__ == '__main__':
+    unittest.main()
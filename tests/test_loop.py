@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import unittest
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+
+BACKENDS = u'canvas', u'keyboard', u'mouse', u'sampler', u'clock', u'color'
+SCRIPT = u'''
+define loop table_loop
+	set source table
+	set repeat 1
+	set order sequential
+	set item trial
+	set break_if never
+	setcycle 0 a 1
+	setcycle 0 b "=a * 10"
+	setcycle 0 c "1.0"
+	setcycle 0 w "=z"
+	setcycle 0 z 5
+	setcycle 1 a x
+	setcycle 1 b "=a * 2"
+	setcycle 1 c 2.5
+	setcycle 1 w "=z"
+	setcycle 1 z 6
+	run trial
+
+define loop empty_loop
+	set source table
+	set repeat 3
+	set order random
+	set item count
+	set break_if never
+	run count
+
+define inline_script trial
+	___run__
+	seen.append((a, b, c, w, z))
+	if a == 1 and not repeated:
+	    repeated = True
+	    var.repeat_cycle = 1
+	__end__
+
+define loop file_loop
+	set source file
+	set source_file "conditions.csv"
+	set repeat 2
+	set order random
+	set pregenerate yes
+	set item block_trial
+	set break_if never
+	constrain cond maxrep=1
+	run block_trial
+
+define inline_script count
+	___run__
+	counts.append(live_row)
+	__end__
+
+define inline_script block_trial
+	___run__
+	blocks[-1].append(cond)
+	__end__
+'''
+CONDITIONS = u'''cond
+a
+b
+c
+'''
+
+
+class check_loop(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether loop tables are assigned to variables in the same way
+        as var.set() would, with expressions evaluated in column order, and
+        whether repeated cycles and loops without columns work.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        os.environ.setdefault(u'SDL_VIDEODRIVER', u'dummy')
+        exp = experiment(string=SCRIPT)
+        for backend in BACKENDS:
+            exp.var.set(backend + u'_backend', u'legacy')
+        exp.init_clock()
+        exp.init_display()
+        try:
+            exp.python_workspace[u'seen'] = []
+            exp.python_workspace[u'counts'] = []
+            exp.python_workspace[u'repeated'] = False
+            exp.python_workspace[u'z'] = 0
+            exp.python_workspace[u'var'] = exp.var
+            exp.items.execute(u'table_loop')
+            # Expressions see the values of the columns that come before them
+            # in alphabetical order, so w sees the z of the previous cycle
+            self.assertEqual(exp.python_workspace[u'seen'], [
+                (1, 10, 1, 0, 5),
+                (u'x', u'xx', 2.5, 5, 6),
+                (1, 10, 1, 6, 5),
+            ])
+            seen = exp.python_workspace[u'seen']
+            self.assertIsInstance(seen[0][2], int)
+            self.assertIsInstance(seen[1][2], float)
+            exp.items.execute(u'empty_loop')
+            self.assertEqual(exp.python_workspace[u'counts'], [0, 1, 2])
+        finally:
+            exp.end()
+
+
+class check_loop_source_file(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether loop source files are only read again when they
+        change, and whether pregenerated blocks respect constraints and are
+        discarded when the source file changes.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        os.environ.setdefault(u'SDL_VIDEODRIVER', u'dummy')
+        exp = experiment(string=SCRIPT)
+        for backend in BACKENDS:
+            exp.var.set(backend + u'_backend', u'legacy')
+        exp.init_clock()
+        exp.init_display()
+        try:
+            path = os.path.join(exp.pool.folder(), u'conditions.csv')
+            with open(path, u'w') as fd:
+                fd.write(CONDITIONS)
+            exp.python_workspace[u'blocks'] = []
+            loop = exp.items[u'file_loop']
+            dm = loop._read_file()
+            self.assertIs(loop._read_file(), dm)
+            for i in range(3):
+                exp.python_workspace[u'blocks'].append([])
+                exp.items.execute(u'file_loop')
+                self.assertIsNotNone(loop._pregenerated)
+            # A file with a different size is read again, and the block that
+            # was pregenerated from the old file is not used
+            with open(path, u'w') as fd:
+                fd.write(CONDITIONS + u'd\n')
+            self.assertIsNot(loop._read_file(), dm)
+            exp.python_workspace[u'blocks'].append([])
+            exp.items.execute(u'file_loop')
+            blocks = exp.python_workspace[u'blocks']
+            for block in blocks[:3]:
+                self.assertEqual(sorted(block), list(u'aabbcc'))
+            self.assertEqual(sorted(blocks[3]), list(u'aabbccdd'))
+            for block in blocks:
+                for prev, cond in zip(block, block[1:]):
+                    self.assertNotEqual(prev, cond)
+        finally:
+            exp.end()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,6 +62,26 @@ class check_response(unittest.TestCase):
             self.assertState(u'C', 1000, 1, 4, 2000, 1)
             self.exp._responses.add(response=u'D', response_time=1, correct=0)
             self.assertState(u'D', 1, 0, 5, 2001, 1)
+            self.assertEqual(self.exp.var.acc, 50)
+            self.assertEqual(self.exp.var.avg_rt, 667)
+            # The last response comes first
+            responses = self.exp._responses
+            self.assertEqual(responses[0].response, u'D')
+            self.assertEqual(responses[-1].response, None)
+            self.assertEqual(responses[1:3].response, [u'C', u'B'])
+            self.assertEqual([r.response for r in responses][:2], [u'D', u'C'])
+            self.assertEqual(responses[:2].acc, 50)
+            with self.assertRaises(IndexError):
+                responses[len(responses)]
+        # Responses from before reset_feedback() are kept, but are not
+        # included in feedback
+        self.assertEqual(len(self.exp._responses), 10)
+        self.assertEqual(self.exp._responses.feedback, [True] * 5 + [False] * 5)
+        self.exp._responses.reset_feedback()
+        self.assertEqual(self.exp._responses.acc, u'undefined')
+        self.exp._responses.add(response=u'E', response_time=10, correct=1,
+                                feedback=False)
+        self.assertState(u'E', 10, 1, 0, 0, 0)
 
 if __name__ == '__main__':
     unittest.main()
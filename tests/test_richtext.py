@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import unittest
+import pygame
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from openexp.canvas import Canvas
+from openexp.canvas_elements import Text
+from openexp._canvas.stimulus_cache import stimulus_cache
+
+BACKENDS = u'canvas', u'keyboard', u'mouse', u'sampler', u'clock', u'color'
+
+
+class check_richtext(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether rendered text is shared between canvases through the
+        stimulus cache, and whether text is rendered again when it changes.
+    """
+    def create_canvas(self, text, **style_args):
+
+        canvas = Canvas(self.exp, **style_args)
+        canvas[u'text'] = Text(text)
+        return canvas
+
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        os.environ.setdefault(u'SDL_VIDEODRIVER', u'dummy')
+        self.exp = experiment(string=os.path.join(
+            os.path.dirname(__file__), u'data', u'scriptfile.osexp'))
+        for backend in BACKENDS:
+            self.exp.var.set(backend + u'_backend', u'legacy')
+        self.exp.init_clock()
+        self.exp.init_display()
+        try:
+            stimulus_cache.clear()
+            canvas1 = self.create_canvas(u'Hello <b>world</b>')
+            misses = stimulus_cache.misses
+            canvas2 = self.create_canvas(u'Hello <b>world</b>')
+            # The second canvas reuses the rendered text and the surface
+            self.assertEqual(stimulus_cache.misses, misses)
+            self.assertIs(canvas1[u'text']._text_surface,
+                          canvas2[u'text']._text_surface)
+            self.assertEqual(pygame.image.tostring(canvas1.surface, u'RGB'),
+                             pygame.image.tostring(canvas2.surface, u'RGB'))
+            # Text that is rendered differently is not shared
+            canvas3 = self.create_canvas(u'Hello <b>world</b>',
+                                         color=u'red')
+            self.assertIsNot(canvas1[u'text']._text_surface,
+                             canvas3[u'text']._text_surface)
+            self.assertNotEqual(
+                pygame.image.tostring(canvas1.surface, u'RGB'),
+                pygame.image.tostring(canvas3.surface, u'RGB'))
+            # The size follows changes to the text
+            w, h = canvas1[u'text'].size
+            canvas1[u'text'].text = u'Hello <b>world</b>, again'
+            self.assertGreater(canvas1[u'text'].size[0], w)
+            self.assertEqual(canvas1[u'text'].size, canvas1[u'text'].size)
+        finally:
+            self.exp.end()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import unittest
+import numpy as np
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.exceptions import InvalidValue
+from openexp._sampler.legacy import Legacy, pitch_buffer, pan_buffer
+
+
+class check_sampler_legacy(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether pitch and pan are applied correctly to sound buffers,
+        and whether prepared sounds are shared between samplers.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Processes a synthetic buffer and a sound file.
+        """
+        buf = np.array([[0, 100], [1000, -1000], [30000, 30000],
+                        [-30000, 7]], dtype=np.int16)
+        np.testing.assert_array_equal(
+            pan_buffer(buf, u'left'), [[0, 0], [1000, 0], [30000, 0],
+                                       [-30000, 0]])
+        np.testing.assert_array_equal(pan_buffer(buf, -2)[:, 1],
+                                      [50, -500, 15000, 3])
+        # Amplified samples are clipped, rather than wrapped around
+        self.assertEqual(pan_buffer(buf, .5)[2, 0], 32767)
+        self.assertEqual(pan_buffer(buf, .5).dtype, np.int16)
+        np.testing.assert_array_equal(pitch_buffer(buf, 2), buf[::2])
+        np.testing.assert_array_equal(pitch_buffer(buf, .5)[:3, 0],
+                                      [0, 500, 1000])
+        os.environ.setdefault(u'SDL_AUDIODRIVER', u'dummy')
+        exp = experiment()
+        Legacy.init_sound(exp)
+        src = os.path.join(os.path.dirname(__file__), u'..', u'openexp',
+                           u'resources', u'widgets', u'interaction.ogg')
+        sampler1 = Legacy(exp, src, pitch=1.5, pan=u'right')
+        sampler2 = Legacy(exp, src, pitch=1.5, pan=u'right')
+        self.assertIs(sampler1.sound, sampler2.sound)
+        self.assertAlmostEqual(sampler1.sound.get_length(),
+                               sampler1._source.get_length() / 1.5, places=3)
+        prepared = sampler1.sound
+        # Playback keywords don't affect subsequent playback
+        sampler1.play(pitch=.5, volume=.5)
+        sampler1.stop()
+        self.assertIs(sampler1.sound, prepared)
+        sampler1.pitch = 1
+        sampler1.pan = 0
+        self.assertIs(sampler1.sound, sampler1._source)
+        with self.assertRaises(InvalidValue):
+            sampler1.pitch = -1
+        Legacy.close_sound(exp)
+
+
+if __name__ == '__main__':
+    unittest.main()
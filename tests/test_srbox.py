@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import time
+import unittest
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+try:
+    from opensesame_plugins.core.srbox.libsrbox import LibSrbox
+except ImportError:  # pyserial is not installed
+    LibSrbox = None
+
+
+class check_srbox(unittest.TestCase):
+
+    """
+    desc:
+        Checks button presses from a fake SR Box that is connected through a
+        pseudo-terminal, and continuously sends its state.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        if LibSrbox is None:
+            self.skipTest(u'pyserial is not installed')
+        if not hasattr(os, u'openpty'):
+            self.skipTest(u'pseudo-terminals are not available')
+        master, slave = os.openpty()
+        exp = experiment()
+        exp.init_clock()
+        srbox = LibSrbox(exp, os.ttyname(slave))
+        try:
+            # Turning off the lights and starting are sent to the SR Box
+            srbox.start()
+            time.sleep(.05)
+            self.assertEqual(os.read(master, 2), b'\x60\xa0')
+            # A timeout without any input
+            t0 = exp.clock.time()
+            button, t1 = srbox.get_button_press(timeout=50)
+            self.assertIsNone(button)
+            self.assertGreaterEqual(t1 - t0, 50)
+            # Button 1 is pressed while the experiment is busy. The timestamp
+            # is the time at which the press was received, not the time at
+            # which get_button_press() is called.
+            os.write(master, b'\x00' * 20)
+            t_press = exp.clock.time()
+            os.write(master, b'\x01' * 20)
+            time.sleep(.2)
+            button, t1 = srbox.get_button_press(require_state_change=True)
+            self.assertEqual(button, [1])
+            self.assertLess(abs(t1 - t_press), 50)
+            # The button is still pressed, so there is no state change until
+            # button 2 is pressed as well
+            os.write(master, b'\x01' * 20 + b'\x03' * 20)
+            button, t1 = srbox.get_button_press(require_state_change=True,
+                                                timeout=500)
+            self.assertEqual(button, [2])
+            # Without a state change, all allowed buttons that are pressed are
+            # returned
+            button, t1 = srbox.get_button_press(allowed_buttons=[1, 2, 3])
+            self.assertEqual(button, [1, 2])
+            os.write(master, b'\x05')
+            button, t1 = srbox.get_button_press(allowed_buttons=[3],
+                                                timeout=500)
+            self.assertEqual(button, [3])
+            # Input that is received before start() is ignored
+            srbox.stop()
+            os.write(master, b'\x00' * 5 + b'\x01' * 5)
+            time.sleep(.05)
+            srbox.start()
+            button, t1 = srbox.get_button_press(timeout=50)
+            self.assertIsNone(button)
+        finally:
+            srbox.close()
+            os.close(master)
+            os.close(slave)
+
+
+if __name__ == '__main__':
+    unittest.main()
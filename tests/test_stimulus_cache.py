@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+import numpy as np
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from openexp._canvas import canvas
+from openexp._canvas.stimulus_cache import StimulusCache, stimulus_cache
+
+
+class check_stimulus_cache(unittest.TestCase):
+
+    """
+    desc:
+        Checks the least-recently-used eviction and the counters of the
+        stimulus cache.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Fills a small cache and checks which stimuli are evicted.
+        """
+        cache = StimulusCache(max_bytes=300)
+        for key in u'abc':
+            cache.put(key, np.zeros(100, dtype=np.uint8))
+        self.assertEqual(cache.nbytes, 300)
+        # Using 'a' makes 'b' the least-recently-used stimulus
+        self.assertIsNotNone(cache.get(u'a'))
+        cache.put(u'd', np.zeros(100, dtype=np.uint8))
+        self.assertNotIn(u'b', cache)
+        self.assertIn(u'a', cache)
+        self.assertIsNone(cache.get(u'b'))
+        self.assertEqual(cache.stats(), {
+            u'hits': 1,
+            u'misses': 1,
+            u'evictions': 1,
+            u'entries': 3,
+            u'nbytes': 300,
+            u'max_bytes': 300
+        })
+        # Stimuli that are larger than the cache are not stored
+        cache.put(u'e', np.zeros(400, dtype=np.uint8))
+        self.assertNotIn(u'e', cache)
+        self.assertEqual(len(cache), 3)
+        cache.max_bytes = 100
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 100)
+        cache.max_bytes = 0
+        cache.put(u'f', np.zeros(1, dtype=np.uint8))
+        self.assertEqual(len(cache), 0)
+        # The cache is configured through experiment variables
+        exp = experiment()
+        exp.var.stimulus_cache_max_mb = 1
+        exp.init_stimulus_cache()
+        self.assertIs(exp.stimulus_cache, stimulus_cache)
+        self.assertEqual(stimulus_cache.max_bytes, 1024 ** 2)
+        stimulus_cache.clear()
+        canvas._gabor(0, .05, size=256)
+        canvas._gabor(0, .05, size=256)
+        self.assertEqual(stimulus_cache.hits, 1)
+        # A 256 x 256 RGB patch is 192 KB, so a 1 MB cache can hold five
+        for orient in range(10):
+            canvas._gabor(orient, .05, size=256)
+        self.assertEqual(len(stimulus_cache), 5)
+        self.assertLessEqual(stimulus_cache.nbytes, 1024 ** 2)
+        exp.var.stimulus_cache_max_mb = 256
+        exp.init_stimulus_cache()
+
+
+if __name__ == '__main__':
+    unittest.main()
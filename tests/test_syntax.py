@@ -18,6 +18,7 @@ You should have received a copy of the GNU General Public License
 along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
 """
 import os
+import shlex
 import unittest
 from libopensesame.experiment import experiment
 from libopensesame.exceptions import OSException
@@ -41,6 +42,13 @@ class check_syntax(unittest.TestCase):
             self.exp.syntax.create_cmd(_cmd, _arglist, _kwdict)
         )
 
+    def checkSplit(self, s):
+
+        print(u'Checking split: %s' % s)
+        self.assertEqual(self.exp.syntax.split(s), shlex.split(s))
+        # Split lines are cached, so check them twice
+        self.assertEqual(self.exp.syntax.split(s), shlex.split(s))
+
     def checkEvalText(self, sIn, sOut):
 
         print(u'Checking: %s -> %s' % (sIn, sOut))
@@ -82,6 +90,10 @@ class check_syntax(unittest.TestCase):
             self.checkCmd(u'widget 0 0 1 1 label text="Tést 123',
                 u'widget', [0, 0, 1, 1, u'label'],
                 {u'text' : u'Tést 123'})
+        self.checkSplit(u'draw textline text="a \\"b\\" c" x=0')
+        self.checkSplit(u"set 'single \\ \"quoted\"' a\\ b")
+        self.checkSplit(u'set a"b c"d \t "" e\\\\')
+        self.checkSplit(u'  \tindented   value  ')
         self.checkEvalText(r'\\[width] = \[width] = [width]',
             r'\1024 = [width] = 1024')
         self.checkEvalText(u'[no var]', u'[no var]')
@@ -94,6 +106,26 @@ class check_syntax(unittest.TestCase):
         self.checkEvalText(r'\\[=10*10]', r'\100')
         self.checkEvalText(u'[=u"tést"]', u'tést')
         self.checkEvalText(u'[="\[test\]"]', u'[test]')
+        # Literal texts and f-strings are cached after the first evaluation,
+        # so check them twice
+        for i in range(2):
+            self.checkEvalText(u'no variables', u'no variables')
+            self.checkEvalText(u'{width} x {height}', u'1024 x 768')
+            self.checkEvalText(u"{width} '''", u"1024 '''")
+        self.exp.var.width = 800
+        self.checkEvalText(u'{width} x {height}', u'800 x 768')
+        self.checkEvalText(u'[width] x [height] = [=800*768]', u'800 x 768 = 614400')
+        self.exp.var.width = 1024
+        # Values with square brackets or trailing backslashes change how the
+        # rest of the text is interpreted
+        self.exp.var.nested = u'[height]'
+        self.exp.var.backslash = u'\\'
+        self.exp.var.empty = u''
+        for i in range(2):
+            self.checkEvalText(u'[nested] x [width]', u'768 x 1024')
+            self.checkEvalText(u'[backslash][width]', u'[width]')
+            self.checkEvalText(r'\\[empty][width]', u'[width]')
+            self.checkEvalText(u'[=chr(91) + "=1+1" + chr(93)] [=2]', u'2 2')
         self.checkCnd(u'[width] > 100', u'var.width > 100')
         self.checkCnd(u'[width] >= 100', u'var.width >= 100')
         self.checkCnd(u'[width] <= 100', u'var.width <= 100')
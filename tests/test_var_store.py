@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import unittest
+import warnings
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame.exceptions import VariableDoesNotExist
+
+
+class check_var_store(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether cached variable values are invalidated when variables
+        change, both in the experiment and in item variable stores, and
+        whether snapshots contain the same values as get(). Also checks
+        whether item attributes that appear later take precedence over
+        experiment variables, and whether values of the experiment are
+        evaluated only once per read from an item.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Reads variables repeatedly while changing them in different ways.
+        """
+        exp = experiment()
+        var = exp.var
+        item_var = exp.items.new(u'sketchpad', u'my_sketchpad').var
+        for i in range(2):
+            self.assertEqual(var.width, 1024)
+            self.assertEqual(item_var.width, 1024)
+        var.width = 800
+        self.assertEqual(item_var.width, 800)
+        # Assignments in the Python workspace bypass set()
+        exp.python_workspace._exec(u'width = 640')
+        self.assertEqual(var.width, 640)
+        self.assertEqual(item_var.width, 640)
+        # Item variables override experiment variables
+        item_var.width = 320
+        self.assertEqual(item_var.width, 320)
+        self.assertEqual(var.width, 640)
+        del item_var.width
+        self.assertEqual(item_var.width, 640)
+        # Values that refer to other variables are not cached
+        var.label = u'Width: [width]'
+        for i in range(2):
+            self.assertEqual(item_var.label, u'Width: 640')
+        var.width = 1024
+        self.assertEqual(item_var.label, u'Width: 1024')
+        var.flag = True
+        self.assertEqual(item_var.flag, u'yes')
+        var.unset(u'flag')
+        with self.assertRaises(VariableDoesNotExist):
+            item_var.flag
+        self.assertEqual(item_var.get(u'flag', default=u'no'), u'no')
+        var.clear(preserve=[u'width'])
+        with self.assertRaises(VariableDoesNotExist):
+            item_var.label
+        self.assertEqual(item_var.width, 1024)
+        # Item attributes take precedence over experiment variables, also
+        # when the variable was previously resolved by the experiment
+        var.origin = u'experiment'
+        for i in range(2):
+            self.assertEqual(item_var.origin, u'experiment')
+        exp.items[u'my_sketchpad'].origin = u'item'
+        with warnings.catch_warnings():
+            warnings.simplefilter(u'ignore')
+            self.assertEqual(item_var.origin, u'item')
+        del exp.items[u'my_sketchpad'].origin
+        self.assertEqual(item_var.origin, u'experiment')
+        # Inline Python in experiment variables is evaluated once per read,
+        # also when the result needs to be evaluated again by the item
+        exp.python_workspace._exec(
+            u'reads = []\n'
+            u'def count_read():\n'
+            u'    reads.append(1)\n'
+            u'    return u"{%d}" % len(reads)\n'
+        )
+        var.n_reads = u'[=count_read()]'
+        for i in range(1, 4):
+            self.assertEqual(int(item_var.n_reads), i)
+        # Snapshots
+        var.height = 768
+        var.label = u'[width] x [height]'
+        item_var.flag = False
+        snapshot = item_var.snapshot()
+        for name in (u'width', u'height', u'label', u'flag', u'description'):
+            self.assertEqual(snapshot[name], item_var.get(name))
+        self.assertEqual(snapshot[u'label'], u'1024 x 768')
+        self.assertEqual(var.snapshot(_eval=False)[u'label'],
+                         u'[width] x [height]')
+        self.assertNotIn(u'flag', var.snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
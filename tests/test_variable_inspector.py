@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import unittest
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+
+
+def info(value, source=(u'?',), alive=True):
+
+    return {u'value': value, u'source': list(source), u'alive': alive}
+
+
+class check_variable_inspector(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the variable-inspector model only announces the rows
+        that changed, and whether the proxy model filters variables by name,
+        value, and source.
+    """
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        os.environ.setdefault(u'QT_QPA_PLATFORM', u'offscreen')
+        from qtpy import QtWidgets
+        from opensesame_extensions.core.variable_inspector.\
+            variable_inspector_model import VariableInspectorModel, \
+            VariableFilterProxyModel
+        app = QtWidgets.QApplication.instance() or \
+            QtWidgets.QApplication([])
+        model = VariableInspectorModel()
+        changed = []
+        model.dataChanged.connect(
+            lambda first, last: changed.append((first.row(), last.row())))
+        model.set_variables({
+            u'b': info(u'x', [u'trial']),
+            u'a': info(1),
+            u'c': info(None, [u'block', u'trial'], alive=False)
+        })
+        self.assertEqual(model.rowCount(), 3)
+        self.assertEqual(
+            [model.data(model.index(row, 0)) for row in range(3)],
+            [u'a', u'b', u'c'])
+        self.assertEqual(model.data(model.index(0, 1)), u'1')
+        self.assertEqual(model.data(model.index(2, 2)), u'block,trial')
+        self.assertEqual(changed, [])
+        # Only the row of the changed variable is announced
+        model.set_variables({
+            u'b': info(u'y', [u'trial']),
+            u'a': info(1),
+            u'c': info(None, [u'block', u'trial'], alive=False)
+        })
+        self.assertEqual(changed, [(1, 1)])
+        self.assertEqual(model.data(model.index(1, 1)), u'y')
+        # Variables are inserted and removed in alphabetical order
+        inserted = []
+        model.rowsInserted.connect(
+            lambda parent, first, last: inserted.append(first))
+        model.set_variables({
+            u'b': info(u'y', [u'trial']),
+            u'aa': info(2),
+            u'c': info(None, [u'block', u'trial'], alive=False)
+        })
+        self.assertEqual(inserted, [0])
+        self.assertEqual(
+            [model.data(model.index(row, 0)) for row in range(3)],
+            [u'aa', u'b', u'c'])
+        # Filtering through the proxy model
+        proxy = VariableFilterProxyModel()
+        proxy.setSourceModel(model)
+        proxy.set_filter(u'y|block')
+        self.assertEqual(proxy.rowCount(), 2)
+        proxy.set_filter(u'zz')
+        self.assertEqual(proxy.rowCount(), 0)
+        proxy.set_filter(u'z')
+        self.assertEqual(proxy.rowCount(), 3)
+        # A cached var_info index gives the same description of variables
+        exp = experiment()
+        exp.var.my_var = 1
+        self.assertEqual(
+            exp.var.inspect(),
+            exp.var.inspect(var_info=exp.var.var_info_index()))
+
+
+if __name__ == '__main__':
+    unittest.main()
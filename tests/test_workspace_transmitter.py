@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import pickle
+import queue
+import unittest
+import numpy as np
+from libopensesame.py3compat import *
+from libopensesame.experiment import experiment
+from libopensesame import workspace_transmitter
+from libopensesame.workspace_transmitter import WorkspaceDelta
+
+
+class check_workspace_transmitter(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether the workspace is transmitted as deltas that contain
+        only the changed values, and whether the receiving end reconstructs
+        the full workspace.
+    """
+    def receive(self):
+
+        # The delta is pickled and unpickled, as it would be by a
+        # multiprocessing queue
+        delta = pickle.loads(pickle.dumps(self.channel.get_nowait()))
+        self.assertIsInstance(delta, WorkspaceDelta)
+        self.assertTrue(self.channel.empty())
+        return delta, delta.apply(self.workspace)
+
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        self.channel = queue.Queue()
+        self.workspace = {}
+        exp = experiment()
+        exp.set_output_channel(self.channel)
+        g = exp.python_workspace._globals
+        g.clear()
+        g[u'small'] = [1, 2, 3]
+        g[u'large'] = np.arange(10 ** 6, dtype=np.float32)
+        g[u'large_list'] = list(range(10 ** 6))
+        g[u'module'] = os
+        g[u'function'] = lambda: None
+        g[u'objects'] = np.array([lambda: None], dtype=object)
+        g[u'numbers'] = np.arange(3)
+        exp.transmit_workspace(__pause__=True)
+        delta, received = self.receive()
+        self.assertEqual(set(received),
+                         {u'small', u'large', u'large_list', u'numbers',
+                          u'__pause__'})
+        self.assertTrue(np.array_equal(received[u'large'], g[u'large']))
+        self.assertEqual(received[u'large_list'], g[u'large_list'])
+        if workspace_transmitter.USE_SHARED_MEMORY:
+            self.assertEqual(delta.changed[u'large'][0], u'shared_array')
+            self.assertEqual(delta.changed[u'large_list'][0],
+                             u'shared_pickle')
+        # Unchanged values are not sent again, and unpicklable values are not
+        # pickled again
+        self.assertIs(exp._workspace_transmitter._unpicklable[u'module'], os)
+        exp.transmit_workspace(__pause__=False)
+        delta, received = self.receive()
+        self.assertEqual(delta.changed, {})
+        self.assertFalse(received[u'__pause__'])
+        # Values that change in place are detected, as are removed values
+        g[u'large'][0] = -1
+        g[u'small'].append(4)
+        del g[u'large_list']
+        exp.transmit_workspace()
+        delta, received = self.receive()
+        self.assertEqual(set(delta.changed), {u'large', u'small'})
+        self.assertEqual(delta.deleted, [u'large_list'])
+        self.assertEqual(received[u'large'][0], -1)
+        self.assertEqual(received[u'small'], [1, 2, 3, 4])
+        self.assertNotIn(u'large_list', received)
+        # Whether a value can be pickled depends on its contents, so an
+        # unpicklable array doesn't prevent other arrays from being sent
+        g[u'objects'] = np.array([1, 2], dtype=object)
+        g[u'numbers'] = np.arange(4)
+        g[u'small'] = [lambda: None]
+        exp.transmit_workspace()
+        delta, received = self.receive()
+        self.assertEqual(set(delta.changed), {u'objects', u'numbers'})
+        self.assertEqual(delta.deleted, [u'small'])
+        self.assertEqual(list(received[u'objects']), [1, 2])
+        self.assertEqual(list(received[u'numbers']), [0, 1, 2, 3])
+        self.assertNotIn(u'small', received)
+        # Heartbeats are sent in the background
+        g[u'small'] = u'changed'
+        exp.transmit_workspace(__heartbeat__=True)
+        exp._workspace_transmitter.close()
+        delta, received = self.receive()
+        self.assertEqual(received[u'small'], u'changed')
+        self.assertIn(u'__heartbeat__', received)
+
+
+if __name__ == '__main__':
+    unittest.main()
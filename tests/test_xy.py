@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+This file is part of OpenSesame.
+
+OpenSesame is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+OpenSesame is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with OpenSesame.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import random
+import unittest
+import numpy as np
+from libopensesame.py3compat import *
+from libopensesame.python_workspace_api import (
+    xy_from_polar, xy_to_polar, xy_distance, xy_circle, xy_grid, xy_random,
+    parse_pole)
+
+
+def reference_xy_random(n, width, height, min_dist=0, pole=(0, 0)):
+    r"""The original implementation of xy_random(), which checks every new
+    point against all accepted points.
+    """
+    pole = parse_pole(pole)
+    max_try = 1000
+    for t1 in range(max_try):
+        l = []
+        for i in range(n):
+            for t2 in range(max_try):
+                x1 = (random.random()-.5)*width + pole[0]
+                y1 = (random.random()-.5)*height + pole[1]
+                for x2, y2 in l:
+                    if xy_distance(x1, y1, x2, y2) < min_dist:
+                        break
+                else:
+                    l.append((x1, y1))
+                    break
+            else:
+                break
+        else:
+            return l
+    raise RuntimeError('Failed to generate random coordinates in xy_random()')
+
+
+class check_xy(unittest.TestCase):
+
+    """
+    desc:
+        Checks whether xy_random() gives the same points as the original
+        implementation, and whether the vectorized coordinate functions give
+        the same results as the scalar ones.
+    """
+    def checkRandom(self):
+
+        for n, width, height, min_dist, pole in [
+            (0, 100, 100, 10, (0, 0)),
+            (50, 500, 300, 0, (10, 20)),
+            (200, 500, 500, 25, (-100, 50)),
+            (300, 400, 400, 18, (0, 0)),
+        ]:
+            random.seed(n)
+            expected = reference_xy_random(n, width, height, min_dist, pole)
+            random.seed(n)
+            self.assertEqual(
+                xy_random(n, width, height, min_dist, pole), expected)
+            random.seed(n)
+            a = xy_random(n, width, height, min_dist, pole, as_array=True)
+            self.assertEqual(a.shape, (n, 2))
+            self.assertEqual(a.tolist(), [list(xy) for xy in expected])
+        with self.assertRaises(RuntimeError):
+            xy_random(10, 10, 10, min_dist=100)
+
+    def checkVectorized(self):
+
+        rho = [0, 10, 20.5, 100]
+        phi = [0, 45, -90, 270]
+        x, y = xy_from_polar(rho, phi, pole=(5, -5))
+        for i in range(len(rho)):
+            self.assertTrue(np.allclose(
+                (x[i], y[i]), xy_from_polar(rho[i], phi[i], pole=(5, -5))))
+        rho2, phi2 = xy_to_polar(x, y, pole=(5, -5))
+        for i in range(len(rho)):
+            self.assertTrue(np.allclose(
+                (rho2[i], phi2[i]), xy_to_polar(x[i], y[i], pole=(5, -5))))
+        self.assertRaises(TypeError, xy_from_polar, [u'a'], 0)
+        circle = xy_circle(7, 100, phi0=10, pole=(1, 2))
+        self.assertEqual(len(circle), 7)
+        for i, (x, y) in enumerate(circle):
+            self.assertTrue(np.allclose(
+                (x, y), xy_from_polar(100, 10 + i * 360 / 7, pole=(1, 2))))
+        self.assertTrue(np.allclose(
+            xy_circle(7, 100, phi0=10, pole=(1, 2), as_array=True), circle))
+        self.assertEqual(xy_circle(0, 100), [])
+        self.assertEqual(xy_grid((3, 2), (10, 20), pole=(1, 1)), [
+            (-9., -9.), (1., -9.), (11., -9.),
+            (-9., 11.), (1., 11.), (11., 11.)
+        ])
+        self.assertEqual(xy_grid(0, 10), [])
+        self.assertEqual(xy_grid(4, 10, as_array=True).shape, (16, 2))
+
+    def runTest(self):
+
+        """
+        desc:
+            Runs the full test.
+        """
+        self.checkRandom()
+        self.checkVectorized()
+
+
+if __name__ == '__main__':
+    unittest.main()